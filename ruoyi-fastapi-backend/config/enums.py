@@ -49,3 +49,30 @@ class RedisInitKeyConfig(Enum):
     ACCOUNT_LOCK = {'key': 'account_lock', 'remark': '用户锁定'}
     PASSWORD_ERROR_COUNT = {'key': 'password_error_count', 'remark': '密码错误次数'}
     SMS_CODE = {'key': 'sms_code', 'remark': '短信验证码'}
+    USER_PRINCIPAL = {'key': 'user_principal', 'remark': '用户认证信息'}
+    PRINCIPAL_VERSION = {'key': 'principal_version', 'remark': '用户认证信息版本号'}
+    USER_ROUTERS = {'key': 'user_routers', 'remark': '用户路由信息'}
+
+
+class SigninStatus(Enum):
+    """
+    实时签到结果状态
+
+    SUCCESS: 签到成功
+    FAIL: 身份验证失败
+    DETECT: 未检测到人脸
+    ERROR: 处理异常
+    """
+
+    @property
+    def code(self):
+        return self.value.get('code')
+
+    @property
+    def text(self):
+        return self.value.get('text')
+
+    SUCCESS = {'code': 0, 'text': 'success'}
+    FAIL = {'code': 1, 'text': 'fail'}
+    DETECT = {'code': 2, 'text': 'detect'}
+    ERROR = {'code': 3, 'text': 'error'}
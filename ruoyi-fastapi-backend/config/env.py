@@ -20,7 +20,26 @@ class AppSettings(BaseSettings):
     app_version: str = '1.0.0'
     app_reload: bool = True
     app_ip_location_query: bool = True
+    app_ip_location_database: str = 'assets/ip/ip_location.npz'
+    app_ip_location_cache_size: int = 10000
     app_same_time_login: bool = True
+    app_io_max_workers: int = 8
+    app_password_max_workers: int = 4
+    app_password_bcrypt_rounds: int = 12
+    app_principal_cache_size: int = 10000
+    app_principal_cache_seconds: int = 300
+    app_router_cache_seconds: int = 3600
+    app_log_queue_size: int = 10000
+    app_log_batch_size: int = 500
+    app_log_flush_seconds: float = 1.0
+    app_log_enqueue_timeout: float = 0.05
+    app_page_count_cache_size: int = 1000
+    app_page_count_cache_seconds: int = 60
+    app_page_count_estimate_threshold: int = 100000
+    app_log_partition_interval: Literal['month', 'day', 'none'] = 'none'
+    app_log_partition_premake: int = 3
+    app_log_retention_days: int = 180
+    app_log_archive_path: str = 'logs/archive'
 
 
 class JwtSettings(BaseSettings):
@@ -32,6 +51,8 @@ class JwtSettings(BaseSettings):
     jwt_algorithm: str = 'HS256'
     jwt_expire_minutes: int = 1440
     jwt_redis_expire_minutes: int = 30
+    jwt_redis_refresh_ratio: float = 0.9
+    jwt_verified_cache_size: int = 10000
 
 
 class DataBaseSettings(BaseSettings):
@@ -64,6 +85,16 @@ class RedisSettings(BaseSettings):
     redis_database: int = 2
 
 
+class FaceSettings(BaseSettings):
+    """
+    人脸识别配置
+    """
+
+    face_match_shards: int = 1
+    face_match_top_k: int = 1
+    face_match_parallel_min_size: int = 20000
+
+
 class UploadSettings:
     """
     上传配置
@@ -102,6 +133,8 @@ class UploadSettings:
         'pdf',
     ]
     DOWNLOAD_PATH = 'vf_admin/download_path'
+    # 大文件分块写入的块大小，这里的10代表10MB
+    CHUNK_SIZE = 1024 * 1024 * 10
 
     def __init__(self):
         if not os.path.exists(self.UPLOAD_PATH):
@@ -159,6 +192,14 @@ class GetConfig:
         # 实例化Redis配置模型
         return RedisSettings()
 
+    @lru_cache()
+    def get_face_config(self):
+        """
+        获取人脸识别配置
+        """
+        # 实例化人脸识别配置模型
+        return FaceSettings()
+
     @lru_cache()
     def get_upload_config(self):
         """
@@ -179,8 +220,8 @@ class GetConfig:
             # 使用argparse定义命令行参数
             parser = argparse.ArgumentParser(description='命令行参数')
             parser.add_argument('--env', type=str, default='', help='运行环境')
-            # 解析命令行参数
-            args = parser.parse_args()
+            # 解析命令行参数，忽略其他命令行工具（如ip归属区域库导入工具）的参数
+            args, _ = parser.parse_known_args()
             # 设置环境变量，如果未设置命令行参数，默认APP_ENV为dev
             os.environ['APP_ENV'] = args.env if args.env else 'dev'
         # 读取运行环境
@@ -204,5 +245,7 @@ JwtConfig = get_config.get_jwt_config()
 DataBaseConfig = get_config.get_database_config()
 # Redis配置
 RedisConfig = get_config.get_redis_config()
+# 人脸识别配置
+FaceConfig = get_config.get_face_config()
 # 上传配置
 UploadConfig = get_config.get_upload_config()
@@ -1,20 +1,20 @@
 import inspect
 import json
 import os
-import requests
 import time
 from datetime import datetime
 from fastapi import Request
 from fastapi.responses import JSONResponse, ORJSONResponse, UJSONResponse
 from functools import lru_cache, wraps
-from typing import Literal, Optional
+from typing import Literal, Optional, Tuple, Union
 from user_agents import parse
 from config.enums import BusinessType
 from config.env import AppConfig
 from exceptions.exception import LoginException, ServiceException, ServiceWarning
 from module_admin.entity.vo.log_vo import LogininforModel, OperLogModel
-from module_admin.service.log_service import LoginLogService, OperationLogService
+from module_admin.service.log_service import LoginLogService, LogSinkService, OperationLogService
 from module_admin.service.login_service import LoginService
+from utils.ip_location_util import IpLocationUtil
 from utils.log_util import logger
 from utils.response_util import ResponseUtil
 
@@ -43,35 +43,32 @@ class Log:
         self.log_type = log_type
 
     def __call__(self, func):
+        # 获取被装饰函数的文件路径
+        file_path = inspect.getfile(func)
+        # 获取项目根路径
+        project_root = os.getcwd()
+        # 处理文件路径，去除项目根路径部分
+        relative_path = os.path.relpath(file_path, start=project_root)[0:-2].replace('\\', '.')
+        # 获取当前被装饰函数所在路径，被装饰函数不变，装饰时计算一次即可
+        func_path = f'{relative_path}{func.__name__}()'
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             start_time = time.time()
-            # 获取被装饰函数的文件路径
-            file_path = inspect.getfile(func)
-            # 获取项目根路径
-            project_root = os.getcwd()
-            # 处理文件路径，去除项目根路径部分
-            relative_path = os.path.relpath(file_path, start=project_root)[0:-2].replace('\\', '.')
-            # 获取当前被装饰函数所在路径
-            func_path = f'{relative_path}{func.__name__}()'
             # 获取上下文信息
             request: Request = kwargs.get('request')
             token = request.headers.get('Authorization')
             query_db = kwargs.get('query_db')
             request_method = request.method
-            operator_type = 0
-            user_agent = request.headers.get('User-Agent')
-            if 'Windows' in user_agent or 'Macintosh' in user_agent or 'Linux' in user_agent:
-                operator_type = 1
-            if 'Mobile' in user_agent or 'Android' in user_agent or 'iPhone' in user_agent:
-                operator_type = 2
+            user_agent = request.headers.get('User-Agent') or ''
+            operator_type, browser, system_os = parse_user_agent(user_agent)
             # 获取请求的url
             oper_url = request.url.path
             # 获取请求的ip及ip归属区域
             oper_ip = request.headers.get('X-Forwarded-For')
             oper_location = '内网IP'
             if AppConfig.app_ip_location_query:
-                oper_location = get_ip_location(oper_ip)
+                oper_location = IpLocationUtil.get_ip_location(oper_ip)
             # 根据不同的请求类型使用不同的方法获取请求参数
             content_type = request.headers.get('Content-Type')
             if content_type and (
@@ -80,17 +77,10 @@ class Log:
                 payload = await request.form()
                 oper_param = '\n'.join([f'{key}: {value}' for key, value in payload.items()])
             else:
-                payload = await request.body()
-                # 通过 request.path_params 直接访问路径参数
-                path_params = request.path_params
-                oper_param = {}
-                if payload:
-                    oper_param.update(json.loads(str(payload, 'utf-8')))
-                if path_params:
-                    oper_param.update(path_params)
-                oper_param = json.dumps(oper_param, ensure_ascii=False)
+                # 请求体及路径参数直接拼接为JSON字符串，不再反序列化后重新序列化
+                oper_param = capture_request_param(await request.body(), request.path_params)
             # 日志表请求参数字段长度最大为2000，因此在此处判断长度
-            if len(oper_param) > 2000:
+            if oper_param is None or len(oper_param) > LOG_FIELD_MAX_LENGTH:
                 oper_param = '请求参数过长'
 
             # 获取操作时间
@@ -98,13 +88,6 @@ class Log:
             # 此处在登录之前向原始函数传递一些登录信息，用于监测在线用户的相关信息
             login_log = {}
             if self.log_type == 'login':
-                user_agent_info = parse(user_agent)
-                browser = f'{user_agent_info.browser.family}'
-                system_os = f'{user_agent_info.os.family}'
-                if user_agent_info.browser.version != ():
-                    browser += f' {user_agent_info.browser.version[0]}'
-                if user_agent_info.os.version != ():
-                    system_os += f' {user_agent_info.os.version[0]}'
                 login_log = dict(
                     ipaddr=oper_ip,
                     loginLocation=oper_location,
@@ -125,22 +108,23 @@ class Log:
             except Exception as e:
                 logger.exception(e)
                 result = ResponseUtil.error(msg=str(e))
-            # 获取请求耗时
-            cost_time = float(time.time() - start_time) * 100
+            # 获取请求耗时（毫秒）
+            cost_time = (time.time() - start_time) * 1000
             # 判断请求是否来自api文档
-            request_from_swagger = (
-                request.headers.get('referer').endswith('docs') if request.headers.get('referer') else False
-            )
-            request_from_redoc = (
-                request.headers.get('referer').endswith('redoc') if request.headers.get('referer') else False
-            )
+            referer = request.headers.get('referer')
+            request_from_swagger = referer.endswith('docs') if referer else False
+            request_from_redoc = referer.endswith('redoc') if referer else False
             # 根据响应结果的类型使用不同的方法获取响应结果参数
-            if (
-                isinstance(result, JSONResponse)
-                or isinstance(result, ORJSONResponse)
-                or isinstance(result, UJSONResponse)
-            ):
+            if hasattr(result, 'result_code'):
+                # 由ResponseUtil构建的响应，响应码及响应信息已保存在响应对象上，响应体直接截取保存
+                result_code = result.result_code
+                result_msg = result.result_msg
+                json_result = capture_text(result.body)
+            elif isinstance(result, (JSONResponse, ORJSONResponse, UJSONResponse)):
                 result_dict = json.loads(str(result.body, 'utf-8'))
+                result_code = result_dict.get('code')
+                result_msg = result_dict.get('msg')
+                json_result = capture_text(result.body)
             else:
                 if request_from_swagger or request_from_redoc:
                     result_dict = {}
@@ -149,14 +133,16 @@ class Log:
                         result_dict = {'code': result.status_code, 'message': '获取成功'}
                     else:
                         result_dict = {'code': result.status_code, 'message': '获取失败'}
-            json_result = json.dumps(result_dict, ensure_ascii=False)
+                result_code = result_dict.get('code')
+                result_msg = result_dict.get('msg')
+                json_result = json.dumps(result_dict, ensure_ascii=False)
             # 根据响应结果获取响应状态及异常信息
             status = 1
             error_msg = ''
-            if result_dict.get('code') == 200:
+            if result_code == 200:
                 status = 0
             else:
-                error_msg = result_dict.get('msg')
+                error_msg = capture_text(result_msg) if result_msg else result_msg
             # 根据日志类型向对应的日志表插入数据
             if self.log_type == 'login':
                 # 登录请求来自于api文档时不记录登录日志，其余情况则记录
@@ -168,10 +154,14 @@ class Log:
                     login_log['loginTime'] = oper_time
                     login_log['userName'] = user_name
                     login_log['status'] = str(status)
-                    login_log['msg'] = result_dict.get('msg')
+                    login_log['msg'] = result_msg
 
-                    await LoginLogService.add_login_log_services(query_db, LogininforModel(**login_log))
+                    # 日志交由后台任务批量写入，后台任务未运行时直接写入
+                    login_log_model = LogininforModel(**login_log)
+                    if not await LogSinkService.put_login_log(login_log_model):
+                        await LoginLogService.add_login_log_services(query_db, login_log_model)
             else:
+                # 优先复用接口鉴权依赖已解析并缓存在请求上下文中的当前用户
                 current_user = await LoginService.get_current_user(request, token, query_db)
                 oper_name = current_user.user.user_name
                 dept_name = current_user.user.dept.dept_name if current_user.user.dept else None
@@ -184,6 +174,7 @@ class Log:
                     operName=oper_name,
                     deptName=dept_name,
                     operUrl=oper_url,
+                    routePath=getattr(request.scope.get('route'), 'path', None),
                     operIp=oper_ip,
                     operLocation=oper_location,
                     operParam=oper_param,
@@ -193,32 +184,79 @@ class Log:
                     operTime=oper_time,
                     costTime=int(cost_time),
                 )
-                await OperationLogService.add_operation_log_services(query_db, operation_log)
+                if not await LogSinkService.put_operation_log(operation_log):
+                    await OperationLogService.add_operation_log_services(query_db, operation_log)
 
             return result
 
         return wrapper
 
 
-@lru_cache()
-def get_ip_location(oper_ip: str):
+# 日志表请求参数、返回参数及错误消息字段的最大长度
+LOG_FIELD_MAX_LENGTH = 2000
+
+
+@lru_cache(maxsize=1024)
+def parse_user_agent(user_agent: str) -> Tuple[int, str, str]:
+    """
+    解析User-Agent请求头，客户端种类有限，解析结果按User-Agent缓存
+
+    :param user_agent: User-Agent请求头
+    :return: (操作类别, 浏览器, 操作系统)
+    """
+    operator_type = 0
+    if 'Windows' in user_agent or 'Macintosh' in user_agent or 'Linux' in user_agent:
+        operator_type = 1
+    if 'Mobile' in user_agent or 'Android' in user_agent or 'iPhone' in user_agent:
+        operator_type = 2
+    user_agent_info = parse(user_agent)
+    browser = f'{user_agent_info.browser.family}'
+    system_os = f'{user_agent_info.os.family}'
+    if user_agent_info.browser.version != ():
+        browser += f' {user_agent_info.browser.version[0]}'
+    if user_agent_info.os.version != ():
+        system_os += f' {user_agent_info.os.version[0]}'
+    return operator_type, browser, system_os
+
+
+def capture_text(content: Union[bytes, str], max_length: int = LOG_FIELD_MAX_LENGTH) -> str:
+    """
+    截取日志字段内容，字节内容只解码不超过字段长度所需的部分
+
+    :param content: 字节或字符串内容
+    :param max_length: 最大字符数
+    :return: 截取后的字符串
+    """
+    if isinstance(content, bytes):
+        # utf-8下每个字符最多4个字节，截断处不完整的字符直接丢弃
+        content = content[: max_length * 4].decode('utf-8', errors='ignore')
+    return content[:max_length]
+
+
+def capture_request_param(body: bytes, path_params: dict) -> Optional[str]:
     """
-    查询ip归属区域
+    将请求体及路径参数拼接为请求参数字符串，JSON对象请求体不做反序列化，路径参数直接追加在对象末尾，
+    请求体中存在同名键时解析后合并，路径参数优先
 
-    :param oper_ip: 需要查询的ip
-    :return: ip归属区域
+    :param body: 请求体
+    :param path_params: 路径参数
+    :return: 请求参数字符串，超过字段长度时返回None
     """
-    oper_location = '内网IP'
-    try:
-        if oper_ip != '127.0.0.1' and oper_ip != 'localhost':
-            oper_location = '未知'
-            ip_result = requests.get(f'https://qifu-api.baidubce.com/ip/geo/v1/district?ip={oper_ip}')
-            if ip_result.status_code == 200:
-                prov = ip_result.json().get('data').get('prov')
-                city = ip_result.json().get('data').get('city')
-                if prov or city:
-                    oper_location = f'{prov}-{city}'
-    except Exception as e:
-        oper_location = '未知'
-        print(e)
-    return oper_location
+    if len(body) > LOG_FIELD_MAX_LENGTH * 4:
+        return None
+    oper_param = body.decode('utf-8', errors='ignore').strip() if body else ''
+    if not path_params:
+        return oper_param or '{}'
+    path_param_json = json.dumps(path_params, ensure_ascii=False)
+    if not oper_param:
+        return path_param_json
+    if oper_param.startswith('{') and oper_param.endswith('}'):
+        if not oper_param[1:-1].strip():
+            return path_param_json
+        # 请求体中可能包含与路径参数同名的键，此时直接拼接会产生重复键，需解析后合并并以路径参数为准
+        if not any(json.dumps(key) in oper_param for key in path_params):
+            return f'{oper_param[:-1]}, {path_param_json[1:]}'
+    # 请求体不是JSON对象或包含同名键时与原有逻辑一致，解析后合并路径参数
+    param = json.loads(oper_param)
+    param.update(path_params)
+    return json.dumps(param, ensure_ascii=False)
@@ -19,21 +19,19 @@ class CheckUserInterfaceAuth:
         """
         self.perm = perm
         self.is_strict = is_strict
+        self.perm_set = frozenset([perm] if isinstance(perm, str) else perm)
+        self.check_all = is_strict and isinstance(perm, list)
 
     def __call__(self, current_user: CurrentUserModel = Depends(LoginService.get_current_user)):
-        user_auth_list = current_user.permissions
-        if '*:*:*' in user_auth_list:
+        user_auth_set = current_user.permission_set
+        if '*:*:*' in user_auth_set:
             return True
-        if isinstance(self.perm, str):
-            if self.perm in user_auth_list:
+        if self.check_all:
+            if self.perm_set <= user_auth_set:
+                return True
+        else:
+            if not self.perm_set.isdisjoint(user_auth_set):
                 return True
-        if isinstance(self.perm, list):
-            if self.is_strict:
-                if all([perm_str in user_auth_list for perm_str in self.perm]):
-                    return True
-            else:
-                if any([perm_str in user_auth_list for perm_str in self.perm]):
-                    return True
         raise PermissionException(data='', message='该用户无此接口权限')
 
 
@@ -51,18 +49,15 @@ class CheckRoleInterfaceAuth:
         """
         self.role_key = role_key
         self.is_strict = is_strict
+        self.role_key_set = frozenset([role_key] if isinstance(role_key, str) else role_key)
+        self.check_all = is_strict and isinstance(role_key, list)
 
     def __call__(self, current_user: CurrentUserModel = Depends(LoginService.get_current_user)):
-        user_role_list = current_user.user.role
-        user_role_key_list = [role.role_key for role in user_role_list]
-        if isinstance(self.role_key, str):
-            if self.role_key in user_role_key_list:
+        user_role_key_set = current_user.role_key_set
+        if self.check_all:
+            if self.role_key_set <= user_role_key_set:
+                return True
+        else:
+            if not self.role_key_set.isdisjoint(user_role_key_set):
                 return True
-        if isinstance(self.role_key, list):
-            if self.is_strict:
-                if all([role_key_str in user_role_key_list for role_key_str in self.role_key]):
-                    return True
-            else:
-                if any([role_key_str in user_role_key_list for role_key_str in self.role_key]):
-                    return True
         raise PermissionException(data='', message='该用户无此接口权限')
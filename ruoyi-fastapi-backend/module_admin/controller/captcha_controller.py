@@ -13,17 +13,12 @@ captchaController = APIRouter()
 
 @captchaController.get('/captchaImage')
 async def get_captcha_image(request: Request):
-    captcha_enabled = (
-        True
-        if await request.app.state.redis.get(f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.captchaEnabled')
-        == 'true'
-        else False
-    )
-    register_enabled = (
-        True
-        if await request.app.state.redis.get(f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.registerUser') == 'true'
-        else False
+    captcha_enabled_value, register_enabled_value = await request.app.state.redis.mget(
+        f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.captchaEnabled',
+        f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.registerUser',
     )
+    captcha_enabled = True if captcha_enabled_value == 'true' else False
+    register_enabled = True if register_enabled_value == 'true' else False
     session_id = str(uuid.uuid4())
     captcha_result = await CaptchaService.create_captcha_image_service()
     image = captcha_result[0]
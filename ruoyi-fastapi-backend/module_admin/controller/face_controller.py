@@ -20,14 +20,20 @@ from module_admin.service.face_service import FaceService
 from module_admin.service.dept_service import DeptService
 from module_admin.entity.vo.face_vo import FaceRegisterModel, FaceSearchModel
 from module_admin.entity.vo.common_vo import CrudResponseModel
+from module_admin.dao.dept_dao import DeptDao
 from module_admin.dao.face_dao import FaceDao
 from module_admin.annotation.log import log
 from utils.response_util import ResponseUtil
+from utils.signin_protocol_util import SigninResponder
+from utils.executor_util import ExecutorUtil
+from utils.face_match_util import FaceGalleryUtil
 from utils.face_recognition import FaceRecognition
 from utils.upload_util import UploadUtil
 from utils.page_util import PageResponse
 from utils.common_util import export_excel
 from config import settings
+from config.database import AsyncSessionLocal
+from config.enums import SigninStatus
 
 # 创建路由器
 router = APIRouter()
@@ -96,53 +102,63 @@ async def register_face(
 async def realtime_signin(websocket: WebSocket, meeting_id: int):
     """
     实时人脸识别签到接口 (WebSocket)
+    默认使用JSON协议；客户端可通过子协议msgpack协商紧凑协议，按批发送帧并只接收状态变化
     :param websocket: WebSocket连接
     :param meeting_id: 会议ID
     """
-    await websocket.accept()
+    responder = SigninResponder(websocket)
+    await responder.accept()
+    face_gallery = None
 
     try:
         # 验证会议有效性
         meeting = await MeetingService.get_meeting_by_id(meeting_id)
         if not meeting:
-            await websocket.send_json({
-                "status": "error",
-                "msg": "会议不存在或已结束"
-            })
+            await responder.send(SigninStatus.ERROR, msg="会议不存在或已结束")
             return
 
         # 检查会议状态
         now = datetime.now()
         if now < meeting.sign_start:
-            await websocket.send_json({
-                "status": "error",
-                "msg": f"签到尚未开始，开始时间: {meeting.sign_start.strftime('%Y-%m-%d %H:%M')}"
-            })
+            await responder.send(
+                SigninStatus.ERROR,
+                msg=f"签到尚未开始，开始时间: {meeting.sign_start.strftime('%Y-%m-%d %H:%M')}"
+            )
             return
 
         if now > meeting.sign_end:
-            await websocket.send_json({
-                "status": "error",
-                "msg": f"签到已结束，结束时间: {meeting.sign_end.strftime('%Y-%m-%d %H:%M')}"
-            })
+            await responder.send(
+                SigninStatus.ERROR,
+                msg=f"签到已结束，结束时间: {meeting.sign_end.strftime('%Y-%m-%d %H:%M')}"
+            )
             return
 
         # 获取参会人员人脸特征
         attendees = await MeetingService.get_meeting_attendees(meeting_id)
         if not attendees:
-            await websocket.send_json({
-                "status": "error",
-                "msg": "本次会议无参会人员"
-            })
+            await responder.send(SigninStatus.ERROR, msg="本次会议无参会人员")
             return
 
-        # 构建特征数据库 {user_id: feature_vector}
-        face_db = {}
+        # 构建特征数据库（共享内存分片，同一会议的签到终端共用）及参会人员名册 {user_id: (user_name, dept_name)}
+        # 部门名称按部门id批量查询，不访问attendee.user.dept懒加载关系，避免每位参会人员一次查询
+        user_ids = []
+        features = []
+        enrolled_users = []
         for attendee in attendees:
             if attendee.user and attendee.user.face_feature:
-                face_db[attendee.user.user_id] = np.frombuffer(
-                    attendee.user.face_feature, dtype=np.float32
-                )
+                user_ids.append(attendee.user.user_id)
+                features.append(np.frombuffer(attendee.user.face_feature, dtype=np.float32))
+                enrolled_users.append(attendee.user)
+        async with AsyncSessionLocal() as query_db:
+            dept_names = await DeptDao.get_dept_name_map_dao(
+                query_db, [user.dept_id for user in enrolled_users if user.dept_id is not None]
+            )
+        roster = {
+            user.user_id: (user.user_name, dept_names.get(user.dept_id, "")) for user in enrolled_users
+        }
+        # 名册版本由用户id及最近更新时间确定，人脸特征变更时用户更新时间随之变化
+        updated_at = max((user.update_time for user in enrolled_users if user.update_time), default=None)
+        face_gallery = await FaceGalleryUtil.acquire(meeting_id, user_ids, features, updated_at)
 
         # 设置识别参数
         threshold = settings.FACE_RECOGNITION_THRESHOLD
@@ -151,98 +167,92 @@ async def realtime_signin(websocket: WebSocket, meeting_id: int):
         # 实时处理视频帧
         while True:
             try:
-                # 接收视频帧数据
-                frame_data = await websocket.receive_bytes()
-
-                # 转换字节数据为图像
-                nparr = np.frombuffer(frame_data, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-                # 人脸检测
-                faces = face_recognition.detect_faces(frame)
-                if not faces:
-                    await websocket.send_json({
-                        "status": "detect",
-                        "msg": "未检测到人脸，请正对摄像头"
-                    })
-                    continue
-
-                # 提取特征
-                embedding = face_recognition.extract_embedding(faces[0])
-
-                # 特征比对
-                max_similarity = 0
-                matched_user_id = None
-
-                for user_id, feature in face_db.items():
-                    similarity = face_recognition.calculate_similarity(embedding, feature)
-                    if similarity > max_similarity:
-                        max_similarity = similarity
-                        matched_user_id = user_id
-
-                # 签到判定
-                if max_similarity > similarity_threshold:
-                    # 处理签到
-                    sign_result = await MeetingService.process_sign_in(
-                        meeting_id=meeting_id,
-                        user_id=matched_user_id,
-                        similarity=max_similarity,
-                        sign_time=datetime.now()
-                    )
-
-                    # 获取用户信息
-                    user = await UserService.get_user_by_id(matched_user_id)
-
-                    # 保存签到照片
-                    _, img_encoded = cv2.imencode('.jpg', faces[0])
-                    sign_image_path = await UploadUtil.save_sign_image(
-                        img_encoded.tobytes(),
-                        f"sign_{meeting_id}_{matched_user_id}.jpg"
-                    )
-
-                    # 更新签到记录
-                    await MeetingService.update_sign_image(
-                        meeting_id=meeting_id,
-                        user_id=matched_user_id,
-                        face_image_path=sign_image_path
-                    )
-
-                    # 发送成功响应
-                    await websocket.send_json({
-                        "status": "success",
-                        "user_id": matched_user_id,
-                        "user_name": user.user_name,
-                        "dept_name": user.dept.dept_name if user.dept else "",
-                        "similarity": f"{max_similarity * 100:.2f}%",
-                        "sign_time": datetime.now().strftime("%H:%M:%S")
-                    })
-                else:
-                    # 相似度不足
-                    await websocket.send_json({
-                        "status": "fail",
-                        "msg": f"身份验证失败 (最高相似度: {max_similarity * 100:.2f}%)"
-                    })
+                # 接收一批视频帧数据（JSON协议下每批只有一帧）
+                frames = await responder.receive_frames()
+
+                for frame_data in frames:
+                    # 转换字节数据为图像
+                    nparr = np.frombuffer(frame_data, np.uint8)
+                    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+                    # 人脸检测
+                    faces = face_recognition.detect_faces(frame)
+                    if not faces:
+                        await responder.emit(SigninStatus.DETECT, msg="未检测到人脸，请正对摄像头")
+                        continue
+
+                    # 提取特征
+                    embedding = face_recognition.extract_embedding(faces[0])
+
+                    # 特征比对
+                    max_similarity = 0
+                    matched_user_id = None
+
+                    candidates = await face_gallery.search(embedding, top_k=1)
+                    if candidates:
+                        matched_user_id, max_similarity = candidates[0]
+
+                    # 签到判定
+                    if max_similarity > similarity_threshold:
+                        # 处理签到
+                        await MeetingService.process_sign_in(
+                            meeting_id=meeting_id,
+                            user_id=matched_user_id,
+                            similarity=max_similarity,
+                            sign_time=datetime.now()
+                        )
+
+                        # 从名册获取用户展示信息，无需再次查询
+                        user_name, dept_name = roster[matched_user_id]
+
+                        # 保存签到照片（JPEG编码及写盘均在阻塞IO线程池中执行）
+                        _, img_encoded = await ExecutorUtil.run_io(cv2.imencode, '.jpg', faces[0])
+                        sign_image_path = await UploadUtil.save_sign_image(
+                            img_encoded.tobytes(),
+                            f"sign_{meeting_id}_{matched_user_id}.jpg"
+                        )
+
+                        # 更新签到记录
+                        await MeetingService.update_sign_image(
+                            meeting_id=meeting_id,
+                            user_id=matched_user_id,
+                            face_image_path=sign_image_path
+                        )
+
+                        # 回复成功结果
+                        await responder.emit(
+                            SigninStatus.SUCCESS,
+                            user_id=matched_user_id,
+                            user_name=user_name,
+                            dept_name=dept_name,
+                            similarity=max_similarity,
+                            sign_time=datetime.now()
+                        )
+                    else:
+                        # 相似度不足
+                        await responder.emit(
+                            SigninStatus.FAIL,
+                            msg=f"身份验证失败 (最高相似度: {max_similarity * 100:.2f}%)",
+                            similarity=max_similarity
+                        )
+
+                # 每批帧只回复一条消息
+                await responder.flush()
 
                 # 降低CPU占用
                 await asyncio.sleep(0.1)
 
             except Exception as e:
-                await websocket.send_json({
-                    "status": "error",
-                    "msg": f"处理失败: {str(e)}"
-                })
+                await responder.send(SigninStatus.ERROR, msg=f"处理失败: {str(e)}")
                 break
 
     except HTTPException as e:
-        await websocket.send_json({
-            "status": "error",
-            "msg": f"连接错误: {e.detail}"
-        })
+        await responder.send(SigninStatus.ERROR, msg=f"连接错误: {e.detail}")
     except Exception as e:
-        await websocket.send_json({
-            "status": "error",
-            "msg": f"系统错误: {str(e)}"
-        })
+        await responder.send(SigninStatus.ERROR, msg=f"系统错误: {str(e)}")
+    finally:
+        if face_gallery is not None:
+            FaceGalleryUtil.release(meeting_id, face_gallery)
 
 
 @router.post("/face/search", response_model=PageResponse)
@@ -415,8 +425,8 @@ async def batch_register_faces(
 
         for user in users:
             # 查找匹配的图片文件
-            img_file = next((f for f in face_images if f.startswith(user.user_name) or f.startswith(str(user.user_id))),
-                            None)
+            img_file = next((f for f in face_images if os.path.basename(f).startswith(user.user_name)
+                             or os.path.basename(f).startswith(str(user.user_id))), None)
 
             if not img_file:
                 results.append({
@@ -430,8 +440,7 @@ async def batch_register_faces(
 
             try:
                 # 读取图片
-                with open(os.path.join(UploadUtil.get_upload_dir(), img_file), "rb") as f:
-                    img_data = f.read()
+                img_data = await UploadUtil.read_file(os.path.join(UploadUtil.get_upload_dir(), img_file))
 
                 # 检测人脸
                 faces = face_recognition.detect_faces(img_data)
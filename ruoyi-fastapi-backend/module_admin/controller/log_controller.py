@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, Form, Request
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
 from config.enums import BusinessType
 from config.get_db import get_db
 from module_admin.annotation.log_annotation import Log
@@ -9,9 +10,11 @@ from module_admin.entity.vo.log_vo import (
     DeleteOperLogModel,
     LoginLogPageQueryModel,
     OperLogPageQueryModel,
+    OperLogStatModel,
+    OperLogStatQueryModel,
     UnlockUser,
 )
-from module_admin.service.log_service import LoginLogService, OperationLogService
+from module_admin.service.log_service import LoginLogService, OperationLogService, OperationLogStatService
 from module_admin.service.login_service import LoginService
 from utils.common_util import bytes2file_response
 from utils.log_util import logger
@@ -41,6 +44,25 @@ async def get_system_operation_log_list(
     return ResponseUtil.success(model_content=operation_log_page_query_result)
 
 
+@logController.get(
+    '/operlog/stat',
+    response_model=List[OperLogStatModel],
+    dependencies=[Depends(CheckUserInterfaceAuth('monitor:operlog:list'))],
+)
+async def get_system_operation_log_stat(
+    request: Request,
+    operation_log_stat_query: OperLogStatQueryModel = Depends(OperLogStatQueryModel.as_query),
+    query_db: AsyncSession = Depends(get_db),
+):
+    # 获取耗时统计数据，统计数据由日志写入时汇总，查询时不扫描操作日志表
+    operation_log_stat_result = await OperationLogStatService.get_operation_log_stat_services(
+        query_db, operation_log_stat_query
+    )
+    logger.info('获取成功')
+
+    return ResponseUtil.success(data=operation_log_stat_result)
+
+
 @logController.delete('/operlog/clean', dependencies=[Depends(CheckUserInterfaceAuth('monitor:operlog:remove'))])
 @Log(title='操作日志', business_type=BusinessType.CLEAN)
 async def clear_system_operation_log(request: Request, query_db: AsyncSession = Depends(get_db)):
@@ -66,7 +66,7 @@ async def login(
             ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
         )
     await UserService.edit_user_services(
-        query_db, EditUserModel(userId=result[0].user_id, loginDate=datetime.now(), type='status')
+        request, query_db, EditUserModel(userId=result[0].user_id, loginDate=datetime.now(), type='status')
     )
     logger.info('登录成功')
     # 判断请求是否来自于api文档，如果是返回指定格式的结果，用于修复api文档认证成功后token显示undefined的bug
@@ -93,9 +93,9 @@ async def get_login_user_routers(
     query_db: AsyncSession = Depends(get_db),
 ):
     logger.info('获取成功')
-    user_routers = await LoginService.get_current_user_routers(current_user.user.user_id, query_db)
+    user_routers = await LoginService.get_current_user_routers(request, current_user, query_db)
 
-    return ResponseUtil.success(data=user_routers)
+    return ResponseUtil.success_raw_data(data=user_routers)
 
 
 @loginController.post('/register', response_model=CrudResponseModel)
@@ -1,7 +1,7 @@
 from sqlalchemy import bindparam, func, or_, select, update  # noqa: F401
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.util import immutabledict
-from typing import List
+from typing import Dict, List
 from module_admin.entity.do.dept_do import SysDept
 from module_admin.entity.do.role_do import SysRoleDept  # noqa: F401
 from module_admin.entity.do.user_do import SysUser
@@ -67,6 +67,27 @@ class DeptDao:
 
         return dept_info
 
+    @classmethod
+    async def get_dept_name_map_dao(cls, db: AsyncSession, dept_id_list: List[int]) -> Dict[int, str]:
+        """
+        根据部门id列表批量获取部门名称
+
+        :param db: orm对象
+        :param dept_id_list: 部门id列表
+        :return: {部门id: 部门名称}
+        """
+        if not dept_id_list:
+            return {}
+        dept_rows = (
+            await db.execute(
+                select(SysDept.dept_id, SysDept.dept_name).where(
+                    SysDept.dept_id.in_(set(dept_id_list)), SysDept.del_flag == '0'
+                )
+            )
+        ).all()
+
+        return {row.dept_id: row.dept_name for row in dept_rows}
+
     @classmethod
     async def get_dept_info_for_edit_option(cls, db: AsyncSession, dept_info: DeptModel, data_scope_sql: str):
         """
@@ -22,6 +22,7 @@ class JobLogDao:
         :param is_page: 是否开启分页
         :return: 定时任务日志列表信息对象
         """
+        order_by_column = desc(SysJobLog.create_time)
         query = (
             select(SysJobLog)
             .where(
@@ -35,10 +36,22 @@ class JobLogDao:
                 if query_object.begin_time and query_object.end_time
                 else True,
             )
-            .order_by(desc(SysJobLog.create_time))
+            .order_by(order_by_column)
             .distinct()
         )
-        job_log_list = await PageUtil.paginate(db, query, query_object.page_num, query_object.page_size, is_page)
+        if is_page and query_object.cursor is not None:
+            return await PageUtil.seek_paginate(
+                db,
+                query,
+                order_by_column,
+                SysJobLog.job_log_id,
+                query_object.page_size,
+                query_object.cursor,
+                count_strategy='cached',
+            )
+        job_log_list = await PageUtil.paginate(
+            db, query, query_object.page_num, query_object.page_size, is_page, count_strategy='cached'
+        )
 
         return job_log_list
 
@@ -1,10 +1,21 @@
 from datetime import datetime, time
-from sqlalchemy import asc, delete, desc, select
+from sqlalchemy import asc, delete, desc, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from module_admin.entity.do.log_do import SysLogininfor, SysOperLog
-from module_admin.entity.vo.log_vo import LogininforModel, LoginLogPageQueryModel, OperLogModel, OperLogPageQueryModel
+from typing import Any, Dict, List
+from config.env import DataBaseConfig
+from module_admin.entity.do.log_do import SysLogininfor, SysOperLog, SysOperStat
+from module_admin.entity.vo.log_vo import (
+    LogininforModel,
+    LoginLogPageQueryModel,
+    OperLogModel,
+    OperLogPageQueryModel,
+    OperLogStatQueryModel,
+)
 from utils.common_util import SnakeCaseUtil
 from utils.page_util import PageUtil
+from utils.search_util import SearchUtil
 
 
 class OperationLogDao:
@@ -33,8 +44,8 @@ class OperationLogDao:
         query = (
             select(SysOperLog)
             .where(
-                SysOperLog.title.like(f'%{query_object.title}%') if query_object.title else True,
-                SysOperLog.oper_name.like(f'%{query_object.oper_name}%') if query_object.oper_name else True,
+                SearchUtil.contains(SysOperLog.title, query_object.title) if query_object.title else True,
+                SearchUtil.contains(SysOperLog.oper_name, query_object.oper_name) if query_object.oper_name else True,
                 SysOperLog.business_type == query_object.business_type if query_object.business_type else True,
                 SysOperLog.status == query_object.status if query_object.status else True,
                 SysOperLog.oper_time.between(
@@ -47,7 +58,34 @@ class OperationLogDao:
             .distinct()
             .order_by(order_by_column)
         )
-        operation_log_list = await PageUtil.paginate(db, query, query_object.page_num, query_object.page_size, is_page)
+        # 执行计划的行数估算对文本搜索、时间范围等过滤条件误差较大，仅在无过滤条件时估算，否则使用缓存的精确总数
+        count_strategy = (
+            'cached'
+            if query_object.title
+            or query_object.oper_name
+            or query_object.business_type
+            or query_object.status
+            or (query_object.begin_time and query_object.end_time)
+            else 'estimated'
+        )
+        # 游标翻页要求排序字段始终有值，只在按操作时间排序时使用，按其他可为空的字段排序时仍按页码翻页
+        if (
+            is_page
+            and query_object.cursor is not None
+            and getattr(order_by_column.element, 'key', None) == SysOperLog.oper_time.key
+        ):
+            return await PageUtil.seek_paginate(
+                db,
+                query,
+                order_by_column,
+                SysOperLog.oper_id,
+                query_object.page_size,
+                query_object.cursor,
+                count_strategy=count_strategy,
+            )
+        operation_log_list = await PageUtil.paginate(
+            db, query, query_object.page_num, query_object.page_size, is_page, count_strategy=count_strategy
+        )
 
         return operation_log_list
 
@@ -66,6 +104,19 @@ class OperationLogDao:
 
         return db_operation_log
 
+    @classmethod
+    async def batch_add_operation_log_dao(cls, db: AsyncSession, operation_log_list: List[OperLogModel]):
+        """
+        批量新增操作日志数据库操作，使用单条多行INSERT语句写入
+
+        :param db: orm对象
+        :param operation_log_list: 操作日志对象列表
+        :return:
+        """
+        await db.execute(
+            insert(SysOperLog), [operation_log.model_dump(exclude={'oper_id'}) for operation_log in operation_log_list]
+        )
+
     @classmethod
     async def delete_operation_log_dao(cls, db: AsyncSession, operation_log: OperLogModel):
         """
@@ -116,8 +167,10 @@ class LoginLogDao:
         query = (
             select(SysLogininfor)
             .where(
-                SysLogininfor.ipaddr.like(f'%{query_object.ipaddr}%') if query_object.ipaddr else True,
-                SysLogininfor.user_name.like(f'%{query_object.user_name}%') if query_object.user_name else True,
+                SearchUtil.contains(SysLogininfor.ipaddr, query_object.ipaddr) if query_object.ipaddr else True,
+                SearchUtil.contains(SysLogininfor.user_name, query_object.user_name)
+                if query_object.user_name
+                else True,
                 SysLogininfor.status == query_object.status if query_object.status else True,
                 SysLogininfor.login_time.between(
                     datetime.combine(datetime.strptime(query_object.begin_time, '%Y-%m-%d'), time(00, 00, 00)),
@@ -129,7 +182,33 @@ class LoginLogDao:
             .distinct()
             .order_by(order_by_column)
         )
-        login_log_list = await PageUtil.paginate(db, query, query_object.page_num, query_object.page_size, is_page)
+        # 与操作日志一致，仅在无过滤条件时估算总数
+        count_strategy = (
+            'cached'
+            if query_object.ipaddr
+            or query_object.user_name
+            or query_object.status
+            or (query_object.begin_time and query_object.end_time)
+            else 'estimated'
+        )
+        # 游标翻页要求排序字段始终有值，只在按访问时间排序时使用，按其他可为空的字段排序时仍按页码翻页
+        if (
+            is_page
+            and query_object.cursor is not None
+            and getattr(order_by_column.element, 'key', None) == SysLogininfor.login_time.key
+        ):
+            return await PageUtil.seek_paginate(
+                db,
+                query,
+                order_by_column,
+                SysLogininfor.info_id,
+                query_object.page_size,
+                query_object.cursor,
+                count_strategy=count_strategy,
+            )
+        login_log_list = await PageUtil.paginate(
+            db, query, query_object.page_num, query_object.page_size, is_page, count_strategy=count_strategy
+        )
 
         return login_log_list
 
@@ -148,6 +227,19 @@ class LoginLogDao:
 
         return db_login_log
 
+    @classmethod
+    async def batch_add_login_log_dao(cls, db: AsyncSession, login_log_list: List[LogininforModel]):
+        """
+        批量新增登录日志数据库操作，使用单条多行INSERT语句写入
+
+        :param db: orm对象
+        :param login_log_list: 登录日志对象列表
+        :return:
+        """
+        await db.execute(
+            insert(SysLogininfor), [login_log.model_dump(exclude={'info_id'}) for login_log in login_log_list]
+        )
+
     @classmethod
     async def delete_login_log_dao(cls, db: AsyncSession, login_log: LogininforModel):
         """
@@ -168,3 +260,75 @@ class LoginLogDao:
         :return:
         """
         await db.execute(delete(SysLogininfor))
+
+
+class OperationLogStatDao:
+    """
+    操作日志耗时统计模块数据库操作层
+    """
+
+    @classmethod
+    async def upsert_operation_log_stat_dao(cls, db: AsyncSession, stat_list: List[Dict[str, Any]]):
+        """
+        累加操作日志耗时统计数据库操作，统计行不存在时新增，已存在时在原值上累加
+
+        :param db: orm对象
+        :param stat_list: 统计行列表，需按主键排序以避免并发写入时死锁
+        :return:
+        """
+        table = SysOperStat.__table__
+        if DataBaseConfig.db_type == 'postgresql':
+            stmt = postgresql_insert(table)
+            new_values = stmt.excluded
+        else:
+            stmt = mysql_insert(table)
+            new_values = stmt.inserted
+        update_values = {
+            column.name: column + new_values[column.name]
+            for column in table.columns
+            if not column.primary_key and column.name != 'cost_time_max'
+        }
+        update_values['cost_time_max'] = func.greatest(table.c.cost_time_max, new_values.cost_time_max)
+        if DataBaseConfig.db_type == 'postgresql':
+            stmt = stmt.on_conflict_do_update(index_elements=list(table.primary_key.columns), set_=update_values)
+        else:
+            stmt = stmt.on_duplicate_key_update(update_values)
+        await db.execute(stmt, stat_list)
+
+    @classmethod
+    async def get_operation_log_stat_list(
+        cls, db: AsyncSession, query_object: OperLogStatQueryModel, begin_time: datetime, end_time: datetime
+    ):
+        """
+        根据查询参数按分组汇总操作日志耗时统计，只读取统计表，不扫描操作日志表
+
+        :param db: orm对象
+        :param query_object: 查询参数对象
+        :param begin_time: 开始时间
+        :param end_time: 结束时间（不含）
+        :return: 汇总结果，每行包含分组字段及各统计字段的合计
+        """
+        group_columns = {
+            'url': [SysOperStat.oper_url],
+            'business_type': [SysOperStat.business_type],
+        }.get(query_object.group_by, [])
+        sum_columns = [
+            func.sum(column).label(column.name)
+            for column in SysOperStat.__table__.columns
+            if not column.primary_key and column.name != 'cost_time_max'
+        ]
+        query = (
+            select(*group_columns, *sum_columns, func.max(SysOperStat.cost_time_max).label('cost_time_max'))
+            .where(
+                SysOperStat.stat_time >= begin_time,
+                SysOperStat.stat_time < end_time,
+                SysOperStat.oper_url == query_object.oper_url if query_object.oper_url else True,
+                SysOperStat.business_type == query_object.business_type
+                if query_object.business_type is not None
+                else True,
+            )
+            .group_by(*group_columns)
+        )
+        stat_list = (await db.execute(query)).mappings().all()
+
+        return stat_list
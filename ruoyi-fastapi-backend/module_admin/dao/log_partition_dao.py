@@ -0,0 +1,169 @@
+from datetime import datetime
+from sqlalchemy import Column, Table, delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from config.env import DataBaseConfig
+from utils.partition_util import PartitionUtil
+
+
+class LogPartitionDao:
+    """
+    日志分区管理模块数据库操作层
+    """
+
+    @classmethod
+    async def get_partition_list_dao(cls, db: AsyncSession, table_name: str) -> Optional[List[str]]:
+        """
+        获取表的分区名列表数据库操作
+
+        :param db: orm对象
+        :param table_name: 表名
+        :return: 分区名列表，表未分区时返回None
+        """
+        if DataBaseConfig.db_type == 'postgresql':
+            relkind = (
+                await db.execute(
+                    text('SELECT relkind FROM pg_class WHERE oid = to_regclass(:table_name)'),
+                    {'table_name': table_name},
+                )
+            ).scalar()
+            if relkind != 'p':
+                return None
+            child_names = (
+                await db.execute(
+                    text(
+                        'SELECT child.relname FROM pg_inherits '
+                        'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+                        'WHERE pg_inherits.inhparent = to_regclass(:table_name)'
+                    ),
+                    {'table_name': table_name},
+                )
+            ).scalars()
+            prefix = PartitionUtil.get_child_table_name(table_name, '')
+            return [name[len(prefix) :] for name in child_names if name.startswith(prefix)]
+        partition_names = (
+            await db.execute(
+                text(
+                    'SELECT partition_name FROM information_schema.partitions '
+                    'WHERE table_schema = DATABASE() AND table_name = :table_name AND partition_name IS NOT NULL'
+                ),
+                {'table_name': table_name},
+            )
+        ).scalars()
+        return list(partition_names) or None
+
+    @classmethod
+    async def add_partitions_dao(
+        cls,
+        db: AsyncSession,
+        table_name: str,
+        column_name: str,
+        partition_list: List[Tuple[str, datetime, datetime]],
+        has_default: bool,
+    ):
+        """
+        新增分区数据库操作
+
+        :param db: orm对象
+        :param table_name: 表名
+        :param column_name: 分区字段名
+        :param partition_list: (分区名, 分区起始时间, 分区结束时间)列表，需按时间升序排列
+        :param has_default: 是否存在默认分区
+        :return:
+        """
+        if DataBaseConfig.db_type == 'postgresql':
+            default_table = PartitionUtil.get_child_table_name(table_name, PartitionUtil.DEFAULT_PARTITION)
+            for partition_name, start, end in partition_list:
+                range_condition = (
+                    f"{column_name} >= '{start:%Y-%m-%d %H:%M:%S}' AND {column_name} < '{end:%Y-%m-%d %H:%M:%S}'"
+                )
+                create_partition = text(
+                    f'CREATE TABLE IF NOT EXISTS {PartitionUtil.get_child_table_name(table_name, partition_name)} '
+                    f"PARTITION OF {table_name} FOR VALUES FROM ('{start:%Y-%m-%d %H:%M:%S}') "
+                    f"TO ('{end:%Y-%m-%d %H:%M:%S}')"
+                )
+                if (
+                    not has_default
+                    or not (
+                        await db.execute(text(f'SELECT EXISTS (SELECT 1 FROM {default_table} WHERE {range_condition})'))
+                    ).scalar()
+                ):
+                    await db.execute(create_partition)
+                    continue
+                # 默认分区中已有新分区范围内的数据时PostgreSQL拒绝创建该分区，需先分离默认分区，创建分区后再将数据移回
+                await db.execute(text(f'ALTER TABLE {table_name} DETACH PARTITION {default_table}'))
+                await db.execute(create_partition)
+                await db.execute(
+                    text(f'INSERT INTO {table_name} SELECT * FROM {default_table} WHERE {range_condition}')
+                )
+                await db.execute(text(f'DELETE FROM {default_table} WHERE {range_condition}'))
+                await db.execute(text(f'ALTER TABLE {table_name} ATTACH PARTITION {default_table} DEFAULT'))
+            return
+        partition_definitions = ', '.join(
+            f"PARTITION {partition_name} VALUES LESS THAN ('{end:%Y-%m-%d %H:%M:%S}')"
+            for partition_name, _, end in partition_list
+        )
+        if has_default:
+            # MAXVALUE分区必须位于最后，新分区通过拆分MAXVALUE分区添加，MAXVALUE分区为空时只需修改元数据，
+            # 否则其中的数据随拆分移入对应的新分区
+            await db.execute(
+                text(
+                    f'ALTER TABLE {table_name} REORGANIZE PARTITION {PartitionUtil.DEFAULT_PARTITION} INTO '
+                    f'({partition_definitions}, '
+                    f'PARTITION {PartitionUtil.DEFAULT_PARTITION} VALUES LESS THAN (MAXVALUE))'
+                )
+            )
+        else:
+            await db.execute(text(f'ALTER TABLE {table_name} ADD PARTITION ({partition_definitions})'))
+
+    @classmethod
+    async def drop_partition_dao(cls, db: AsyncSession, table_name: str, partition_name: str):
+        """
+        删除分区数据库操作，直接删除分区对应的数据文件，耗时与分区数据量无关
+
+        :param db: orm对象
+        :param table_name: 表名
+        :param partition_name: 分区名
+        :return:
+        """
+        if DataBaseConfig.db_type == 'postgresql':
+            await db.execute(
+                text(f'DROP TABLE IF EXISTS {PartitionUtil.get_child_table_name(table_name, partition_name)}')
+            )
+        else:
+            await db.execute(text(f'ALTER TABLE {table_name} DROP PARTITION {partition_name}'))
+
+    @classmethod
+    async def truncate_partition_dao(cls, db: AsyncSession, table_name: str, partition_name: str):
+        """
+        清空分区数据库操作，只锁定该分区，耗时与分区数据量无关
+
+        :param db: orm对象
+        :param table_name: 表名
+        :param partition_name: 分区名
+        :return:
+        """
+        if DataBaseConfig.db_type == 'postgresql':
+            await db.execute(text(f'TRUNCATE TABLE {PartitionUtil.get_child_table_name(table_name, partition_name)}'))
+        else:
+            await db.execute(text(f'ALTER TABLE {table_name} TRUNCATE PARTITION {partition_name}'))
+
+    @classmethod
+    async def delete_expired_log_dao(
+        cls, db: AsyncSession, table: Table, time_column: Column, id_column: Column, end: datetime, batch_size: int
+    ) -> int:
+        """
+        分批删除过期日志数据库操作，用于未分区的日志表
+
+        :param db: orm对象
+        :param table: 日志表
+        :param time_column: 日志时间字段
+        :param id_column: 日志主键字段
+        :param end: 删除该时间之前的日志
+        :param batch_size: 每批删除的最大条数
+        :return: 本批删除的条数
+        """
+        # MySQL不支持在IN子查询中使用LIMIT，也不允许子查询直接引用被删除的表，因此包装为派生表
+        expired_ids = select(id_column).where(time_column < end).limit(batch_size).subquery()
+        result = await db.execute(delete(table).where(id_column.in_(select(expired_ids.c[id_column.name]))))
+        return result.rowcount
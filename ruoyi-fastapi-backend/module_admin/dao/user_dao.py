@@ -1,5 +1,5 @@
 from datetime import datetime, time
-from sqlalchemy import and_, delete, desc, func, or_, select, update
+from sqlalchemy import and_, delete, desc, func, literal_column, or_, select, union, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from module_admin.entity.do.dept_do import SysDept
 from module_admin.entity.do.menu_do import SysMenu
@@ -76,112 +76,109 @@ class UserDao:
         return query_user_info
 
     @classmethod
-    async def get_user_by_id(cls, db: AsyncSession, user_id: int):
+    async def __get_user_principal(cls, db: AsyncSession, user_id: int, active_only: bool, admin_all_menus: bool):
         """
-        根据user_id获取用户信息
+        查询用户基本信息、部门、角色、岗位及菜单信息
+
+        基本信息与部门合并为一条查询，角色、岗位及菜单的主键通过UNION合并后分别外连接对应表，合并为一条查询，
+        每行只有一个非空实体，超级管理员的菜单判断合并进菜单查询中，整体只需两次数据库往返
 
         :param db: orm对象
         :param user_id: 用户id
-        :return: 当前user_id的用户信息对象
-        """
-        query_user_basic_info = (
-            (
-                await db.execute(
-                    select(SysUser)
-                    .where(SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .distinct()
-                )
-            )
-            .scalars()
-            .first()
+        :param active_only: 是否只查询状态正常的用户
+        :param admin_all_menus: 超级管理员是否返回全部菜单
+        :return: 用户信息字典
+        """
+        user_conditions = [SysUser.del_flag == '0', SysUser.user_id == user_id]
+        if active_only:
+            user_conditions.append(SysUser.status == '0')
+        role_join_condition = and_(
+            SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'
         )
-        query_user_dept_info = (
-            (
-                await db.execute(
-                    select(SysDept)
-                    .select_from(SysUser)
-                    .where(SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(
-                        SysDept,
-                        and_(SysUser.dept_id == SysDept.dept_id, SysDept.status == '0', SysDept.del_flag == '0'),
-                    )
-                    .distinct()
+        user_dept_row = (
+            await db.execute(
+                select(SysUser, SysDept)
+                .where(*user_conditions)
+                .join(
+                    SysDept,
+                    and_(SysUser.dept_id == SysDept.dept_id, SysDept.status == '0', SysDept.del_flag == '0'),
+                    isouter=True,
                 )
             )
-            .scalars()
-            .first()
-        )
-        query_user_role_info = (
-            (
-                await db.execute(
-                    select(SysRole)
-                    .select_from(SysUser)
-                    .where(SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(SysUserRole, SysUser.user_id == SysUserRole.user_id, isouter=True)
-                    .join(
-                        SysRole,
-                        and_(SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'),
-                    )
-                    .distinct()
-                )
+        ).first()
+        if not user_dept_row:
+            return dict(
+                user_basic_info=None, user_dept_info=None, user_role_info=[], user_post_info=[], user_menu_info=[]
             )
-            .scalars()
-            .all()
+
+        role_ids = (
+            select(literal_column("'role'").label('item_type'), SysRole.role_id.label('item_id'))
+            .select_from(SysUser)
+            .where(*user_conditions)
+            .join(SysUserRole, SysUser.user_id == SysUserRole.user_id)
+            .join(SysRole, role_join_condition)
         )
-        query_user_post_info = (
-            (
-                await db.execute(
-                    select(SysPost)
-                    .select_from(SysUser)
-                    .where(SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(SysUserPost, SysUser.user_id == SysUserPost.user_id, isouter=True)
-                    .join(SysPost, and_(SysUserPost.post_id == SysPost.post_id, SysPost.status == '0'))
-                    .distinct()
-                )
-            )
-            .scalars()
-            .all()
+        post_ids = (
+            select(literal_column("'post'").label('item_type'), SysPost.post_id.label('item_id'))
+            .select_from(SysUser)
+            .where(*user_conditions)
+            .join(SysUserPost, SysUser.user_id == SysUserPost.user_id)
+            .join(SysPost, and_(SysUserPost.post_id == SysPost.post_id, SysPost.status == '0'))
+        )
+        role_menu_ids = (
+            select(SysRoleMenu.menu_id)
+            .select_from(SysUser)
+            .where(*user_conditions)
+            .join(SysUserRole, SysUser.user_id == SysUserRole.user_id)
+            .join(SysRole, role_join_condition)
+            .join(SysRoleMenu, SysRole.role_id == SysRoleMenu.role_id)
         )
-        role_id_list = [item.role_id for item in query_user_role_info]
-        if 1 in role_id_list:
-            query_user_menu_info = (
-                (await db.execute(select(SysMenu).where(SysMenu.status == '0').distinct())).scalars().all()
+        menu_condition = SysMenu.menu_id.in_(role_menu_ids)
+        if admin_all_menus:
+            is_admin = (
+                select(SysUser.user_id)
+                .where(*user_conditions)
+                .join(SysUserRole, SysUser.user_id == SysUserRole.user_id)
+                .join(SysRole, and_(role_join_condition, SysRole.role_id == 1))
+                .exists()
             )
-        else:
-            query_user_menu_info = (
-                (
-                    await db.execute(
-                        select(SysMenu)
-                        .select_from(SysUser)
-                        .where(SysUser.status == '0', SysUser.del_flag == '0', SysUser.user_id == user_id)
-                        .join(SysUserRole, SysUser.user_id == SysUserRole.user_id, isouter=True)
-                        .join(
-                            SysRole,
-                            and_(
-                                SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'
-                            ),
-                            isouter=True,
-                        )
-                        .join(SysRoleMenu, SysRole.role_id == SysRoleMenu.role_id, isouter=True)
-                        .join(SysMenu, and_(SysRoleMenu.menu_id == SysMenu.menu_id, SysMenu.status == '0'))
-                        .order_by(SysMenu.order_num)
-                        .distinct()
-                    )
-                )
-                .scalars()
-                .all()
+            menu_condition = or_(is_admin, menu_condition)
+        menu_ids = select(literal_column("'menu'").label('item_type'), SysMenu.menu_id.label('item_id')).where(
+            SysMenu.status == '0', menu_condition
+        )
+        # UNION同时去除用户通过多个角色关联到的重复菜单
+        items = union(role_ids, post_ids, menu_ids).subquery()
+        item_rows = (
+            await db.execute(
+                select(SysRole, SysPost, SysMenu)
+                .select_from(items)
+                .join(SysRole, and_(items.c.item_type == 'role', SysRole.role_id == items.c.item_id), isouter=True)
+                .join(SysPost, and_(items.c.item_type == 'post', SysPost.post_id == items.c.item_id), isouter=True)
+                .join(SysMenu, and_(items.c.item_type == 'menu', SysMenu.menu_id == items.c.item_id), isouter=True)
+                .order_by(SysMenu.order_num)
             )
-
+        ).all()
         results = dict(
-            user_basic_info=query_user_basic_info,
-            user_dept_info=query_user_dept_info,
-            user_role_info=query_user_role_info,
-            user_post_info=query_user_post_info,
-            user_menu_info=query_user_menu_info,
+            user_basic_info=user_dept_row[0],
+            user_dept_info=user_dept_row[1],
+            user_role_info=[row[0] for row in item_rows if row[0] is not None],
+            user_post_info=[row[1] for row in item_rows if row[1] is not None],
+            user_menu_info=[row[2] for row in item_rows if row[2] is not None],
         )
 
         return results
 
+    @classmethod
+    async def get_user_by_id(cls, db: AsyncSession, user_id: int):
+        """
+        根据user_id获取用户信息
+
+        :param db: orm对象
+        :param user_id: 用户id
+        :return: 当前user_id的用户信息对象
+        """
+        return await cls.__get_user_principal(db, user_id, active_only=True, admin_all_menus=True)
+
     @classmethod
     async def get_user_detail_by_id(cls, db: AsyncSession, user_id: int):
         """
@@ -191,87 +188,7 @@ class UserDao:
         :param user_id: 用户id
         :return: 当前user_id的用户信息对象
         """
-        query_user_basic_info = (
-            (await db.execute(select(SysUser).where(SysUser.del_flag == '0', SysUser.user_id == user_id).distinct()))
-            .scalars()
-            .first()
-        )
-        query_user_dept_info = (
-            (
-                await db.execute(
-                    select(SysDept)
-                    .select_from(SysUser)
-                    .where(SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(
-                        SysDept,
-                        and_(SysUser.dept_id == SysDept.dept_id, SysDept.status == '0', SysDept.del_flag == '0'),
-                    )
-                    .distinct()
-                )
-            )
-            .scalars()
-            .first()
-        )
-        query_user_role_info = (
-            (
-                await db.execute(
-                    select(SysRole)
-                    .select_from(SysUser)
-                    .where(SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(SysUserRole, SysUser.user_id == SysUserRole.user_id, isouter=True)
-                    .join(
-                        SysRole,
-                        and_(SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'),
-                    )
-                    .distinct()
-                )
-            )
-            .scalars()
-            .all()
-        )
-        query_user_post_info = (
-            (
-                await db.execute(
-                    select(SysPost)
-                    .select_from(SysUser)
-                    .where(SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(SysUserPost, SysUser.user_id == SysUserPost.user_id, isouter=True)
-                    .join(SysPost, and_(SysUserPost.post_id == SysPost.post_id, SysPost.status == '0'))
-                    .distinct()
-                )
-            )
-            .scalars()
-            .all()
-        )
-        query_user_menu_info = (
-            (
-                await db.execute(
-                    select(SysMenu)
-                    .select_from(SysUser)
-                    .where(SysUser.del_flag == '0', SysUser.user_id == user_id)
-                    .join(SysUserRole, SysUser.user_id == SysUserRole.user_id, isouter=True)
-                    .join(
-                        SysRole,
-                        and_(SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'),
-                        isouter=True,
-                    )
-                    .join(SysRoleMenu, SysRole.role_id == SysRoleMenu.role_id, isouter=True)
-                    .join(SysMenu, and_(SysRoleMenu.menu_id == SysMenu.menu_id, SysMenu.status == '0'))
-                    .distinct()
-                )
-            )
-            .scalars()
-            .all()
-        )
-        results = dict(
-            user_basic_info=query_user_basic_info,
-            user_dept_info=query_user_dept_info,
-            user_role_info=query_user_role_info,
-            user_post_info=query_user_post_info,
-            user_menu_info=query_user_menu_info,
-        )
-
-        return results
+        return await cls.__get_user_principal(db, user_id, active_only=False, admin_all_menus=False)
 
     @classmethod
     async def get_user_list(
@@ -1,6 +1,7 @@
 from datetime import datetime
 from sqlalchemy import Column, DateTime, Integer, String
 from config.database import Base
+from utils.partition_util import PartitionUtil
 
 
 class SysJob(Base):
@@ -39,6 +40,7 @@ class SysJobLog(Base):
     """
 
     __tablename__ = 'sys_job_log'
+    __table_args__ = PartitionUtil.get_table_kwargs('create_time')
 
     job_log_id = Column(Integer, primary_key=True, autoincrement=True, comment='任务日志ID')
     job_name = Column(String(64), nullable=False, comment='任务名称')
@@ -51,4 +53,8 @@ class SysJobLog(Base):
     job_message = Column(String(500), nullable=True, default='', comment='日志信息')
     status = Column(String(1), nullable=True, default='0', comment='执行状态（0正常 1失败）')
     exception_info = Column(String(2000), nullable=True, default='', comment='异常信息')
-    create_time = Column(DateTime, nullable=True, default=datetime.now(), comment='创建时间')
+    # 启用分区时创建时间为分区字段，分区表的主键需包含分区字段
+    create_time = Column(DateTime, primary_key=PartitionUtil.enabled, default=datetime.now, comment='创建时间')
+
+
+PartitionUtil.register_partition_ddl(SysJobLog.__table__, 'create_time')
@@ -1,6 +1,26 @@
 from datetime import datetime
-from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+from sqlalchemy import DDL, BigInteger, Column, DateTime, Index, Integer, String, event
 from config.database import Base
+from utils.partition_util import PartitionUtil
+
+
+def search_index(name: str, column) -> Index:
+    """
+    文本搜索索引，MySQL使用ngram分词的全文索引，PostgreSQL使用pg_trgm的GIN索引，用于子串搜索
+    MySQL的分区表不支持全文索引，启用日志表分区时只在PostgreSQL下创建
+
+    :param name: 索引名称
+    :param column: 索引字段
+    :return: 索引对象
+    """
+    return Index(
+        name,
+        column,
+        mysql_prefix='FULLTEXT',
+        mysql_with_parser='ngram',
+        postgresql_using='gin',
+        postgresql_ops={column.key: 'gin_trgm_ops'},
+    ).ddl_if(dialect='postgresql' if PartitionUtil.enabled else ('mysql', 'postgresql'))
 
 
 class SysLogininfor(Base):
@@ -9,6 +29,7 @@ class SysLogininfor(Base):
     """
 
     __tablename__ = 'sys_logininfor'
+    __table_args__ = PartitionUtil.get_table_kwargs('login_time')
 
     info_id = Column(Integer, primary_key=True, autoincrement=True, comment='访问ID')
     user_name = Column(String(50), nullable=True, default='', comment='用户账号')
@@ -18,7 +39,8 @@ class SysLogininfor(Base):
     os = Column(String(50), nullable=True, default='', comment='操作系统')
     status = Column(String(1), nullable=True, default='0', comment='登录状态（0成功 1失败）')
     msg = Column(String(255), nullable=True, default='', comment='提示消息')
-    login_time = Column(DateTime, nullable=True, default=datetime.now(), comment='访问时间')
+    # 启用分区时访问时间为分区字段，分区表的主键需包含分区字段
+    login_time = Column(DateTime, primary_key=PartitionUtil.enabled, default=datetime.now, comment='访问时间')
 
     idx_sys_logininfor_s = Index('idx_sys_logininfor_s', status)
     idx_sys_logininfor_lt = Index('idx_sys_logininfor_lt', login_time)
@@ -30,6 +52,7 @@ class SysOperLog(Base):
     """
 
     __tablename__ = 'sys_oper_log'
+    __table_args__ = PartitionUtil.get_table_kwargs('oper_time')
 
     oper_id = Column(BigInteger, primary_key=True, autoincrement=True, comment='日志主键')
     title = Column(String(50), nullable=True, default='', comment='模块标题')
@@ -46,9 +69,57 @@ class SysOperLog(Base):
     json_result = Column(String(2000), nullable=True, default='', comment='返回参数')
     status = Column(Integer, default=0, comment='操作状态（0正常 1异常）')
     error_msg = Column(String(2000), nullable=True, default='', comment='错误消息')
-    oper_time = Column(DateTime, nullable=True, default=datetime.now(), comment='操作时间')
-    cost_time = Column(BigInteger, default=0, comment='消耗时间')
+    # 启用分区时操作时间为分区字段，分区表的主键需包含分区字段
+    oper_time = Column(DateTime, primary_key=PartitionUtil.enabled, default=datetime.now, comment='操作时间')
+    cost_time = Column(BigInteger, default=0, comment='消耗时间（毫秒）')
 
     idx_sys_oper_log_bt = Index('idx_sys_oper_log_bt', business_type)
     idx_sys_oper_log_s = Index('idx_sys_oper_log_s', status)
     idx_sys_oper_log_ot = Index('idx_sys_oper_log_ot', oper_time)
+
+
+class SysOperStat(Base):
+    """
+    操作日志耗时统计表，按分钟、请求路由及业务类型汇总，耗时按固定区间计数用于估算分位数
+    """
+
+    __tablename__ = 'sys_oper_stat'
+
+    stat_time = Column(DateTime, primary_key=True, comment='统计时间（精确到分钟）')
+    oper_url = Column(String(255), primary_key=True, comment='请求路由')
+    business_type = Column(Integer, primary_key=True, comment='业务类型（0其它 1新增 2修改 3删除）')
+    request_count = Column(BigInteger, default=0, comment='请求次数')
+    error_count = Column(BigInteger, default=0, comment='异常次数')
+    cost_time_sum = Column(BigInteger, default=0, comment='总耗时（毫秒）')
+    cost_time_max = Column(BigInteger, default=0, comment='最大耗时（毫秒）')
+    bucket_5 = Column(BigInteger, default=0, comment='耗时不超过5毫秒的请求次数')
+    bucket_10 = Column(BigInteger, default=0, comment='耗时5-10毫秒的请求次数')
+    bucket_25 = Column(BigInteger, default=0, comment='耗时10-25毫秒的请求次数')
+    bucket_50 = Column(BigInteger, default=0, comment='耗时25-50毫秒的请求次数')
+    bucket_100 = Column(BigInteger, default=0, comment='耗时50-100毫秒的请求次数')
+    bucket_250 = Column(BigInteger, default=0, comment='耗时100-250毫秒的请求次数')
+    bucket_500 = Column(BigInteger, default=0, comment='耗时250-500毫秒的请求次数')
+    bucket_1000 = Column(BigInteger, default=0, comment='耗时500-1000毫秒的请求次数')
+    bucket_2500 = Column(BigInteger, default=0, comment='耗时1000-2500毫秒的请求次数')
+    bucket_5000 = Column(BigInteger, default=0, comment='耗时2500-5000毫秒的请求次数')
+    bucket_10000 = Column(BigInteger, default=0, comment='耗时5000-10000毫秒的请求次数')
+    bucket_inf = Column(BigInteger, default=0, comment='耗时超过10000毫秒的请求次数')
+
+
+# 文本搜索索引需要在字段绑定到表之后创建，以便按字段名指定PostgreSQL的索引操作符类
+search_index('idx_sys_logininfor_un_search', SysLogininfor.user_name)
+search_index('idx_sys_logininfor_ip_search', SysLogininfor.ipaddr)
+search_index('idx_sys_oper_log_t_search', SysOperLog.title)
+search_index('idx_sys_oper_log_on_search', SysOperLog.oper_name)
+
+PartitionUtil.register_partition_ddl(SysLogininfor.__table__, 'login_time')
+PartitionUtil.register_partition_ddl(SysOperLog.__table__, 'oper_time')
+
+for search_table in (SysLogininfor.__table__, SysOperLog.__table__):
+    # ngram分词的全文索引需关闭停用词，否则包含停用词（如单个字母a、i）的分词不会被索引
+    event.listen(
+        search_table, 'before_create', DDL('SET SESSION innodb_ft_enable_stopword = 0').execute_if(dialect='mysql')
+    )
+    event.listen(
+        search_table, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+    )
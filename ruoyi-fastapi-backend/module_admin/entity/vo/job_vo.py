@@ -122,6 +122,9 @@ class JobLogPageQueryModel(JobLogQueryModel):
 
     page_num: int = Field(default=1, description='当前页码')
     page_size: int = Field(default=10, description='每页记录数')
+    cursor: Optional[str] = Field(
+        default=None, description='分页游标，传入时按游标翻页（空字符串表示第一页），不传时按页码翻页'
+    )
 
 
 class DeleteJobLogModel(BaseModel):
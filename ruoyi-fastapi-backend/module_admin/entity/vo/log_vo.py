@@ -34,7 +34,10 @@ class OperLogModel(BaseModel):
     status: Optional[Literal[0, 1, '0', '1']] = Field(default=None, description='操作状态（0正常 1异常）')
     error_msg: Optional[str] = Field(default=None, description='错误消息')
     oper_time: Optional[datetime] = Field(default=None, description='操作时间')
-    cost_time: Optional[int] = Field(default=None, description='消耗时间')
+    cost_time: Optional[int] = Field(default=None, description='消耗时间（毫秒）')
+    route_path: Optional[str] = Field(
+        default=None, exclude=True, description='请求路由（路径参数未替换），仅用于耗时统计，不写入日志表'
+    )
 
 
 class LogininforModel(BaseModel):
@@ -76,6 +79,9 @@ class OperLogPageQueryModel(OperLogQueryModel):
 
     page_num: int = Field(default=1, description='当前页码')
     page_size: int = Field(default=10, description='每页记录数')
+    cursor: Optional[str] = Field(
+        default=None, description='分页游标，传入时按游标翻页（空字符串表示第一页），不传时按页码翻页'
+    )
 
 
 class DeleteOperLogModel(BaseModel):
@@ -88,6 +94,41 @@ class DeleteOperLogModel(BaseModel):
     oper_ids: str = Field(description='需要删除的日志主键')
 
 
+@as_query
+class OperLogStatQueryModel(BaseModel):
+    """
+    操作日志耗时统计查询模型
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel)
+
+    begin_time: Optional[datetime] = Field(default=None, description='开始时间，默认为结束时间前1小时')
+    end_time: Optional[datetime] = Field(default=None, description='结束时间（不含），默认为当前时间')
+    oper_url: Optional[str] = Field(default=None, description='请求路由')
+    business_type: Optional[int] = Field(default=None, description='业务类型')
+    group_by: Literal['url', 'business_type', 'all'] = Field(
+        default='url', description='分组方式（url按请求路由 business_type按业务类型 all汇总全部请求）'
+    )
+
+
+class OperLogStatModel(BaseModel):
+    """
+    操作日志耗时统计结果模型
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel)
+
+    oper_url: Optional[str] = Field(default=None, description='请求路由')
+    business_type: Optional[int] = Field(default=None, description='业务类型')
+    request_count: int = Field(default=0, description='请求次数')
+    error_count: int = Field(default=0, description='异常次数')
+    avg_cost_time: float = Field(default=0, description='平均耗时（毫秒）')
+    max_cost_time: int = Field(default=0, description='最大耗时（毫秒）')
+    p50: float = Field(default=0, description='耗时50分位数（毫秒）')
+    p95: float = Field(default=0, description='耗时95分位数（毫秒）')
+    p99: float = Field(default=0, description='耗时99分位数（毫秒）')
+
+
 class LoginLogQueryModel(LogininforModel):
     """
     登录日志管理不分页查询模型
@@ -109,6 +150,9 @@ class LoginLogPageQueryModel(LoginLogQueryModel):
 
     page_num: int = Field(default=1, description='当前页码')
     page_size: int = Field(default=10, description='每页记录数')
+    cursor: Optional[str] = Field(
+        default=None, description='分页游标，传入时按游标翻页（空字符串表示第一页），不传时按页码翻页'
+    )
 
 
 class DeleteLoginLogModel(BaseModel):
@@ -1,9 +1,10 @@
 import re
 from datetime import datetime
+from functools import cached_property
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from pydantic.alias_generators import to_camel
 from pydantic_validation_decorator import Network, NotBlank, Size, Xss
-from typing import List, Literal, Optional, Union
+from typing import FrozenSet, List, Literal, Optional, Union
 from exceptions.exception import ModelValidatorException
 from module_admin.annotation.pydantic_annotation import as_query
 from module_admin.entity.vo.dept_vo import DeptModel
@@ -126,6 +127,22 @@ class CurrentUserModel(BaseModel):
     roles: List = Field(description='角色信息')
     user: Union[UserInfoModel, None] = Field(description='用户信息')
 
+    @cached_property
+    def permission_set(self) -> FrozenSet[str]:
+        """
+        权限标识集合，随当前用户对象缓存，供接口鉴权使用
+        """
+        return frozenset(self.permissions)
+
+    @cached_property
+    def role_key_set(self) -> FrozenSet[str]:
+        """
+        角色标识集合，随当前用户对象缓存，供接口鉴权使用
+        """
+        if not self.user or not self.user.role:
+            return frozenset()
+        return frozenset(role.role_key for role in self.user.role if role)
+
 
 class UserDetailModel(BaseModel):
     """
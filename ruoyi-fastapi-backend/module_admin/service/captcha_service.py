@@ -3,6 +3,9 @@ import io
 import os
 import random
 from PIL import Image, ImageDraw, ImageFont
+from typing import Dict, Optional
+from utils.executor_util import ExecutorUtil
+from utils.log_util import logger
 
 
 class CaptchaService:
@@ -10,23 +13,80 @@ class CaptchaService:
     验证码模块服务层
     """
 
+    # 验证码为两个0-9之间的整数进行四则运算，全部表达式只有300种，应用启动时预先渲染，请求时直接取用
+    operational_character_list = ['+', '-', '*']
+    _font: Optional[ImageFont.FreeTypeFont] = None
+    _images: Dict[str, str] = {}
+
     @classmethod
-    async def create_captcha_image_service(cls):
+    def get_font(cls) -> ImageFont.FreeTypeFont:
+        """
+        获取验证码字体，字体文件只加载一次
+
+        :return: 字体对象
+        """
+        if cls._font is None:
+            cls._font = ImageFont.truetype(
+                os.path.join(os.path.abspath(os.getcwd()), 'assets', 'font', 'Arial.ttf'), size=30
+            )
+        return cls._font
+
+    @classmethod
+    def render_captcha_image(cls, text: str) -> str:
+        """
+        渲染验证码图片
+
+        :param text: 验证码文本
+        :return: 验证码图片的base64字符串
+        """
         # 创建空白图像
         image = Image.new('RGB', (160, 60), color='#EAEAEA')
 
         # 创建绘图对象
         draw = ImageDraw.Draw(image)
 
-        # 设置字体
-        font = ImageFont.truetype(os.path.join(os.path.abspath(os.getcwd()), 'assets', 'font', 'Arial.ttf'), size=30)
+        # 绘制文本
+        draw.text((25, 15), text, fill='blue', font=cls.get_font())
+
+        # 将图像数据保存到内存中
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+
+        # 将图像数据转换为base64字符串
+        return base64.b64encode(buffer.getvalue()).decode()
+
+    @classmethod
+    def render_all_captcha_images(cls):
+        """
+        渲染全部验证码表达式的图片
+
+        :return:
+        """
+        for num1 in range(10):
+            for num2 in range(10):
+                for operational_character in cls.operational_character_list:
+                    text = f'{num1} {operational_character} {num2} = ?'
+                    if text not in cls._images:
+                        cls._images[text] = cls.render_captcha_image(text)
+
+    @classmethod
+    async def init_captcha_images(cls):
+        """
+        应用启动时在线程池中预先渲染全部验证码图片
 
+        :return:
+        """
+        logger.info('开始渲染验证码图片...')
+        await ExecutorUtil.run_io(cls.render_all_captcha_images)
+        logger.info(f'验证码图片渲染完成，共{len(cls._images)}张')
+
+    @classmethod
+    async def create_captcha_image_service(cls):
         # 生成两个0-9之间的随机整数
         num1 = random.randint(0, 9)
         num2 = random.randint(0, 9)
         # 从运算符列表中随机选择一个
-        operational_character_list = ['+', '-', '*']
-        operational_character = random.choice(operational_character_list)
+        operational_character = random.choice(cls.operational_character_list)
         # 根据选择的运算符进行计算
         if operational_character == '+':
             result = num1 + num2
@@ -34,15 +94,11 @@ class CaptchaService:
             result = num1 - num2
         else:
             result = num1 * num2
-        # 绘制文本
         text = f'{num1} {operational_character} {num2} = ?'
-        draw.text((25, 15), text, fill='blue', font=font)
-
-        # 将图像数据保存到内存中
-        buffer = io.BytesIO()
-        image.save(buffer, format='PNG')
-
-        # 将图像数据转换为base64字符串
-        base64_string = base64.b64encode(buffer.getvalue()).decode()
+        # 未预先渲染时（如启动预渲染尚未完成）在线程池中渲染并缓存
+        base64_string = cls._images.get(text)
+        if base64_string is None:
+            base64_string = await ExecutorUtil.run_io(cls.render_captcha_image, text)
+            cls._images[text] = base64_string
 
         return [base64_string, result]
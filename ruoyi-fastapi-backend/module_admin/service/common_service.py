@@ -1,5 +1,4 @@
 import os
-from datetime import datetime
 from fastapi import BackgroundTasks, Request, UploadFile
 from config.env import UploadConfig
 from exceptions.exception import ServiceException
@@ -24,26 +23,18 @@ class CommonService:
         if not UploadUtil.check_file_extension(file):
             raise ServiceException(message='文件类型不合法')
         else:
-            relative_path = f'upload/{datetime.now().strftime("%Y")}/{datetime.now().strftime("%m")}/{datetime.now().strftime("%d")}'
-            dir_path = os.path.join(UploadConfig.UPLOAD_PATH, relative_path)
-            try:
-                os.makedirs(dir_path)
-            except FileExistsError:
-                pass
-            filename = f'{file.filename.rsplit(".", 1)[0]}_{datetime.now().strftime("%Y%m%d%H%M%S")}{UploadConfig.UPLOAD_MACHINE}{UploadUtil.generate_random_number()}.{file.filename.rsplit(".")[-1]}'
-            filepath = os.path.join(dir_path, filename)
-            with open(filepath, 'wb') as f:
-                # 流式写出大型文件，这里的10代表10MB
-                for chunk in iter(lambda: file.file.read(1024 * 1024 * 10), b''):
-                    f.write(chunk)
+            relative_path = UploadUtil.gen_file_path('upload', file.filename)
+            filename = relative_path.rsplit('/', 1)[-1]
+            # 在阻塞IO线程池中流式写出大型文件
+            file_name = await UploadUtil.save_upload_file(file, relative_path)
 
             return CrudResponseModel(
                 is_success=True,
                 result=UploadResponseModel(
-                    fileName=f'{UploadConfig.UPLOAD_PREFIX}/{relative_path}/{filename}',
+                    fileName=file_name,
                     newFileName=filename,
                     originalFilename=file.filename,
-                    url=f'{request.base_url}{UploadConfig.UPLOAD_PREFIX[1:]}/{relative_path}/{filename}',
+                    url=f'{request.base_url}{UploadConfig.UPLOAD_PREFIX[1:]}/{relative_path}',
                 ),
                 message='上传成功',
             )
@@ -8,6 +8,7 @@ from module_admin.dao.config_dao import ConfigDao
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.config_vo import ConfigModel, ConfigPageQueryModel, DeleteConfigModel
 from utils.common_util import CamelCaseUtil, export_list2excel
+from utils.ip_util import IpBlacklistUtil
 
 
 class ConfigService:
@@ -51,6 +52,16 @@ class ConfigService:
                 f"{RedisInitKeyConfig.SYS_CONFIG.key}:{config_obj.get('configKey')}",
                 config_obj.get('configValue'),
             )
+        IpBlacklistUtil.rebuild(
+            next(
+                (
+                    config_obj.get('configValue')
+                    for config_obj in config_all
+                    if config_obj.get('configKey') == IpBlacklistUtil.CONFIG_KEY
+                ),
+                None,
+            )
+        )
 
     @classmethod
     async def query_config_list_from_cache_services(cls, redis, config_key: str):
@@ -99,6 +110,8 @@ class ConfigService:
                 await request.app.state.redis.set(
                     f'{RedisInitKeyConfig.SYS_CONFIG.key}:{page_object.config_key}', page_object.config_value
                 )
+                if page_object.config_key == IpBlacklistUtil.CONFIG_KEY:
+                    IpBlacklistUtil.rebuild(page_object.config_value)
                 return CrudResponseModel(is_success=True, message='新增成功')
             except Exception as e:
                 await query_db.rollback()
@@ -130,6 +143,10 @@ class ConfigService:
                     await request.app.state.redis.set(
                         f'{RedisInitKeyConfig.SYS_CONFIG.key}:{page_object.config_key}', page_object.config_value
                     )
+                    if page_object.config_key == IpBlacklistUtil.CONFIG_KEY:
+                        IpBlacklistUtil.rebuild(page_object.config_value)
+                    elif config_info.config_key == IpBlacklistUtil.CONFIG_KEY:
+                        IpBlacklistUtil.rebuild(None)
                     return CrudResponseModel(is_success=True, message='更新成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -161,6 +178,8 @@ class ConfigService:
                 await query_db.commit()
                 if delete_config_key_list:
                     await request.app.state.redis.delete(*delete_config_key_list)
+                if f'{RedisInitKeyConfig.SYS_CONFIG.key}:{IpBlacklistUtil.CONFIG_KEY}' in delete_config_key_list:
+                    IpBlacklistUtil.rebuild(None)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -1,10 +1,14 @@
+from fastapi import Request
+from operator import attrgetter
 from sqlalchemy.ext.asyncio import AsyncSession
 from config.constant import CommonConstant
 from exceptions.exception import ServiceException, ServiceWarning
 from module_admin.dao.dept_dao import DeptDao
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.dept_vo import DeleteDeptModel, DeptModel
+from utils.cache_util import PrincipalCacheUtil
 from utils.common_util import CamelCaseUtil
+from utils.tree_util import TreeUtil
 
 
 class DeptService:
@@ -114,10 +118,11 @@ class DeptService:
             raise e
 
     @classmethod
-    async def edit_dept_services(cls, query_db: AsyncSession, page_object: DeptModel):
+    async def edit_dept_services(cls, request: Request, query_db: AsyncSession, page_object: DeptModel):
         """
         编辑部门信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑部门对象
         :return: 编辑部门校验结果
@@ -148,16 +153,18 @@ class DeptService:
             ):
                 await cls.update_parent_dept_status_normal(query_db, page_object)
             await query_db.commit()
+            await PrincipalCacheUtil.bump_all(request.app.state.redis)
             return CrudResponseModel(is_success=True, message='更新成功')
         except Exception as e:
             await query_db.rollback()
             raise e
 
     @classmethod
-    async def delete_dept_services(cls, query_db: AsyncSession, page_object: DeleteDeptModel):
+    async def delete_dept_services(cls, request: Request, query_db: AsyncSession, page_object: DeleteDeptModel):
         """
         删除部门信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除部门对象
         :return: 删除部门校验结果
@@ -173,6 +180,7 @@ class DeptService:
 
                     await DeptDao.delete_dept_dao(query_db, DeptModel(deptId=dept_id))
                 await query_db.commit()
+                await PrincipalCacheUtil.bump_all(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -205,28 +213,12 @@ class DeptService:
         :param permission_list: 部门列表信息
         :return: 部门树形嵌套数据
         """
-        permission_list = [
-            dict(id=item.dept_id, label=item.dept_name, parentId=item.parent_id) for item in permission_list
-        ]
-        # 转成id为key的字典
-        mapping: dict = dict(zip([i['id'] for i in permission_list], permission_list))
-
-        # 树容器
-        container: list = []
-
-        for d in permission_list:
-            # 如果找不到父级项，则是根节点
-            parent: dict = mapping.get(d['parentId'])
-            if parent is None:
-                container.append(d)
-            else:
-                children: list = parent.get('children')
-                if not children:
-                    children = []
-                children.append(d)
-                parent.update({'children': children})
-
-        return container
+        return TreeUtil.build_tree(
+            permission_list,
+            get_id=attrgetter('dept_id'),
+            get_parent_id=attrgetter('parent_id'),
+            node_factory=lambda item: {'id': item.dept_id, 'label': item.dept_name, 'parentId': item.parent_id},
+        )
 
     @classmethod
     async def replace_first(cls, original_str: str, old_str: str, new_str: str):
@@ -3,9 +3,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from module_admin.dao.job_log_dao import JobLogDao
+from module_admin.entity.do.job_do import SysJobLog
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.job_vo import DeleteJobLogModel, JobLogModel, JobLogPageQueryModel
 from module_admin.service.dict_service import DictDataService
+from module_admin.service.log_partition_service import LogPartitionService
 from utils.common_util import export_list2excel
 
 
@@ -81,8 +83,10 @@ class JobLogService:
         :return: 清除定时任务日志校验结果
         """
         try:
-            await JobLogDao.clear_job_log_dao(query_db)
-            await query_db.commit()
+            # 已分区的表逐个清空分区，未分区的表在事务中删除
+            if not await LogPartitionService.clear_log_partitions_services(query_db, SysJobLog.__tablename__):
+                await JobLogDao.clear_job_log_dao(query_db)
+                await query_db.commit()
             result = dict(is_success=True, message='清除成功')
         except Exception as e:
             await query_db.rollback()
@@ -0,0 +1,296 @@
+import asyncio
+import csv
+import gzip
+import os
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import Column, Table, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, TextIO, Tuple
+from config.database import AsyncSessionLocal
+from config.env import AppConfig, DataBaseConfig
+from module_admin.dao.log_partition_dao import LogPartitionDao
+from module_admin.entity.do.job_do import SysJobLog
+from module_admin.entity.do.log_do import SysLogininfor, SysOperLog
+from utils.executor_util import ExecutorUtil
+from utils.log_util import logger
+from utils.partition_util import PartitionUtil
+
+
+class LogPartitionService:
+    """
+    日志分区管理模块服务层
+    """
+
+    # (日志表, 分区字段, 主键字段)
+    log_table_list: List[Tuple[Table, Column, Column]] = [
+        (SysOperLog.__table__, SysOperLog.__table__.c.oper_time, SysOperLog.__table__.c.oper_id),
+        (SysLogininfor.__table__, SysLogininfor.__table__.c.login_time, SysLogininfor.__table__.c.info_id),
+        (SysJobLog.__table__, SysJobLog.__table__.c.create_time, SysJobLog.__table__.c.job_log_id),
+    ]
+    batch_size = 5000
+    # 后台预建分区任务的检查间隔（单位：秒），远小于分区周期，应用长期运行时也不会耗尽预建的分区
+    premake_interval_seconds = 6 * 3600
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def init_log_partitions(cls):
+        """
+        应用启动时创建日志表的后续分区
+
+        :return:
+        """
+        async with AsyncSessionLocal() as session:
+            await cls.create_log_partitions_services(session)
+
+    @classmethod
+    async def start(cls):
+        """
+        应用启动时创建后台预建分区任务，预建分区不依赖可暂停的日志保留清理任务
+
+        :return:
+        """
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._task = asyncio.create_task(cls.__run())
+
+    @classmethod
+    async def stop(cls):
+        """
+        应用关闭时停止后台预建分区任务
+
+        :return:
+        """
+        if cls._task is None:
+            return
+        cls._task.cancel()
+        try:
+            await cls._task
+        except asyncio.CancelledError:
+            pass
+        cls._task = None
+
+    @classmethod
+    async def __run(cls):
+        """
+        后台预建分区任务主循环
+
+        :return:
+        """
+        while True:
+            await asyncio.sleep(cls.premake_interval_seconds)
+            try:
+                await cls.init_log_partitions()
+            except Exception as e:
+                logger.warning(f'预建日志表分区失败：{e}')
+
+    @classmethod
+    async def purge_log_services(cls) -> Dict[str, int]:
+        """
+        归档并删除超过保留天数的日志，由日志保留清理任务调用
+
+        :return: 各日志表删除的分区数或日志条数
+        """
+        async with AsyncSessionLocal() as session:
+            return await cls.purge_expired_log_services(session)
+
+    @classmethod
+    async def create_log_partitions_services(cls, query_db: AsyncSession):
+        """
+        为已分区的日志表预先创建当前及后续app_log_partition_premake个周期的分区
+
+        :param query_db: orm对象
+        :return:
+        """
+        period_start = PartitionUtil.get_period_start(datetime.now())
+        target_end = period_start
+        for _ in range(AppConfig.app_log_partition_premake + 1):
+            target_end = PartitionUtil.get_next_period_start(target_end)
+        for table, time_column, _ in cls.log_table_list:
+            try:
+                partition_names = await LogPartitionDao.get_partition_list_dao(query_db, table.name)
+                if partition_names is None:
+                    continue
+                partition_ends = [
+                    bounds[1] for bounds in map(PartitionUtil.parse_partition_name, partition_names) if bounds
+                ]
+                start = max(max(partition_ends), period_start) if partition_ends else period_start
+                partition_list = []
+                while start < target_end:
+                    end = PartitionUtil.get_next_period_start(start)
+                    partition_list.append((PartitionUtil.get_partition_name(start), start, end))
+                    start = end
+                if partition_list:
+                    await LogPartitionDao.add_partitions_dao(
+                        query_db,
+                        table.name,
+                        time_column.name,
+                        partition_list,
+                        PartitionUtil.DEFAULT_PARTITION in partition_names,
+                    )
+                    await query_db.commit()
+                    logger.info(f'{table.name}新增分区{",".join(item[0] for item in partition_list)}')
+            except Exception as e:
+                await query_db.rollback()
+                logger.warning(f'{table.name}创建分区失败：{e}')
+
+    @classmethod
+    async def purge_expired_log_services(cls, query_db: AsyncSession) -> Dict[str, int]:
+        """
+        归档并删除超过app_log_retention_days的日志，已分区的表整个分区删除，未分区的表分批删除，
+        已分区的表中仍有过期日志（如落入PostgreSQL默认分区的日志）时同样分批删除
+
+        :param query_db: orm对象
+        :return: 各日志表删除的分区数或日志条数
+        """
+        result = {}
+        if AppConfig.app_log_retention_days <= 0:
+            return result
+        cutoff = datetime.combine(date.today() - timedelta(days=AppConfig.app_log_retention_days), time.min)
+        for table, time_column, id_column in cls.log_table_list:
+            try:
+                partition_names = await LogPartitionDao.get_partition_list_dao(query_db, table.name)
+                if partition_names is None:
+                    result[table.name] = await cls.__purge_expired_rows(query_db, table, time_column, id_column, cutoff)
+                else:
+                    result[table.name] = await cls.__purge_expired_partitions(
+                        query_db, table, time_column, partition_names, cutoff
+                    )
+                    await cls.__purge_expired_rows(query_db, table, time_column, id_column, cutoff)
+            except Exception as e:
+                await query_db.rollback()
+                logger.warning(f'{table.name}清理过期日志失败：{e}')
+        return result
+
+    @classmethod
+    async def clear_log_partitions_services(cls, query_db: AsyncSession, table_name: str) -> bool:
+        """
+        逐个清空已分区日志表的分区，每个分区单独提交，避免一次性锁定整张表
+
+        清空分区属于DDL操作，不能随事务回滚，中途失败时已清空的分区不会恢复；表未分区时不做处理，由调用方在事务中删除
+
+        :param query_db: orm对象
+        :param table_name: 表名
+        :return: 表是否已分区
+        """
+        partition_names = await LogPartitionDao.get_partition_list_dao(query_db, table_name)
+        if partition_names is None:
+            return False
+        for partition_name in partition_names:
+            await LogPartitionDao.truncate_partition_dao(query_db, table_name, partition_name)
+            await query_db.commit()
+        return True
+
+    @classmethod
+    async def __purge_expired_partitions(
+        cls, query_db: AsyncSession, table: Table, time_column: Column, partition_names: List[str], cutoff: datetime
+    ) -> int:
+        """
+        按时间升序逐个归档并删除结束时间不晚于截止时间的分区
+
+        :param query_db: orm对象
+        :param table: 日志表
+        :param time_column: 分区字段
+        :param partition_names: 分区名列表
+        :param cutoff: 截止时间
+        :return: 删除的分区数
+        """
+        expired_partitions = sorted(
+            (bounds, partition_name)
+            for partition_name, bounds in zip(partition_names, map(PartitionUtil.parse_partition_name, partition_names))
+            if bounds and bounds[1] <= cutoff
+        )
+        for (start, end), partition_name in expired_partitions:
+            # MySQL的RANGE分区只有上界，最早的分区还包含早于分区起始时间的数据
+            lower = None if DataBaseConfig.db_type == 'mysql' else start
+            await cls.__archive(query_db, table, time_column, lower, end, partition_name)
+            await LogPartitionDao.drop_partition_dao(query_db, table.name, partition_name)
+            await query_db.commit()
+            logger.info(f'{table.name}已删除过期分区{partition_name}')
+        return len(expired_partitions)
+
+    @classmethod
+    async def __purge_expired_rows(
+        cls, query_db: AsyncSession, table: Table, time_column: Column, id_column: Column, cutoff: datetime
+    ) -> int:
+        """
+        归档并分批删除未分区日志表中早于截止时间的日志，每批单独提交以避免长事务
+
+        :param query_db: orm对象
+        :param table: 日志表
+        :param time_column: 日志时间字段
+        :param id_column: 日志主键字段
+        :param cutoff: 截止时间
+        :return: 删除的日志条数
+        """
+        await cls.__archive(query_db, table, time_column, None, cutoff, f'before{cutoff:%Y%m%d}')
+        total = 0
+        while True:
+            count = await LogPartitionDao.delete_expired_log_dao(
+                query_db, table, time_column, id_column, cutoff, cls.batch_size
+            )
+            await query_db.commit()
+            total += count
+            if count < cls.batch_size:
+                break
+        if total:
+            logger.info(f'{table.name}已删除{total}条过期日志')
+        return total
+
+    @classmethod
+    async def __archive(
+        cls,
+        query_db: AsyncSession,
+        table: Table,
+        time_column: Column,
+        start: Optional[datetime],
+        end: datetime,
+        suffix: str,
+    ) -> int:
+        """
+        将时间范围内的日志流式导出为gzip压缩的csv文件，未配置归档目录时不归档
+
+        :param query_db: orm对象
+        :param table: 日志表
+        :param time_column: 日志时间字段
+        :param start: 起始时间，为None时不限制
+        :param end: 结束时间（不含）
+        :param suffix: 归档文件名后缀
+        :return: 归档的日志条数
+        """
+        if not AppConfig.app_log_archive_path:
+            return 0
+        query = select(table).where(time_column < end).order_by(time_column)
+        if start is not None:
+            query = query.where(time_column >= start)
+        path = os.path.join(AppConfig.app_log_archive_path, table.name, f'{table.name}_{suffix}.csv.gz')
+        archive_file = None
+        writer = None
+        count = 0
+        try:
+            result = await query_db.stream(query.execution_options(yield_per=cls.batch_size))
+            async for rows in result.partitions():
+                if archive_file is None:
+                    archive_file = await ExecutorUtil.run_io(cls.__open_archive_file, f'{path}.tmp')
+                    writer = csv.writer(archive_file)
+                    await ExecutorUtil.run_io(writer.writerow, list(table.columns.keys()))
+                await ExecutorUtil.run_io(writer.writerows, rows)
+                count += len(rows)
+        finally:
+            if archive_file is not None:
+                await ExecutorUtil.run_io(archive_file.close)
+        if archive_file is not None:
+            # 写入完成后再重命名，避免中途失败时留下不完整的归档文件
+            os.replace(f'{path}.tmp', path)
+            logger.info(f'{table.name}已归档{count}条日志至{path}')
+        return count
+
+    @staticmethod
+    def __open_archive_file(path: str) -> TextIO:
+        """
+        以文本模式打开gzip压缩的归档文件
+
+        :param path: 文件路径
+        :return: 文件对象
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
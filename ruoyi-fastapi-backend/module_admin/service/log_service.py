@@ -1,8 +1,15 @@
+import asyncio
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Any, Dict, List, Optional, Union
+from config.database import AsyncSessionLocal
+from config.env import AppConfig
 from exceptions.exception import ServiceException
-from module_admin.dao.log_dao import LoginLogDao, OperationLogDao
+from module_admin.dao.log_dao import LoginLogDao, OperationLogDao, OperationLogStatDao
+from module_admin.entity.do.log_do import SysLogininfor, SysOperLog
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.log_vo import (
     DeleteLoginLogModel,
@@ -11,10 +18,14 @@ from module_admin.entity.vo.log_vo import (
     LoginLogPageQueryModel,
     OperLogModel,
     OperLogPageQueryModel,
+    OperLogStatModel,
+    OperLogStatQueryModel,
     UnlockUser,
 )
 from module_admin.service.dict_service import DictDataService
+from module_admin.service.log_partition_service import LogPartitionService
 from utils.common_util import export_list2excel
+from utils.log_util import logger
 
 
 class OperationLogService:
@@ -49,6 +60,7 @@ class OperationLogService:
         """
         try:
             await OperationLogDao.add_operation_log_dao(query_db, page_object)
+            await OperationLogStatService.update_operation_log_stat_services(query_db, [page_object])
             await query_db.commit()
             return CrudResponseModel(is_success=True, message='新增成功')
         except Exception as e:
@@ -86,8 +98,10 @@ class OperationLogService:
         :return: 清除操作日志校验结果
         """
         try:
-            await OperationLogDao.clear_operation_log_dao(query_db)
-            await query_db.commit()
+            # 已分区的表逐个清空分区，未分区的表在事务中删除
+            if not await LogPartitionService.clear_log_partitions_services(query_db, SysOperLog.__tablename__):
+                await OperationLogDao.clear_operation_log_dao(query_db)
+                await query_db.commit()
             return CrudResponseModel(is_success=True, message='清除成功')
         except Exception as e:
             await query_db.rollback()
@@ -147,6 +161,118 @@ class OperationLogService:
         return binary_data
 
 
+class OperationLogStatService:
+    """
+    操作日志耗时统计模块服务层
+    """
+
+    # 耗时统计区间的上界（毫秒），超过最后一个上界的请求计入bucket_inf
+    latency_buckets = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+    bucket_names = [f'bucket_{bound}' for bound in latency_buckets] + ['bucket_inf']
+
+    @classmethod
+    async def update_operation_log_stat_services(cls, query_db: AsyncSession, operation_log_list: List[OperLogModel]):
+        """
+        将一批操作日志按分钟、请求路由及业务类型汇总后累加至统计表，调用方负责提交，与日志在同一事务中写入
+
+        :param query_db: orm对象
+        :param operation_log_list: 操作日志对象列表
+        :return:
+        """
+        stat_map: Dict[tuple, Dict[str, Any]] = {}
+        for operation_log in operation_log_list:
+            stat_time = (operation_log.oper_time or datetime.now()).replace(second=0, microsecond=0)
+            # 优先使用路由路径，避免路径参数不同的请求被统计为不同的路由
+            oper_url = (operation_log.route_path or operation_log.oper_url or '')[:255]
+            business_type = int(operation_log.business_type or 0)
+            stat = stat_map.get((stat_time, oper_url, business_type))
+            if stat is None:
+                stat = stat_map[(stat_time, oper_url, business_type)] = dict(
+                    stat_time=stat_time,
+                    oper_url=oper_url,
+                    business_type=business_type,
+                    request_count=0,
+                    error_count=0,
+                    cost_time_sum=0,
+                    cost_time_max=0,
+                    **dict.fromkeys(cls.bucket_names, 0),
+                )
+            cost_time = operation_log.cost_time or 0
+            stat['request_count'] += 1
+            if str(operation_log.status) != '0':
+                stat['error_count'] += 1
+            stat['cost_time_sum'] += cost_time
+            stat['cost_time_max'] = max(stat['cost_time_max'], cost_time)
+            stat[cls.bucket_names[bisect_left(cls.latency_buckets, cost_time)]] += 1
+        if stat_map:
+            await OperationLogStatDao.upsert_operation_log_stat_dao(
+                query_db, [stat_map[key] for key in sorted(stat_map)]
+            )
+
+    @classmethod
+    async def get_operation_log_stat_services(
+        cls, query_db: AsyncSession, query_object: OperLogStatQueryModel
+    ) -> List[OperLogStatModel]:
+        """
+        获取操作日志耗时统计信息service，分位数由汇总后的耗时区间计数估算
+
+        :param query_db: orm对象
+        :param query_object: 查询参数对象
+        :return: 耗时统计列表，按请求次数降序排列
+        """
+        end_time = query_object.end_time or datetime.now()
+        begin_time = query_object.begin_time or end_time - timedelta(hours=1)
+        # 统计数据精确到分钟，开始时间向下取整到所在分钟
+        begin_time = begin_time.replace(second=0, microsecond=0)
+        stat_rows = await OperationLogStatDao.get_operation_log_stat_list(query_db, query_object, begin_time, end_time)
+        stat_list = []
+        for row in stat_rows:
+            request_count = int(row['request_count'] or 0)
+            if not request_count:
+                continue
+            buckets = [int(row[name] or 0) for name in cls.bucket_names]
+            max_cost_time = int(row['cost_time_max'] or 0)
+            stat_list.append(
+                OperLogStatModel(
+                    operUrl=row.get('oper_url'),
+                    businessType=row.get('business_type'),
+                    requestCount=request_count,
+                    errorCount=int(row['error_count'] or 0),
+                    avgCostTime=round(int(row['cost_time_sum'] or 0) / request_count, 1),
+                    maxCostTime=max_cost_time,
+                    p50=cls.get_percentile(buckets, request_count, max_cost_time, 0.5),
+                    p95=cls.get_percentile(buckets, request_count, max_cost_time, 0.95),
+                    p99=cls.get_percentile(buckets, request_count, max_cost_time, 0.99),
+                )
+            )
+        stat_list.sort(key=lambda stat: stat.request_count, reverse=True)
+
+        return stat_list
+
+    @classmethod
+    def get_percentile(cls, buckets: List[int], total: int, max_cost_time: int, percent: float) -> float:
+        """
+        根据耗时区间计数估算分位数，在分位数所在区间内按线性插值，最后一个区间的上界取最大耗时
+
+        :param buckets: 各耗时区间的请求次数
+        :param total: 请求总次数
+        :param max_cost_time: 最大耗时
+        :param percent: 分位（0-1）
+        :return: 分位数（毫秒）
+        """
+        rank = total * percent
+        cumulative = 0
+        lower = 0
+        for upper, count in zip(cls.latency_buckets + (max_cost_time,), buckets):
+            # 区间上界不超过最大耗时，使分位数估算结果不会大于实际最大耗时
+            upper = max(min(upper, max_cost_time), lower)
+            if count and cumulative + count >= rank:
+                return round(lower + (upper - lower) * (rank - cumulative) / count, 1)
+            cumulative += count
+            lower = upper
+        return float(max_cost_time)
+
+
 class LoginLogService:
     """
     登录日志管理模块服务层
@@ -216,8 +342,10 @@ class LoginLogService:
         :return: 清除操作日志校验结果
         """
         try:
-            await LoginLogDao.clear_login_log_dao(query_db)
-            await query_db.commit()
+            # 已分区的表逐个清空分区，未分区的表在事务中删除
+            if not await LogPartitionService.clear_log_partitions_services(query_db, SysLogininfor.__tablename__):
+                await LoginLogDao.clear_login_log_dao(query_db)
+                await query_db.commit()
             return CrudResponseModel(is_success=True, message='清除成功')
         except Exception as e:
             await query_db.rollback()
@@ -266,3 +394,161 @@ class LoginLogService:
         binary_data = export_list2excel(new_data)
 
         return binary_data
+
+
+class LogSinkService:
+    """
+    日志异步写入服务层，请求中产生的日志先进入有界队列，由后台任务按条数或时间间隔批量写入数据库
+    """
+
+    _queue: Optional[asyncio.Queue] = None
+    _task: Optional[asyncio.Task] = None
+    _stats: Dict[str, int] = {'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0}
+    _last_drop_warning: float = 0
+
+    @classmethod
+    def is_running(cls) -> bool:
+        """
+        判断后台写入任务是否正在运行
+
+        :return: 判断结果
+        """
+        return cls._task is not None and not cls._task.done()
+
+    @classmethod
+    async def start(cls):
+        """
+        应用启动时创建日志队列及后台写入任务
+
+        :return:
+        """
+        if cls.is_running():
+            return
+        cls._queue = asyncio.Queue(maxsize=AppConfig.app_log_queue_size)
+        cls._task = asyncio.create_task(cls.__run())
+        logger.info('日志异步写入任务启动成功')
+
+    @classmethod
+    async def stop(cls):
+        """
+        应用关闭时停止接收日志，并将队列中剩余的日志全部写入数据库
+
+        :return:
+        """
+        if not cls.is_running():
+            return
+        # 结束标记排在所有已入队日志之后，后台任务处理到该标记时队列已写完
+        await cls._queue.put(None)
+        await cls._task
+        cls._task = None
+        logger.info(f'日志异步写入任务已停止，{cls.get_stats()}')
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        获取日志写入统计信息
+
+        :return: 入队、已写入、因队列已满丢弃、因写入失败丢失的日志条数及当前队列长度
+        """
+        return dict(**cls._stats, pending=cls._queue.qsize() if cls._queue is not None else 0)
+
+    @classmethod
+    async def put_operation_log(cls, operation_log: OperLogModel) -> bool:
+        """
+        操作日志入队
+
+        :param operation_log: 操作日志对象
+        :return: 是否已交由后台任务写入，后台任务未运行时返回False，由调用方直接写入
+        """
+        return await cls.__put(operation_log)
+
+    @classmethod
+    async def put_login_log(cls, login_log: LogininforModel) -> bool:
+        """
+        登录日志入队
+
+        :param login_log: 登录日志对象
+        :return: 是否已交由后台任务写入，后台任务未运行时返回False，由调用方直接写入
+        """
+        return await cls.__put(login_log)
+
+    @classmethod
+    async def __put(cls, log: Union[OperLogModel, LogininforModel]) -> bool:
+        """
+        日志入队，队列已满时最多等待app_log_enqueue_timeout秒，仍无空位则丢弃该条日志，避免数据库缓慢时拖慢接口响应
+
+        :param log: 日志对象
+        :return: 是否已交由后台任务处理
+        """
+        if not cls.is_running():
+            return False
+        try:
+            cls._queue.put_nowait(log)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(cls._queue.put(log), AppConfig.app_log_enqueue_timeout)
+            except asyncio.TimeoutError:
+                cls._stats['dropped'] += 1
+                now = time.monotonic()
+                if now - cls._last_drop_warning >= 10:
+                    cls._last_drop_warning = now
+                    logger.warning(f'日志队列已满，已丢弃日志{cls._stats["dropped"]}条')
+                return True
+        cls._stats['enqueued'] += 1
+        return True
+
+    @classmethod
+    async def __run(cls):
+        """
+        后台写入任务，攒够app_log_batch_size条或距本批第一条日志超过app_log_flush_seconds秒时写入一次
+
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            log = await cls._queue.get()
+            if log is None:
+                break
+            batch = [log]
+            deadline = loop.time() + AppConfig.app_log_flush_seconds
+            while len(batch) < AppConfig.app_log_batch_size:
+                # 队列中已有的日志直接取出，无需等待
+                try:
+                    log = cls._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        log = await asyncio.wait_for(cls._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if log is None:
+                    stopping = True
+                    break
+                batch.append(log)
+            await cls.__flush(batch)
+
+    @classmethod
+    async def __flush(cls, batch: List[Union[OperLogModel, LogininforModel]]):
+        """
+        将一批日志按类型分别以多行INSERT写入数据库，写入失败时记录失败条数，不影响后续批次
+
+        :param batch: 日志对象列表
+        :return:
+        """
+        operation_log_list = [log for log in batch if isinstance(log, OperLogModel)]
+        login_log_list = [log for log in batch if isinstance(log, LogininforModel)]
+        try:
+            async with AsyncSessionLocal() as session:
+                if operation_log_list:
+                    await OperationLogDao.batch_add_operation_log_dao(session, operation_log_list)
+                    await OperationLogStatService.update_operation_log_stat_services(session, operation_log_list)
+                if login_log_list:
+                    await LoginLogDao.batch_add_login_log_dao(session, login_log_list)
+                await session.commit()
+            cls._stats['written'] += len(batch)
+        except Exception as e:
+            cls._stats['failed'] += len(batch)
+            logger.error(f'日志批量写入失败，丢失日志{len(batch)}条：{e}')
@@ -1,3 +1,4 @@
+import json
 import jwt
 import random
 import uuid
@@ -5,6 +6,7 @@ from datetime import datetime, timedelta, timezone
 from fastapi import Depends, Form, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt.exceptions import InvalidTokenError
+from operator import attrgetter
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, List, Optional, Union
 from config.constant import CommonConstant, MenuConstant
@@ -13,16 +15,21 @@ from config.env import AppConfig, JwtConfig
 from config.get_db import get_db
 from exceptions.exception import LoginException, AuthException, ServiceException
 from module_admin.dao.login_dao import login_by_account
+from module_admin.dao.menu_dao import MenuDao
 from module_admin.dao.user_dao import UserDao
 from module_admin.entity.do.menu_do import SysMenu
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.login_vo import MenuTreeModel, MetaModel, RouterModel, SmsCode, UserLogin, UserRegister
 from module_admin.entity.vo.user_vo import AddUserModel, CurrentUserModel, ResetUserModel, TokenData, UserInfoModel
 from module_admin.service.user_service import UserService
+from utils.cache_util import PrincipalCacheUtil, RouterCacheUtil, TokenCacheUtil
 from utils.common_util import CamelCaseUtil
+from utils.ip_util import IpBlacklistUtil
 from utils.log_util import logger
 from utils.message_util import message_service
 from utils.pwd_util import PwdUtil
+from utils.redis_script_util import RedisScriptUtil
+from utils.tree_util import TreeNode, TreeUtil
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='login')
 
@@ -72,11 +79,20 @@ class LoginService:
         :param login_user: 登录用户对象
         :return: 校验结果
         """
-        await cls.__check_login_ip(request)
-        account_lock = await request.app.state.redis.get(
-            f'{RedisInitKeyConfig.ACCOUNT_LOCK.key}:{login_user.user_name}'
+        # 一次往返校验账号是否已锁定，黑名单配置被其他进程修改时同步重新编译
+        account_locked, black_ip_value = await RedisScriptUtil.check_login(
+            request.app.state.redis,
+            f'{RedisInitKeyConfig.SYS_CONFIG.key}:{IpBlacklistUtil.CONFIG_KEY}',
+            f'{RedisInitKeyConfig.ACCOUNT_LOCK.key}:{login_user.user_name}',
+            IpBlacklistUtil.blacklist.digest,
+            login_user.user_name,
         )
-        if login_user.user_name == account_lock:
+        if black_ip_value is not None:
+            IpBlacklistUtil.rebuild(black_ip_value)
+        if IpBlacklistUtil.is_blocked(request.headers.get('X-Forwarded-For')):
+            logger.warning('当前IP禁止登录')
+            raise LoginException(data='', message='当前IP禁止登录')
+        if account_locked:
             logger.warning('账号已锁定，请稍后再试')
             raise LoginException(data='', message='账号已锁定，请稍后再试')
         # 判断请求是否来自于api文档，如果是返回指定格式的结果，用于修复api文档认证成功后token显示undefined的bug
@@ -97,28 +113,17 @@ class LoginService:
         if not user:
             logger.warning('用户不存在')
             raise LoginException(data='', message='用户不存在')
-        if not PwdUtil.verify_password(login_user.password, user[0].password):
-            cache_password_error_count = await request.app.state.redis.get(
-                f'{RedisInitKeyConfig.PASSWORD_ERROR_COUNT.key}:{login_user.user_name}'
-            )
-            password_error_counted = 0
-            if cache_password_error_count:
-                password_error_counted = cache_password_error_count
-            password_error_count = int(password_error_counted) + 1
-            await request.app.state.redis.set(
+        if not await PwdUtil.verify_password(login_user.password, user[0].password):
+            # 原子地累加错误次数，超过5次时锁定账号，并发的错误尝试不会丢失计数
+            password_error_count = await RedisScriptUtil.record_login_failure(
+                request.app.state.redis,
                 f'{RedisInitKeyConfig.PASSWORD_ERROR_COUNT.key}:{login_user.user_name}',
-                password_error_count,
-                ex=timedelta(minutes=10),
+                f'{RedisInitKeyConfig.ACCOUNT_LOCK.key}:{login_user.user_name}',
+                login_user.user_name,
+                5,
+                timedelta(minutes=10),
             )
             if password_error_count > 5:
-                await request.app.state.redis.delete(
-                    f'{RedisInitKeyConfig.PASSWORD_ERROR_COUNT.key}:{login_user.user_name}'
-                )
-                await request.app.state.redis.set(
-                    f'{RedisInitKeyConfig.ACCOUNT_LOCK.key}:{login_user.user_name}',
-                    login_user.user_name,
-                    ex=timedelta(minutes=10),
-                )
                 logger.warning('10分钟内密码已输错超过5次，账号已锁定，请10分钟后再试')
                 raise LoginException(data='', message='10分钟内密码已输错超过5次，账号已锁定，请10分钟后再试')
             logger.warning('密码错误')
@@ -127,23 +132,16 @@ class LoginService:
             logger.warning('用户已停用')
             raise LoginException(data='', message='用户已停用')
         await request.app.state.redis.delete(f'{RedisInitKeyConfig.PASSWORD_ERROR_COUNT.key}:{login_user.user_name}')
+        # 数据库存储的密码使用了过时的加密参数时，使用本次登录的明文密码重新加密
+        if PwdUtil.needs_update(user[0].password):
+            await UserDao.edit_user_dao(
+                query_db,
+                dict(user_id=user[0].user_id, password=await PwdUtil.get_password_hash(login_user.password)),
+            )
+            await query_db.commit()
+            await PrincipalCacheUtil.bump_user(request.app.state.redis, user[0].user_id)
         return user
 
-    @classmethod
-    async def __check_login_ip(cls, request: Request):
-        """
-        校验用户登录ip是否在黑名单内
-
-        :param request: Request对象
-        :return: 校验结果
-        """
-        black_ip_value = await request.app.state.redis.get(f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.login.blackIPList')
-        black_ip_list = black_ip_value.split(',') if black_ip_value else []
-        if request.headers.get('X-Forwarded-For') in black_ip_list:
-            logger.warning('当前IP禁止登录')
-            raise LoginException(data='', message='当前IP禁止登录')
-        return True
-
     @classmethod
     async def __check_login_captcha(cls, request: Request, login_user: UserLogin):
         """
@@ -193,13 +191,17 @@ class LoginService:
         :return: 当前用户信息对象
         :raise: 令牌异常AuthException
         """
+        # 同一请求内已解析过当前用户时直接复用，避免日志装饰器等再次校验令牌及查询用户信息
+        current_user = getattr(request.state, 'current_user', None)
+        if current_user is not None:
+            return current_user
         # if token[:6] != 'Bearer':
         #     logger.warning("用户token不合法")
         #     raise AuthException(data="", message="用户token不合法")
         try:
             if token.startswith('Bearer'):
                 token = token.split(' ')[1]
-            payload = jwt.decode(token, JwtConfig.jwt_secret_key, algorithms=[JwtConfig.jwt_algorithm])
+            payload = TokenCacheUtil.decode(token)
             user_id: str = payload.get('user_id')
             session_id: str = payload.get('session_id')
             if not user_id:
@@ -209,80 +211,111 @@ class LoginService:
         except InvalidTokenError:
             logger.warning('用户token已失效，请重新登录')
             raise AuthException(data='', message='用户token已失效，请重新登录')
-        query_user = await UserDao.get_user_by_id(query_db, user_id=token_data.user_id)
-        if query_user.get('user_basic_info') is None:
-            logger.warning('用户token不合法')
-            raise AuthException(data='', message='用户token不合法')
         if AppConfig.app_same_time_login:
-            redis_token = await request.app.state.redis.get(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}')
+            token_key = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}'
         else:
             # 此方法可实现同一账号同一时间只能登录一次
-            redis_token = await request.app.state.redis.get(
-                f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{query_user.get('user_basic_info').user_id}"
-            )
-        if token == redis_token:
-            if AppConfig.app_same_time_login:
-                await request.app.state.redis.set(
-                    f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}',
-                    redis_token,
-                    ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
-                )
-            else:
-                await request.app.state.redis.set(
-                    f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{query_user.get('user_basic_info').user_id}",
-                    redis_token,
-                    ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
-                )
-
-            role_id_list = [item.role_id for item in query_user.get('user_role_info')]
-            if 1 in role_id_list:
-                permissions = ['*:*:*']
-            else:
-                permissions = [row.perms for row in query_user.get('user_menu_info')]
-            post_ids = ','.join([str(row.post_id) for row in query_user.get('user_post_info')])
-            role_ids = ','.join([str(row.role_id) for row in query_user.get('user_role_info')])
-            roles = [row.role_key for row in query_user.get('user_role_info')]
-
-            current_user = CurrentUserModel(
-                permissions=permissions,
-                roles=roles,
-                user=UserInfoModel(
-                    **CamelCaseUtil.transform_result(query_user.get('user_basic_info')),
-                    postIds=post_ids,
-                    roleIds=role_ids,
-                    dept=CamelCaseUtil.transform_result(query_user.get('user_dept_info')),
-                    role=CamelCaseUtil.transform_result(query_user.get('user_role_info')),
-                ),
-            )
+            token_key = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_data.user_id}'
+        if await RedisScriptUtil.touch_token(
+            request.app.state.redis,
+            token_key,
+            token,
+            timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
+            JwtConfig.jwt_redis_refresh_ratio,
+        ):
+            current_user = await cls.__get_cached_current_user(request, query_db, token_data.user_id)
+            request.state.current_user = current_user
             return current_user
         else:
             logger.warning('用户token已失效，请重新登录')
             raise AuthException(data='', message='用户token已失效，请重新登录')
 
     @classmethod
-    async def get_current_user_routers(cls, user_id: int, query_db: AsyncSession):
+    async def __get_cached_current_user(cls, request: Request, query_db: AsyncSession, user_id: int):
         """
-        根据用户id获取当前用户路由信息
+        根据用户id获取当前用户信息，依次读取进程内缓存、Redis缓存及数据库
 
-        :param user_id: 用户id
+        :param request: Request对象
         :param query_db: orm对象
-        :return: 当前用户路由信息对象
+        :param user_id: 用户id
+        :return: 当前用户信息对象
+        :raise: 令牌异常AuthException
         """
+        redis = request.app.state.redis
+        versions = await PrincipalCacheUtil.get_versions(redis, user_id)
+        current_user, cached_user = await PrincipalCacheUtil.get(redis, user_id, versions)
+        if current_user is not None:
+            return current_user
+        if cached_user:
+            current_user = CurrentUserModel.model_validate_json(cached_user)
+            await PrincipalCacheUtil.set(redis, user_id, versions, current_user, None)
+            return current_user
         query_user = await UserDao.get_user_by_id(query_db, user_id=user_id)
-        user_router_menu = sorted(
-            [
-                row
-                for row in query_user.get('user_menu_info')
-                if row.menu_type in [MenuConstant.TYPE_DIR, MenuConstant.TYPE_MENU]
-            ],
-            key=lambda x: x.order_num,
+        if query_user.get('user_basic_info') is None:
+            logger.warning('用户token不合法')
+            raise AuthException(data='', message='用户token不合法')
+        role_id_list = [item.role_id for item in query_user.get('user_role_info')]
+        if 1 in role_id_list:
+            permissions = ['*:*:*']
+        else:
+            permissions = [row.perms for row in query_user.get('user_menu_info')]
+        post_ids = ','.join([str(row.post_id) for row in query_user.get('user_post_info')])
+        role_ids = ','.join([str(row.role_id) for row in query_user.get('user_role_info')])
+        roles = [row.role_key for row in query_user.get('user_role_info')]
+        # 认证信息会写入进程内缓存及Redis，不保留密码哈希
+        user_basic_info = CamelCaseUtil.transform_result(query_user.get('user_basic_info'))
+        user_basic_info.pop('password', None)
+
+        current_user = CurrentUserModel(
+            permissions=permissions,
+            roles=roles,
+            user=UserInfoModel(
+                **user_basic_info,
+                postIds=post_ids,
+                roleIds=role_ids,
+                dept=CamelCaseUtil.transform_result(query_user.get('user_dept_info')),
+                role=CamelCaseUtil.transform_result(query_user.get('user_role_info')),
+            ),
+        )
+        await PrincipalCacheUtil.set(
+            redis,
+            user_id,
+            versions,
+            current_user,
+            current_user.model_dump_json(by_alias=True, exclude={'user': {'password'}}),
         )
-        menus = cls.__generate_menus(0, user_router_menu)
-        user_router = cls.__generate_user_router_menu(menus)
-        return [router.model_dump(exclude_unset=True, by_alias=True) for router in user_router]
+
+        return current_user
 
     @classmethod
-    def __generate_menus(cls, pid: int, permission_list: List[SysMenu]):
+    async def get_current_user_routers(cls, request: Request, current_user: CurrentUserModel, query_db: AsyncSession):
+        """
+        根据当前用户获取路由信息，相同角色组合的用户共用缓存
+
+        :param request: Request对象
+        :param current_user: 当前用户对象
+        :param query_db: orm对象
+        :return: 序列化后的当前用户路由信息
+        """
+        redis = request.app.state.redis
+        user_role = [role for role in current_user.user.role if role]
+        cache_key, user_routers = await RouterCacheUtil.get(redis, [role.role_id for role in user_role])
+        if user_routers is None:
+            menu_list = await MenuDao.get_menu_list_for_tree(query_db, current_user.user.user_id, user_role)
+            user_router_menu = [
+                row for row in menu_list if row.menu_type in [MenuConstant.TYPE_DIR, MenuConstant.TYPE_MENU]
+            ]
+            menus = cls.__generate_menus(0, user_router_menu)
+            user_router = cls.__generate_user_router_menu(menus)
+            user_routers = json.dumps(
+                [router.model_dump(exclude_unset=True, by_alias=True) for router in user_router], ensure_ascii=False
+            )
+            await RouterCacheUtil.set(redis, cache_key, user_routers)
+
+        return user_routers
+
+    @classmethod
+    def __generate_menus(cls, pid: int, permission_list: List[SysMenu]) -> List[TreeNode]:
         """
         工具方法：根据菜单信息生成菜单信息树形嵌套数据
 
@@ -290,19 +323,16 @@ class LoginService:
         :param permission_list: 菜单列表信息
         :return: 菜单信息树形嵌套数据
         """
-        menu_list: List[MenuTreeModel] = []
-        for permission in permission_list:
-            if permission.parent_id == pid:
-                children = cls.__generate_menus(permission.menu_id, permission_list)
-                menu_list_data = MenuTreeModel(**CamelCaseUtil.transform_result(permission))
-                if children:
-                    menu_list_data.children = children
-                menu_list.append(menu_list_data)
-
-        return menu_list
+        return TreeUtil.build_tree(
+            permission_list,
+            get_id=attrgetter('menu_id'),
+            get_parent_id=attrgetter('parent_id'),
+            root_id=pid,
+            sort_key=lambda node: node.data.order_num,
+        )
 
     @classmethod
-    def __generate_user_router_menu(cls, permission_list: List[MenuTreeModel]):
+    def __generate_user_router_menu(cls, permission_list: List[TreeNode]):
         """
         工具方法：根据菜单树信息生成路由信息树形嵌套数据
 
@@ -310,7 +340,8 @@ class LoginService:
         :return: 路由信息树形嵌套数据
         """
         router_list: List[RouterModel] = []
-        for permission in permission_list:
+        for node in permission_list:
+            permission: SysMenu = node.data
             router = RouterModel(
                 hidden=True if permission.visible == '1' else False,
                 name=RouterUtil.get_router_name(permission),
@@ -324,7 +355,7 @@ class LoginService:
                     link=permission.path if RouterUtil.is_http(permission.path) else None,
                 ),
             )
-            c_menus = permission.children
+            c_menus = node.children
             if c_menus and permission.menu_type == MenuConstant.TYPE_DIR:
                 router.always_show = True
                 router.redirect = 'noRedirect'
@@ -403,7 +434,7 @@ class LoginService:
                 add_user = AddUserModel(
                     userName=user_register.username,
                     nickName=user_register.username,
-                    password=PwdUtil.get_password_hash(user_register.password),
+                    password=await PwdUtil.get_password_hash(user_register.password),
                 )
                 result = await UserService.add_user_services(query_db, add_user)
                 return result
@@ -453,9 +484,9 @@ class LoginService:
             f'{RedisInitKeyConfig.SMS_CODE.key}:{forget_user.session_id}'
         )
         if forget_user.sms_code == redis_sms_result:
-            forget_user.password = PwdUtil.get_password_hash(forget_user.password)
+            forget_user.password = await PwdUtil.get_password_hash(forget_user.password)
             forget_user.user_id = (await UserDao.get_user_by_name(query_db, forget_user.user_name)).user_id
-            edit_result = await UserService.reset_user_services(query_db, forget_user)
+            edit_result = await UserService.reset_user_services(request, query_db, forget_user)
             result = edit_result.dict()
         elif not redis_sms_result:
             result = dict(is_success=False, message='短信验证码已过期')
@@ -475,6 +506,7 @@ class LoginService:
         :return: 退出登录结果
         """
         await request.app.state.redis.delete(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}')
+        TokenCacheUtil.evict(session_id)
         # await request.app.state.redis.delete(f'{current_user.user.user_id}_access_token')
         # await request.app.state.redis.delete(f'{current_user.user.user_id}_session_id')
 
@@ -1,3 +1,5 @@
+from fastapi import Request
+from operator import attrgetter
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from config.constant import CommonConstant, MenuConstant
@@ -8,8 +10,10 @@ from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.menu_vo import DeleteMenuModel, MenuQueryModel, MenuModel
 from module_admin.entity.vo.role_vo import RoleMenuQueryModel
 from module_admin.entity.vo.user_vo import CurrentUserModel
+from utils.cache_util import PrincipalCacheUtil
 from utils.common_util import CamelCaseUtil
 from utils.string_util import StringUtil
+from utils.tree_util import TreeUtil
 
 
 class MenuService:
@@ -90,10 +94,11 @@ class MenuService:
         return CommonConstant.UNIQUE
 
     @classmethod
-    async def add_menu_services(cls, query_db: AsyncSession, page_object: MenuModel):
+    async def add_menu_services(cls, request: Request, query_db: AsyncSession, page_object: MenuModel):
         """
         新增菜单信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 新增菜单对象
         :return: 新增菜单校验结果
@@ -106,16 +111,18 @@ class MenuService:
             try:
                 await MenuDao.add_menu_dao(query_db, page_object)
                 await query_db.commit()
+                await PrincipalCacheUtil.bump_all(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='新增成功')
             except Exception as e:
                 await query_db.rollback()
                 raise e
 
     @classmethod
-    async def edit_menu_services(cls, query_db: AsyncSession, page_object: MenuModel):
+    async def edit_menu_services(cls, request: Request, query_db: AsyncSession, page_object: MenuModel):
         """
         编辑菜单信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑部门对象
         :return: 编辑菜单校验结果
@@ -133,6 +140,7 @@ class MenuService:
                 try:
                     await MenuDao.edit_menu_dao(query_db, edit_menu)
                     await query_db.commit()
+                    await PrincipalCacheUtil.bump_all(request.app.state.redis)
                     return CrudResponseModel(is_success=True, message='更新成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -141,10 +149,11 @@ class MenuService:
             raise ServiceException(message='菜单不存在')
 
     @classmethod
-    async def delete_menu_services(cls, query_db: AsyncSession, page_object: DeleteMenuModel):
+    async def delete_menu_services(cls, request: Request, query_db: AsyncSession, page_object: DeleteMenuModel):
         """
         删除菜单信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除菜单对象
         :return: 删除菜单校验结果
@@ -159,6 +168,7 @@ class MenuService:
                         raise ServiceWarning(message='菜单已分配,不允许删除')
                     await MenuDao.delete_menu_dao(query_db, MenuModel(menuId=menu_id))
                 await query_db.commit()
+                await PrincipalCacheUtil.bump_all(request.app.state.redis)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -191,25 +201,9 @@ class MenuService:
         :param permission_list: 菜单列表信息
         :return: 菜单树形嵌套数据
         """
-        permission_list = [
-            dict(id=item.menu_id, label=item.menu_name, parentId=item.parent_id) for item in permission_list
-        ]
-        # 转成id为key的字典
-        mapping: dict = dict(zip([i['id'] for i in permission_list], permission_list))
-
-        # 树容器
-        container: list = []
-
-        for d in permission_list:
-            # 如果找不到父级项，则是根节点
-            parent: dict = mapping.get(d['parentId'])
-            if parent is None:
-                container.append(d)
-            else:
-                children: list = parent.get('children')
-                if not children:
-                    children = []
-                children.append(d)
-                parent.update({'children': children})
-
-        return container
+        return TreeUtil.build_tree(
+            permission_list,
+            get_id=attrgetter('menu_id'),
+            get_parent_id=attrgetter('parent_id'),
+            node_factory=lambda item: {'id': item.menu_id, 'label': item.menu_name, 'parentId': item.parent_id},
+        )
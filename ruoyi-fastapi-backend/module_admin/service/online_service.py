@@ -1,10 +1,9 @@
-import jwt
 from fastapi import Request
 from config.enums import RedisInitKeyConfig
-from config.env import JwtConfig
 from exceptions.exception import ServiceException
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.online_vo import DeleteOnlineModel, OnlineQueryModel
+from utils.cache_util import TokenCacheUtil
 from utils.common_util import CamelCaseUtil
 
 
@@ -28,7 +27,7 @@ class OnlineService:
         access_token_values_list = [await request.app.state.redis.get(key) for key in access_token_keys]
         online_info_list = []
         for item in access_token_values_list:
-            payload = jwt.decode(item, JwtConfig.jwt_secret_key, algorithms=[JwtConfig.jwt_algorithm])
+            payload = TokenCacheUtil.decode(item)
             online_dict = dict(
                 token_id=payload.get('session_id'),
                 user_name=payload.get('user_name'),
@@ -71,6 +70,7 @@ class OnlineService:
             token_id_list = page_object.token_ids.split(',')
             for token_id in token_id_list:
                 await request.app.state.redis.delete(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}')
+            TokenCacheUtil.evict(*token_id_list)
             return CrudResponseModel(is_success=True, message='强退成功')
         else:
             raise ServiceException(message='传入session_id为空')
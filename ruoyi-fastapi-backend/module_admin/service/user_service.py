@@ -31,6 +31,7 @@ from module_admin.service.config_service import ConfigService
 from module_admin.service.dept_service import DeptService
 from module_admin.service.post_service import PostService
 from module_admin.service.role_service import RoleService
+from utils.cache_util import PrincipalCacheUtil
 from utils.common_util import CamelCaseUtil, export_list2excel, get_excel_template
 from utils.page_util import PageResponseModel
 from utils.pwd_util import PwdUtil
@@ -176,10 +177,11 @@ class UserService:
                 raise e
 
     @classmethod
-    async def edit_user_services(cls, query_db: AsyncSession, page_object: EditUserModel):
+    async def edit_user_services(cls, request: Request, query_db: AsyncSession, page_object: EditUserModel):
         """
         编辑用户信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑用户对象
         :return: 编辑用户校验结果
@@ -216,6 +218,7 @@ class UserService:
                                 query_db, UserPostModel(userId=page_object.user_id, postId=post)
                             )
                 await query_db.commit()
+                await PrincipalCacheUtil.bump_user(request.app.state.redis, page_object.user_id)
                 return CrudResponseModel(is_success=True, message='更新成功')
             except Exception as e:
                 await query_db.rollback()
@@ -224,10 +227,11 @@ class UserService:
             raise ServiceException(message='用户不存在')
 
     @classmethod
-    async def delete_user_services(cls, query_db: AsyncSession, page_object: DeleteUserModel):
+    async def delete_user_services(cls, request: Request, query_db: AsyncSession, page_object: DeleteUserModel):
         """
         删除用户信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除用户对象
         :return: 删除用户校验结果
@@ -243,6 +247,7 @@ class UserService:
                     await UserDao.delete_user_post_dao(query_db, UserPostModel(**user_id_dict))
                     await UserDao.delete_user_dao(query_db, UserModel(**user_id_dict))
                 await query_db.commit()
+                await PrincipalCacheUtil.bump_user(request.app.state.redis, *user_id_list)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -312,10 +317,11 @@ class UserService:
         )
 
     @classmethod
-    async def reset_user_services(cls, query_db: AsyncSession, page_object: ResetUserModel):
+    async def reset_user_services(cls, request: Request, query_db: AsyncSession, page_object: ResetUserModel):
         """
         重置用户密码service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 重置用户对象
         :return: 重置用户校验结果
@@ -323,9 +329,9 @@ class UserService:
         reset_user = page_object.model_dump(exclude_unset=True, exclude={'admin'})
         if page_object.old_password:
             user = (await UserDao.get_user_detail_by_id(query_db, user_id=page_object.user_id)).get('user_basic_info')
-            if not PwdUtil.verify_password(page_object.old_password, user.password):
+            if not await PwdUtil.verify_password(page_object.old_password, user.password):
                 raise ServiceException(message='修改密码失败，旧密码错误')
-            elif PwdUtil.verify_password(page_object.password, user.password):
+            elif await PwdUtil.verify_password(page_object.password, user.password):
                 raise ServiceException(message='新密码不能与旧密码相同')
             else:
                 del reset_user['old_password']
@@ -333,9 +339,10 @@ class UserService:
             del reset_user['sms_code']
             del reset_user['session_id']
         try:
-            reset_user['password'] = PwdUtil.get_password_hash(page_object.password)
+            reset_user['password'] = await PwdUtil.get_password_hash(page_object.password)
             await UserDao.edit_user_dao(query_db, reset_user)
             await query_db.commit()
+            await PrincipalCacheUtil.bump_user(request.app.state.redis, page_object.user_id)
             return CrudResponseModel(is_success=True, message='重置成功')
         except Exception as e:
             await query_db.rollback()
@@ -378,6 +385,7 @@ class UserService:
         await file.close()
         df.rename(columns=header_dict, inplace=True)
         add_error_result = []
+        edited_user_ids = []
         count = 0
         try:
             for index, row in df.iterrows():
@@ -395,7 +403,7 @@ class UserService:
                 add_user = UserModel(
                     deptId=row['dept_id'],
                     userName=row['user_name'],
-                    password=PwdUtil.get_password_hash(
+                    password=await PwdUtil.get_password_hash(
                         await ConfigService.query_config_list_from_cache_services(
                             request.app.state.redis, 'sys.user.initPassword'
                         )
@@ -436,6 +444,7 @@ class UserService:
                             )
                         edit_user = edit_user_model.model_dump(exclude_unset=True)
                         await UserDao.edit_user_dao(query_db, edit_user)
+                        edited_user_ids.append(user_info.user_id)
                     else:
                         add_error_result.append(f"{count}.用户账号{row['user_name']}已存在")
                 else:
@@ -446,6 +455,7 @@ class UserService:
                         )
                     await UserDao.add_user_dao(query_db, add_user)
             await query_db.commit()
+            await PrincipalCacheUtil.bump_user(request.app.state.redis, *edited_user_ids)
             return CrudResponseModel(is_success=True, message='\n'.join(add_error_result))
         except Exception as e:
             await query_db.rollback()
@@ -543,10 +553,11 @@ class UserService:
         return result
 
     @classmethod
-    async def add_user_role_services(cls, query_db: AsyncSession, page_object: CrudUserRoleModel):
+    async def add_user_role_services(cls, request: Request, query_db: AsyncSession, page_object: CrudUserRoleModel):
         """
         新增用户关联角色信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 新增用户关联角色对象
         :return: 新增用户关联角色校验结果
@@ -558,6 +569,7 @@ class UserService:
                 for role_id in role_id_list:
                     await UserDao.add_user_role_dao(query_db, UserRoleModel(userId=page_object.user_id, roleId=role_id))
                 await query_db.commit()
+                await PrincipalCacheUtil.bump_user(request.app.state.redis, page_object.user_id)
                 return CrudResponseModel(is_success=True, message='分配成功')
             except Exception as e:
                 await query_db.rollback()
@@ -566,6 +578,7 @@ class UserService:
             try:
                 await UserDao.delete_user_role_by_user_and_role_dao(query_db, UserRoleModel(userId=page_object.user_id))
                 await query_db.commit()
+                await PrincipalCacheUtil.bump_user(request.app.state.redis, page_object.user_id)
                 return CrudResponseModel(is_success=True, message='分配成功')
             except Exception as e:
                 await query_db.rollback()
@@ -584,6 +597,7 @@ class UserService:
                             query_db, UserRoleModel(userId=user_id, roleId=page_object.role_id)
                         )
                 await query_db.commit()
+                await PrincipalCacheUtil.bump_user(request.app.state.redis, *user_id_list)
                 return CrudResponseModel(is_success=True, message='新增成功')
             except Exception as e:
                 await query_db.rollback()
@@ -592,10 +606,11 @@ class UserService:
             raise ServiceException(message='不满足新增条件')
 
     @classmethod
-    async def delete_user_role_services(cls, query_db: AsyncSession, page_object: CrudUserRoleModel):
+    async def delete_user_role_services(cls, request: Request, query_db: AsyncSession, page_object: CrudUserRoleModel):
         """
         删除用户关联角色信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除用户关联角色对象
         :return: 删除用户关联角色校验结果
@@ -607,6 +622,7 @@ class UserService:
                         query_db, UserRoleModel(userId=page_object.user_id, roleId=page_object.role_id)
                     )
                     await query_db.commit()
+                    await PrincipalCacheUtil.bump_user(request.app.state.redis, page_object.user_id)
                     return CrudResponseModel(is_success=True, message='删除成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -619,6 +635,7 @@ class UserService:
                             query_db, UserRoleModel(userId=user_id, roleId=page_object.role_id)
                         )
                     await query_db.commit()
+                    await PrincipalCacheUtil.bump_user(request.app.state.redis, *user_id_list)
                     return CrudResponseModel(is_success=True, message='删除成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -0,0 +1,8 @@
+from module_admin.service.log_partition_service import LogPartitionService
+
+
+async def log_retention_job(*args, **kwargs):
+    """
+    日志保留清理任务：归档并删除超过保留天数的日志，日志表分区由应用后台任务预先创建
+    """
+    await LogPartitionService.purge_log_services()
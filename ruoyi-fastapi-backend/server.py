@@ -22,8 +22,14 @@ from module_admin.controller.post_controler import postController
 from module_admin.controller.role_controller import roleController
 from module_admin.controller.server_controller import serverController
 from module_admin.controller.user_controller import userController
+from module_admin.service.captcha_service import CaptchaService
+from module_admin.service.log_partition_service import LogPartitionService
+from module_admin.service.log_service import LogSinkService
 from sub_applications.handle import handle_sub_applications
 from utils.common_util import worship
+from utils.executor_util import ExecutorUtil
+from utils.face_match_util import FaceGallery, FaceGalleryUtil
+from utils.ip_location_util import IpLocationUtil
 from utils.log_util import logger
 
 
@@ -33,14 +39,25 @@ async def lifespan(app: FastAPI):
     logger.info(f'{AppConfig.app_name}开始启动')
     worship()
     await init_create_table()
+    await LogPartitionService.init_log_partitions()
     app.state.redis = await RedisUtil.create_redis_pool()
     await RedisUtil.init_sys_dict(app.state.redis)
     await RedisUtil.init_sys_config(app.state.redis)
+    await CaptchaService.init_captcha_images()
+    if AppConfig.app_ip_location_query:
+        await ExecutorUtil.run_io(IpLocationUtil.init_ip_location_database)
     await SchedulerUtil.init_system_scheduler()
+    await LogSinkService.start()
+    await LogPartitionService.start()
     logger.info(f'{AppConfig.app_name}启动成功')
     yield
+    await LogPartitionService.stop()
+    await LogSinkService.stop()
     await RedisUtil.close_redis_pool(app)
     await SchedulerUtil.close_system_scheduler()
+    FaceGalleryUtil.close_all()
+    FaceGallery.shutdown_executor()
+    ExecutorUtil.shutdown()
 
 
 # 初始化FastAPI对象
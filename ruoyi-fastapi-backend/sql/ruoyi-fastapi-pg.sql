@@ -504,6 +504,8 @@ insert into sys_user_post values (2, 2);
 -- ----------------------------
 -- 10、操作日志记录
 -- ----------------------------
+-- 日志表按时间分区，按月的分区由应用启动及日志保留清理任务创建；日志文本搜索使用三元组GIN索引
+create extension if not exists pg_trgm;
 drop table if exists sys_oper_log;
 create table sys_oper_log (
     oper_id bigserial not null,
@@ -521,14 +523,17 @@ create table sys_oper_log (
     json_result varchar(2000) default '',
     status int4 default 0,
     error_msg varchar(2000) default '',
-    oper_time timestamp(0),
+    oper_time timestamp(0) not null,
     cost_time int8 default 0,
-    primary key (oper_id)
-);
+    primary key (oper_id, oper_time)
+) partition by range (oper_time);
+create table sys_oper_log_pmax partition of sys_oper_log default;
 alter sequence sys_oper_log_oper_id_seq restart 100;
 create index idx_sys_oper_log_bt on sys_oper_log(business_type);  
 create index idx_sys_oper_log_s on sys_oper_log(status);  
 create index idx_sys_oper_log_ot on sys_oper_log(oper_time);
+create index idx_sys_oper_log_t_search on sys_oper_log using gin (title gin_trgm_ops);
+create index idx_sys_oper_log_on_search on sys_oper_log using gin (oper_name gin_trgm_ops);
 comment on column sys_oper_log.oper_id is '日志主键';
 comment on column sys_oper_log.title is '模块标题';
 comment on column sys_oper_log.business_type is '业务类型（0其它 1新增 2修改 3删除）';
@@ -547,6 +552,53 @@ comment on column sys_oper_log.error_msg is '错误消息';
 comment on column sys_oper_log.oper_time is '操作时间';
 comment on table sys_oper_log is '操作日志记录';
 
+-- ----------------------------
+-- 10.1、操作日志耗时统计表
+-- ----------------------------
+drop table if exists sys_oper_stat;
+create table sys_oper_stat (
+    stat_time timestamp(0) not null,
+    oper_url varchar(255) not null,
+    business_type int4 not null,
+    request_count int8 default 0,
+    error_count int8 default 0,
+    cost_time_sum int8 default 0,
+    cost_time_max int8 default 0,
+    bucket_5 int8 default 0,
+    bucket_10 int8 default 0,
+    bucket_25 int8 default 0,
+    bucket_50 int8 default 0,
+    bucket_100 int8 default 0,
+    bucket_250 int8 default 0,
+    bucket_500 int8 default 0,
+    bucket_1000 int8 default 0,
+    bucket_2500 int8 default 0,
+    bucket_5000 int8 default 0,
+    bucket_10000 int8 default 0,
+    bucket_inf int8 default 0,
+    primary key (stat_time, oper_url, business_type)
+);
+comment on column sys_oper_stat.stat_time is '统计时间（精确到分钟）';
+comment on column sys_oper_stat.oper_url is '请求路由';
+comment on column sys_oper_stat.business_type is '业务类型（0其它 1新增 2修改 3删除）';
+comment on column sys_oper_stat.request_count is '请求次数';
+comment on column sys_oper_stat.error_count is '异常次数';
+comment on column sys_oper_stat.cost_time_sum is '总耗时（毫秒）';
+comment on column sys_oper_stat.cost_time_max is '最大耗时（毫秒）';
+comment on column sys_oper_stat.bucket_5 is '耗时不超过5毫秒的请求次数';
+comment on column sys_oper_stat.bucket_10 is '耗时5-10毫秒的请求次数';
+comment on column sys_oper_stat.bucket_25 is '耗时10-25毫秒的请求次数';
+comment on column sys_oper_stat.bucket_50 is '耗时25-50毫秒的请求次数';
+comment on column sys_oper_stat.bucket_100 is '耗时50-100毫秒的请求次数';
+comment on column sys_oper_stat.bucket_250 is '耗时100-250毫秒的请求次数';
+comment on column sys_oper_stat.bucket_500 is '耗时250-500毫秒的请求次数';
+comment on column sys_oper_stat.bucket_1000 is '耗时500-1000毫秒的请求次数';
+comment on column sys_oper_stat.bucket_2500 is '耗时1000-2500毫秒的请求次数';
+comment on column sys_oper_stat.bucket_5000 is '耗时2500-5000毫秒的请求次数';
+comment on column sys_oper_stat.bucket_10000 is '耗时5000-10000毫秒的请求次数';
+comment on column sys_oper_stat.bucket_inf is '耗时超过10000毫秒的请求次数';
+comment on table sys_oper_stat is '操作日志耗时统计表';
+
 -- ----------------------------
 -- 11、字典类型表
 -- ----------------------------
@@ -717,12 +769,15 @@ create table sys_logininfor (
     os varchar(50) default '',
     status char(1) default '0',
     msg varchar(255) default '',
-    login_time timestamp(0),
-    primary key (info_id)
-);
+    login_time timestamp(0) not null,
+    primary key (info_id, login_time)
+) partition by range (login_time);
+create table sys_logininfor_pmax partition of sys_logininfor default;
 alter sequence sys_logininfor_info_id_seq restart 100;
 create index idx_sys_logininfor_s on sys_logininfor(status);  
 create index idx_sys_logininfor_lt on sys_logininfor(login_time);
+create index idx_sys_logininfor_un_search on sys_logininfor using gin (user_name gin_trgm_ops);
+create index idx_sys_logininfor_ip_search on sys_logininfor using gin (ipaddr gin_trgm_ops);
 comment on column sys_logininfor.info_id is '访问ID';
 comment on column sys_logininfor.user_name is '用户账号';
 comment on column sys_logininfor.ipaddr is '登录IP地址';
@@ -782,6 +837,7 @@ comment on table sys_job is '定时任务调度表';
 insert into sys_job values(1, '系统默认（无参）', 'default', 'default', 'module_task.scheduler_test.job', null,   null, '0/10 * * * * ?', '3', '1', '1', 'admin', current_timestamp, '', null, '');
 insert into sys_job values(2, '系统默认（有参）', 'default', 'default', 'module_task.scheduler_test.job', 'test', null, '0/15 * * * * ?', '3', '1', '1', 'admin', current_timestamp, '', null, '');
 insert into sys_job values(3, '系统默认（多参）', 'default', 'default', 'module_task.scheduler_test.job', 'new',  '{test: 111}', '0/20 * * * * ?', '3', '1', '1', 'admin', current_timestamp, '', null, '');
+insert into sys_job values(4, '日志保留清理',     'default', 'default', 'module_task.log_task.log_retention_job', null, null, '0 0 2 * * ?', '3', '1', '1', 'admin', current_timestamp, '', null, '归档并删除超过保留天数的日志，启用前请确认保留天数及归档目录配置');
 
 -- ----------------------------
 -- 16、定时任务调度日志表
@@ -799,9 +855,10 @@ create table sys_job_log (
     job_message varchar(500),
     status char(1) default '0',
     exception_info varchar(2000) default '',
-    create_time timestamp(0),
-    primary key (job_log_id)
-);
+    create_time timestamp(0) not null,
+    primary key (job_log_id, create_time)
+) partition by range (create_time);
+create table sys_job_log_pmax partition of sys_job_log default;
 comment on column sys_job_log.job_log_id is '任务日志ID';
 comment on column sys_job_log.job_name is '任务名称';
 comment on column sys_job_log.job_group is '任务组名';
@@ -415,6 +415,8 @@ insert into sys_user_post values ('2', '2');
 -- ----------------------------
 -- 10、操作日志记录
 -- ----------------------------
+-- ngram全文索引需关闭停用词，否则包含停用词的分词不会被索引
+set session innodb_ft_enable_stopword = 0;
 drop table if exists sys_oper_log;
 create table sys_oper_log (
   oper_id           bigint(20)      not null auto_increment    comment '日志主键',
@@ -433,14 +435,44 @@ create table sys_oper_log (
   status            int(1)          default 0                  comment '操作状态（0正常 1异常）',
   error_msg         varchar(2000)   default ''                 comment '错误消息',
   oper_time         datetime                                   comment '操作时间',
-  cost_time         bigint(20)      default 0                  comment '消耗时间',
+  cost_time         bigint(20)      default 0                  comment '消耗时间（毫秒）',
   primary key (oper_id),
   key idx_sys_oper_log_bt (business_type),
   key idx_sys_oper_log_s  (status),
-  key idx_sys_oper_log_ot (oper_time)
+  key idx_sys_oper_log_ot (oper_time),
+  fulltext key idx_sys_oper_log_t_search  (title)     with parser ngram,
+  fulltext key idx_sys_oper_log_on_search (oper_name) with parser ngram
 ) engine=innodb auto_increment=100 comment = '操作日志记录';
 
 
+-- ----------------------------
+-- 10.1、操作日志耗时统计表
+-- ----------------------------
+drop table if exists sys_oper_stat;
+create table sys_oper_stat (
+  stat_time         datetime        not null                   comment '统计时间（精确到分钟）',
+  oper_url          varchar(255)    not null                   comment '请求路由',
+  business_type     int(2)          not null                   comment '业务类型（0其它 1新增 2修改 3删除）',
+  request_count     bigint(20)      default 0                  comment '请求次数',
+  error_count       bigint(20)      default 0                  comment '异常次数',
+  cost_time_sum     bigint(20)      default 0                  comment '总耗时（毫秒）',
+  cost_time_max     bigint(20)      default 0                  comment '最大耗时（毫秒）',
+  bucket_5          bigint(20)      default 0                  comment '耗时不超过5毫秒的请求次数',
+  bucket_10         bigint(20)      default 0                  comment '耗时5-10毫秒的请求次数',
+  bucket_25         bigint(20)      default 0                  comment '耗时10-25毫秒的请求次数',
+  bucket_50         bigint(20)      default 0                  comment '耗时25-50毫秒的请求次数',
+  bucket_100        bigint(20)      default 0                  comment '耗时50-100毫秒的请求次数',
+  bucket_250        bigint(20)      default 0                  comment '耗时100-250毫秒的请求次数',
+  bucket_500        bigint(20)      default 0                  comment '耗时250-500毫秒的请求次数',
+  bucket_1000       bigint(20)      default 0                  comment '耗时500-1000毫秒的请求次数',
+  bucket_2500       bigint(20)      default 0                  comment '耗时1000-2500毫秒的请求次数',
+  bucket_5000       bigint(20)      default 0                  comment '耗时2500-5000毫秒的请求次数',
+  bucket_10000      bigint(20)      default 0                  comment '耗时5000-10000毫秒的请求次数',
+  bucket_inf        bigint(20)      default 0                  comment '耗时超过10000毫秒的请求次数',
+  primary key (stat_time, oper_url, business_type)
+) engine=innodb comment = '操作日志耗时统计表';
+
+
 -- ----------------------------
 -- 11、字典类型表
 -- ----------------------------
@@ -572,7 +604,9 @@ create table sys_logininfor (
   login_time     datetime                                 comment '访问时间',
   primary key (info_id),
   key idx_sys_logininfor_s  (status),
-  key idx_sys_logininfor_lt (login_time)
+  key idx_sys_logininfor_lt (login_time),
+  fulltext key idx_sys_logininfor_un_search (user_name) with parser ngram,
+  fulltext key idx_sys_logininfor_ip_search (ipaddr)    with parser ngram
 ) engine=innodb auto_increment=100 comment = '系统访问记录';
 
 
@@ -603,6 +637,7 @@ create table sys_job (
 insert into sys_job values(1, '系统默认（无参）', 'default', 'default', 'module_task.scheduler_test.job', NULL,   NULL, '0/10 * * * * ?', '3', '1', '1', 'admin', sysdate(), '', null, '');
 insert into sys_job values(2, '系统默认（有参）', 'default', 'default', 'module_task.scheduler_test.job', 'test', NULL, '0/15 * * * * ?', '3', '1', '1', 'admin', sysdate(), '', null, '');
 insert into sys_job values(3, '系统默认（多参）', 'default', 'default', 'module_task.scheduler_test.job', 'new',  '{\"test\": 111}', '0/20 * * * * ?', '3', '1', '1', 'admin', sysdate(), '', null, '');
+insert into sys_job values(4, '日志保留清理',     'default', 'default', 'module_task.log_task.log_retention_job', NULL, NULL, '0 0 2 * * ?', '3', '1', '1', 'admin', sysdate(), '', null, '归档并删除超过保留天数的日志，启用前请确认保留天数及归档目录配置');
 
 
 -- ----------------------------
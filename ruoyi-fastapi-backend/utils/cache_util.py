@@ -0,0 +1,248 @@
+import hashlib
+import jwt
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from config.enums import RedisInitKeyConfig
+from config.env import AppConfig, JwtConfig
+
+
+class LRUCache:
+    """
+    进程内有界LRU缓存，支持按条目过期
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        """
+        进程内有界LRU缓存
+
+        :param max_size: 最大缓存条目数
+        :param ttl: 默认过期时间（单位：秒），为None时不过期
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, Tuple[Any, Optional[float]]]' = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        获取缓存值，过期条目视为不存在
+
+        :param key: 缓存键
+        :param default: 不存在时的返回值
+        :return: 缓存值
+        """
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expire_at = item
+        if expire_at is not None and expire_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        设置缓存值，超出容量时淘汰最久未使用的条目
+
+        :param key: 缓存键
+        :param value: 缓存值
+        :param ttl: 过期时间（单位：秒），默认使用缓存的默认过期时间
+        """
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        移除缓存条目
+
+        :param key: 缓存键
+        :param default: 不存在时的返回值
+        :return: 被移除的缓存值
+        """
+        item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self):
+        """
+        清空缓存
+        """
+        self._data.clear()
+
+
+class PrincipalCacheUtil:
+    """
+    当前用户认证信息两级缓存工具类
+
+    一级为进程内LRU，二级为Redis，缓存键由用户id、全局版本号及用户版本号组成；
+    用户信息变更时递增对应用户的版本号，角色、菜单、部门变更影响多个用户，递增全局版本号
+    """
+
+    GLOBAL_VERSION = 'global'
+    local_cache = LRUCache(AppConfig.app_principal_cache_size, AppConfig.app_principal_cache_seconds)
+
+    @classmethod
+    def version_key(cls, name: Any):
+        return f'{RedisInitKeyConfig.PRINCIPAL_VERSION.key}:{name}'
+
+    @classmethod
+    async def get_versions(cls, redis, user_id: int) -> Tuple[int, int]:
+        """
+        获取全局版本号及用户版本号
+
+        :param redis: redis对象
+        :param user_id: 用户id
+        :return: (全局版本号, 用户版本号)
+        """
+        global_version, user_version = await redis.mget(cls.version_key(cls.GLOBAL_VERSION), cls.version_key(user_id))
+        return int(global_version or 0), int(user_version or 0)
+
+    @classmethod
+    async def get(cls, redis, user_id: int, versions: Tuple[int, int]) -> Tuple[Any, Optional[str]]:
+        """
+        获取缓存的认证信息，优先读取进程内缓存
+
+        :param redis: redis对象
+        :param user_id: 用户id
+        :param versions: (全局版本号, 用户版本号)
+        :return: (进程内缓存对象, Redis中缓存的序列化字符串)，均未命中时返回(None, None)
+        """
+        principal = cls.local_cache.get((user_id, *versions))
+        if principal is not None:
+            return principal, None
+        cached = await redis.get(f'{RedisInitKeyConfig.USER_PRINCIPAL.key}:{user_id}:{versions[0]}:{versions[1]}')
+        return None, cached
+
+    @classmethod
+    async def set(cls, redis, user_id: int, versions: Tuple[int, int], principal: Any, serialized: Optional[str]):
+        """
+        写入认证信息缓存
+
+        :param redis: redis对象
+        :param user_id: 用户id
+        :param versions: (全局版本号, 用户版本号)
+        :param principal: 认证信息对象，写入进程内缓存
+        :param serialized: 认证信息序列化字符串，不为None时写入Redis
+        """
+        cls.local_cache.set((user_id, *versions), principal)
+        if serialized is not None:
+            await redis.set(
+                f'{RedisInitKeyConfig.USER_PRINCIPAL.key}:{user_id}:{versions[0]}:{versions[1]}',
+                serialized,
+                ex=timedelta(seconds=AppConfig.app_principal_cache_seconds),
+            )
+
+    @classmethod
+    async def bump_user(cls, redis, *user_ids: Any):
+        """
+        用户信息变更后递增用户版本号，使其认证信息缓存失效
+
+        :param redis: redis对象
+        :param user_ids: 用户id
+        """
+        if user_ids:
+            async with redis.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.incr(cls.version_key(user_id))
+                await pipe.execute()
+
+    @classmethod
+    async def bump_all(cls, redis):
+        """
+        角色、菜单、部门等影响多个用户的信息变更后递增全局版本号，使所有认证信息缓存失效
+
+        :param redis: redis对象
+        """
+        await redis.incr(cls.version_key(cls.GLOBAL_VERSION))
+
+
+class RouterCacheUtil:
+    """
+    用户路由信息缓存工具类
+
+    路由信息只与角色组合有关，拥有相同角色组合的用户共用一份序列化后的路由信息，缓存键由全局版本号及排序后的角色id摘要组成，
+    菜单、角色变更时递增全局版本号即可使其失效
+    """
+
+    local_cache = LRUCache(256, AppConfig.app_router_cache_seconds)
+
+    @classmethod
+    async def get(cls, redis, role_ids: List[int]) -> Tuple[str, Optional[str]]:
+        """
+        获取角色组合对应的路由信息缓存
+
+        :param redis: redis对象
+        :param role_ids: 角色id列表
+        :return: (缓存键, 序列化后的路由信息，未命中时为None)
+        """
+        global_version = await redis.get(PrincipalCacheUtil.version_key(PrincipalCacheUtil.GLOBAL_VERSION))
+        role_digest = hashlib.sha1(','.join(str(role_id) for role_id in sorted(set(role_ids))).encode('utf-8'))
+        cache_key = f'{RedisInitKeyConfig.USER_ROUTERS.key}:{int(global_version or 0)}:{role_digest.hexdigest()}'
+        user_routers = cls.local_cache.get(cache_key)
+        if user_routers is None:
+            user_routers = await redis.get(cache_key)
+            if user_routers is not None:
+                cls.local_cache.set(cache_key, user_routers)
+        return cache_key, user_routers
+
+    @classmethod
+    async def set(cls, redis, cache_key: str, user_routers: str):
+        """
+        写入路由信息缓存
+
+        :param redis: redis对象
+        :param cache_key: 缓存键
+        :param user_routers: 序列化后的路由信息
+        """
+        cls.local_cache.set(cache_key, user_routers)
+        await redis.set(cache_key, user_routers, ex=timedelta(seconds=AppConfig.app_router_cache_seconds))
+
+
+class TokenCacheUtil:
+    """
+    已校验令牌进程内缓存工具类
+
+    以令牌摘要为键缓存签名校验通过的载荷，缓存有效期不超过令牌的exp，同一令牌在每个工作进程内只做一次签名校验；
+    会话是否有效仍以Redis中的令牌为准，退出登录及强退时同步移除本进程内的缓存
+    """
+
+    local_cache = LRUCache(JwtConfig.jwt_verified_cache_size)
+    session_index = LRUCache(JwtConfig.jwt_verified_cache_size)
+
+    @classmethod
+    def decode(cls, token: str) -> Dict[str, Any]:
+        """
+        校验并解析令牌，已校验过的令牌直接返回缓存的载荷
+
+        :param token: 令牌
+        :return: 令牌载荷
+        :raise: 令牌异常InvalidTokenError
+        """
+        digest = hashlib.sha256(token.encode('utf-8')).digest()
+        payload = cls.local_cache.get(digest)
+        if payload is None:
+            payload = jwt.decode(token, JwtConfig.jwt_secret_key, algorithms=[JwtConfig.jwt_algorithm])
+            ttl = payload['exp'] - time.time() if 'exp' in payload else None
+            cls.local_cache.set(digest, payload, ttl)
+            if payload.get('session_id'):
+                cls.session_index.set(payload.get('session_id'), digest, ttl)
+        return payload
+
+    @classmethod
+    def evict(cls, *session_ids: str):
+        """
+        移除会话对应的已校验令牌缓存
+
+        :param session_ids: 会话编号
+        """
+        for session_id in session_ids:
+            digest = cls.session_index.pop(session_id)
+            if digest is not None:
+                cls.local_cache.pop(digest)
@@ -0,0 +1,97 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+from config.env import AppConfig
+
+
+class ExecutorUtil:
+    """
+    阻塞任务执行器工具类，将文件读写、图片编码、密码哈希等阻塞操作移出事件循环
+    """
+
+    IO = 'blocking-io'
+    PASSWORD = 'password-hash'
+
+    _executors: Dict[str, ThreadPoolExecutor] = {}
+    _semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def get_executor(cls, name: str, max_workers: int) -> ThreadPoolExecutor:
+        """
+        获取指定名称的全局共享线程池，不同类型的阻塞任务使用不同线程池，互不占用
+
+        :param name: 线程池名称
+        :param max_workers: 最大线程数
+        :return: 线程池
+        """
+        executor = cls._executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+            cls._executors[name] = executor
+        return executor
+
+    @classmethod
+    async def run(cls, name: str, max_workers: int, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在指定线程池中执行函数，同时执行的任务数不超过max_workers，超出部分在事件循环中排队等待
+
+        :param name: 线程池名称
+        :param max_workers: 最大并发数
+        :param func: 阻塞函数
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        :return: 函数执行结果
+        """
+        semaphore = cls._semaphores.get(name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max_workers)
+            cls._semaphores[name] = semaphore
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(cls.get_executor(name, max_workers), partial(func, *args, **kwargs))
+
+    @classmethod
+    def get_io_executor(cls) -> ThreadPoolExecutor:
+        """
+        获取全局共享的阻塞IO线程池
+
+        :return: 线程池
+        """
+        return cls.get_executor(cls.IO, AppConfig.app_io_max_workers)
+
+    @classmethod
+    async def run_io(cls, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在阻塞IO线程池中执行函数，同时执行的任务数不超过app_io_max_workers
+
+        :param func: 阻塞函数
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        :return: 函数执行结果
+        """
+        return await cls.run(cls.IO, AppConfig.app_io_max_workers, func, *args, **kwargs)
+
+    @classmethod
+    async def run_password(cls, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在密码哈希线程池中执行函数，同时执行的任务数不超过app_password_max_workers，避免登录高峰占满事件循环及IO线程池
+
+        :param func: 阻塞函数
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        :return: 函数执行结果
+        """
+        return await cls.run(cls.PASSWORD, AppConfig.app_password_max_workers, func, *args, **kwargs)
+
+    @classmethod
+    def shutdown(cls):
+        """
+        应用关闭时释放线程池
+
+        :return:
+        """
+        for executor in cls._executors.values():
+            executor.shutdown(wait=True)
+        cls._executors.clear()
+        cls._semaphores.clear()
@@ -0,0 +1,328 @@
+import asyncio
+import hashlib
+import numpy as np
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+from config.env import FaceConfig
+from utils.executor_util import ExecutorUtil
+
+
+# 工作进程内已挂载的共享内存，键为共享内存名称
+_worker_attached: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+# 工作进程内最多保留的共享内存挂载数
+_WORKER_ATTACH_LIMIT = 8
+
+
+def _attach_gallery(shm_name: str, shape: Tuple[int, int]) -> np.ndarray:
+    """
+    工作进程挂载共享内存中的特征矩阵，同一特征库只挂载一次
+
+    :param shm_name: 共享内存名称
+    :param shape: 特征矩阵形状
+    :return: 特征矩阵
+    """
+    attached = _worker_attached.get(shm_name)
+    if attached is None:
+        if len(_worker_attached) >= _WORKER_ATTACH_LIMIT:
+            stale_name = next(iter(_worker_attached))
+            _worker_attached.pop(stale_name)[0].close()
+        shm = shared_memory.SharedMemory(name=shm_name)
+        attached = (shm, np.ndarray(shape, dtype=np.float32, buffer=shm.buf))
+        _worker_attached[shm_name] = attached
+    return attached[1]
+
+
+def _shard_top_k(
+    gallery: np.ndarray, start: int, end: int, query: np.ndarray, top_k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算单个分片内与查询特征最相似的top_k条记录
+
+    :param gallery: 特征矩阵（已归一化）
+    :param start: 分片起始行
+    :param end: 分片结束行（不含）
+    :param query: 查询特征（已归一化）
+    :param top_k: 返回数量
+    :return: (全局行号, 相似度)，按相似度降序
+    """
+    scores = gallery[start:end] @ query
+    k = min(top_k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(scores.shape[0])
+    candidates = candidates[np.argsort(scores[candidates])[::-1]]
+    return candidates + start, scores[candidates]
+
+
+def _shard_worker(
+    shm_name: str, shape: Tuple[int, int], start: int, end: int, query: np.ndarray, top_k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    工作进程入口：在共享内存特征库的指定分片内比对
+
+    :param shm_name: 共享内存名称
+    :param shape: 特征矩阵形状
+    :param start: 分片起始行
+    :param end: 分片结束行（不含）
+    :param query: 查询特征（已归一化）
+    :param top_k: 返回数量
+    :return: (全局行号, 相似度)
+    """
+    return _shard_top_k(_attach_gallery(shm_name, shape), start, end, query, top_k)
+
+
+class FaceGallery:
+    """
+    人脸特征库，特征矩阵存放于共享内存并按行分片，由工作进程池并行比对
+    """
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _executor_workers: int = 0
+
+    def __init__(self, user_ids: Sequence[int], features: Sequence[np.ndarray], shards: Optional[int] = None):
+        """
+        人脸特征库
+
+        :param user_ids: 用户id列表
+        :param features: 与用户id一一对应的特征向量列表
+        :param shards: 分片数，默认读取人脸识别配置
+        """
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)
+        self.shards = max(1, shards or FaceConfig.face_match_shards)
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        if len(features) == 0:
+            self.gallery = np.empty((0, 0), dtype=np.float32)
+            return
+        matrix = np.vstack([np.asarray(feature, dtype=np.float32).ravel() for feature in features])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        if self.parallel:
+            self._shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+            self.gallery = np.ndarray(matrix.shape, dtype=np.float32, buffer=self._shm.buf)
+            self.gallery[:] = matrix
+        else:
+            self.gallery = matrix
+
+    def __len__(self):
+        return self.gallery.shape[0]
+
+    @property
+    def parallel(self) -> bool:
+        """
+        是否启用多进程分片比对
+        """
+        return self.shards > 1 and len(self.user_ids) >= FaceConfig.face_match_parallel_min_size
+
+    @classmethod
+    def get_executor(cls, workers: int) -> ProcessPoolExecutor:
+        """
+        获取分片比对使用的进程池，所有特征库共用，按需扩容
+
+        :param workers: 所需工作进程数
+        :return: 进程池
+        """
+        if cls._executor is None or cls._executor_workers < workers:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False)
+            cls._executor = ProcessPoolExecutor(max_workers=workers)
+            cls._executor_workers = workers
+        return cls._executor
+
+    @classmethod
+    def shutdown_executor(cls):
+        """
+        关闭分片比对进程池
+
+        :return:
+        """
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+            cls._executor_workers = 0
+
+    def _normalize_query(self, embedding: np.ndarray) -> np.ndarray:
+        query = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        return query / norm if norm else query
+
+    @staticmethod
+    def _merge(results: List[Tuple[np.ndarray, np.ndarray]], top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        rows = np.concatenate([item[0] for item in results])
+        scores = np.concatenate([item[1] for item in results])
+        order = np.argsort(scores)[::-1][:top_k]
+        return rows[order], scores[order]
+
+    async def search(self, embedding: np.ndarray, top_k: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        在特征库中检索与输入特征最相似的用户（余弦相似度）
+
+        :param embedding: 待比对的人脸特征
+        :param top_k: 返回数量，默认读取人脸识别配置
+        :return: [(用户id, 相似度)]，按相似度降序
+        """
+        top_k = top_k or FaceConfig.face_match_top_k
+        if len(self) == 0:
+            return []
+        query = self._normalize_query(embedding)
+        if self.parallel:
+            loop = asyncio.get_running_loop()
+            executor = self.get_executor(self.shards)
+            bounds = np.linspace(0, len(self), self.shards + 1, dtype=np.int64)
+            results = await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        executor,
+                        _shard_worker,
+                        self._shm.name,
+                        self.gallery.shape,
+                        int(bounds[i]),
+                        int(bounds[i + 1]),
+                        query,
+                        top_k,
+                    )
+                    for i in range(self.shards)
+                ]
+            )
+            rows, scores = self._merge(results, top_k)
+        else:
+            rows, scores = _shard_top_k(self.gallery, 0, len(self), query, top_k)
+        return [(int(self.user_ids[row]), float(score)) for row, score in zip(rows, scores)]
+
+    def close(self):
+        """
+        释放特征库占用的共享内存
+
+        :return:
+        """
+        if self._shm is not None:
+            self.gallery = np.empty((0, 0), dtype=np.float32)
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+class FaceGalleryUtil:
+    """
+    人脸特征库工具类，同一会议名册相同的多个签到终端共用一份特征库
+    """
+
+    # {会议id: {名册版本: (特征库, 引用数)}}，名册变化后新连接的终端使用新特征库，旧特征库在引用释放后回收
+    _galleries: Dict[int, Dict[str, Tuple[FaceGallery, int]]] = {}
+
+    @staticmethod
+    def get_roster_version(user_ids: Sequence[int], updated_at: Optional[datetime]) -> str:
+        """
+        根据名册用户id及名册最近更新时间计算名册版本，不对特征向量逐字节计算，避免大规模特征库阻塞事件循环
+
+        :param user_ids: 用户id列表
+        :param updated_at: 名册中用户信息（含人脸特征）的最近更新时间
+        :return: 名册版本
+        """
+        digest = hashlib.blake2b(np.asarray(user_ids, dtype=np.int64).tobytes(), digest_size=16)
+        digest.update(str(updated_at).encode())
+        return digest.hexdigest()
+
+    @classmethod
+    async def acquire(
+        cls,
+        meeting_id: int,
+        user_ids: Sequence[int],
+        features: Sequence[np.ndarray],
+        updated_at: Optional[datetime] = None,
+    ) -> FaceGallery:
+        """
+        获取会议对应的特征库，不存在或名册已变化时在阻塞IO线程池中使用传入的特征构建
+
+        :param meeting_id: 会议id
+        :param user_ids: 用户id列表
+        :param features: 特征向量列表
+        :param updated_at: 名册中用户信息（含人脸特征）的最近更新时间
+        :return: 特征库对象
+        """
+        version = cls.get_roster_version(user_ids, updated_at)
+        gallery, ref_count = cls._galleries.get(meeting_id, {}).get(version, (None, 0))
+        if gallery is None:
+            # 特征矩阵的拼接、归一化及写入共享内存耗时较长，不在事件循环中执行
+            built_gallery = await ExecutorUtil.run_io(FaceGallery, user_ids, features)
+            # 构建期间其他终端可能已构建同一版本的特征库，此时使用已有的特征库
+            gallery, ref_count = cls._galleries.get(meeting_id, {}).get(version, (None, 0))
+            if gallery is None:
+                gallery = built_gallery
+            else:
+                built_gallery.close()
+        cls._galleries.setdefault(meeting_id, {})[version] = (gallery, ref_count + 1)
+        return gallery
+
+    @classmethod
+    def release(cls, meeting_id: int, gallery: FaceGallery):
+        """
+        释放会议特征库的引用，无终端使用时回收共享内存
+
+        :param meeting_id: 会议id
+        :param gallery: acquire获取的特征库对象
+        :return:
+        """
+        meeting_galleries = cls._galleries.get(meeting_id, {})
+        for version, (item, ref_count) in meeting_galleries.items():
+            if item is not gallery:
+                continue
+            if ref_count <= 1:
+                meeting_galleries.pop(version)
+                gallery.close()
+                if not meeting_galleries:
+                    cls._galleries.pop(meeting_id)
+            else:
+                meeting_galleries[version] = (gallery, ref_count - 1)
+            return
+
+    @classmethod
+    def close_all(cls):
+        """
+        应用关闭时回收所有特征库占用的共享内存
+
+        :return:
+        """
+        for meeting_galleries in cls._galleries.values():
+            for gallery, _ in meeting_galleries.values():
+                gallery.close()
+        cls._galleries.clear()
+
+
+async def benchmark(gallery_size: int = 300000, dim: int = 512, queries: int = 50, shard_list=(1, 2, 4, 8)):
+    """
+    分片比对吞吐量基准测试
+
+    :param gallery_size: 特征库规模
+    :param dim: 特征维度
+    :param queries: 每种分片数下的查询次数
+    :param shard_list: 参与测试的分片数
+    :return: {分片数: 每秒查询数}
+    """
+    rng = np.random.default_rng(0)
+    features = rng.standard_normal((gallery_size, dim), dtype=np.float32)
+    user_ids = np.arange(gallery_size)
+    result = {}
+    for shards in shard_list:
+        gallery = FaceGallery(user_ids, features, shards=shards)
+        try:
+            await gallery.search(features[0])
+            start = time.perf_counter()
+            for i in range(queries):
+                await gallery.search(features[i])
+            result[shards] = queries / (time.perf_counter() - start)
+        finally:
+            gallery.close()
+    FaceGallery.shutdown_executor()
+    return result
+
+
+if __name__ == '__main__':
+    for shard_count, qps in asyncio.run(benchmark()).items():
+        print(f'{shard_count}个分片: {qps:.1f} 次/秒')
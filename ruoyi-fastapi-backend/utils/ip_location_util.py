@@ -0,0 +1,286 @@
+import argparse
+import csv
+import ipaddress
+import numpy as np
+import os
+import socket
+from typing import Iterable, List, Optional, Tuple
+from config.env import AppConfig
+from utils.cache_util import LRUCache
+from utils.log_util import logger
+
+
+class IpLocationDatabase:
+    """
+    离线ip归属区域库，ipv4区间按起始地址排序后保存为NumPy数组，每次查询为一次二分查找
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, location_ids: np.ndarray, locations: np.ndarray):
+        """
+        离线ip归属区域库
+
+        :param starts: 区间起始地址数组（升序）
+        :param ends: 区间结束地址数组
+        :param location_ids: 区间对应的归属区域下标数组
+        :param locations: 去重后的归属区域数组
+        """
+        self.starts = starts
+        self.ends = ends
+        self.location_ids = location_ids
+        self.locations = locations
+
+    def __len__(self):
+        return len(self.starts)
+
+    @classmethod
+    def build(cls, records: Iterable[Tuple[int, int, str]]) -> 'IpLocationDatabase':
+        """
+        根据ip区间记录构建归属区域库，与前一区间重叠的部分以先出现的记录为准
+
+        :param records: (区间起始地址, 区间结束地址, 归属区域)记录
+        :return: 归属区域库
+        """
+        location_index = {}
+        rows: List[Tuple[int, int, int]] = []
+        for start, end, location in records:
+            if start > end or not location:
+                continue
+            rows.append((start, end, location_index.setdefault(location, len(location_index))))
+        rows.sort()
+        starts, ends, location_ids = [], [], []
+        for start, end, location_id in rows:
+            if ends and start <= ends[-1]:
+                if end <= ends[-1]:
+                    continue
+                start = ends[-1] + 1
+            starts.append(start)
+            ends.append(end)
+            location_ids.append(location_id)
+        return cls(
+            np.array(starts, dtype=np.uint32),
+            np.array(ends, dtype=np.uint32),
+            np.array(location_ids, dtype=np.uint32),
+            np.array(list(location_index), dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'IpLocationDatabase':
+        """
+        从npz文件加载归属区域库
+
+        :param path: 文件路径
+        :return: 归属区域库
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['starts'], data['ends'], data['location_ids'], data['locations'])
+
+    def save(self, path: str):
+        """
+        将归属区域库保存为npz文件
+
+        :param path: 文件路径
+        :return:
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f, starts=self.starts, ends=self.ends, location_ids=self.location_ids, locations=self.locations
+            )
+
+    def lookup(self, value: int) -> Optional[str]:
+        """
+        查询ipv4地址的归属区域
+
+        :param value: ipv4地址对应的整数
+        :return: 归属区域，不在任何区间内时返回None
+        """
+        index = int(np.searchsorted(self.starts, np.uint32(value), side='right')) - 1
+        if index < 0 or value > int(self.ends[index]):
+            return None
+        return str(self.locations[self.location_ids[index]])
+
+
+class IpLocationUtil:
+    """
+    ip归属区域查询工具类，使用离线归属区域库查询，不依赖外部接口
+    """
+
+    INNER_LOCATION = '内网IP'
+    UNKNOWN_LOCATION = '未知'
+    database: Optional[IpLocationDatabase] = None
+    cache = LRUCache(AppConfig.app_ip_location_cache_size)
+
+    @classmethod
+    def init_ip_location_database(cls, path: Optional[str] = None):
+        """
+        加载离线归属区域库，文件不存在时公网ip的归属区域均为未知
+
+        :param path: 文件路径，默认为app_ip_location_database
+        :return:
+        """
+        path = path or AppConfig.app_ip_location_database
+        if not os.path.exists(path):
+            logger.warning(f'ip归属区域库{path}不存在，公网ip归属区域将显示为未知，可使用utils.ip_location_util导入')
+            return
+        cls.database = IpLocationDatabase.load(path)
+        cls.cache.clear()
+        logger.info(f'ip归属区域库加载成功，共{len(cls.database)}个区间')
+
+    @classmethod
+    def get_ip_location(cls, ip: Optional[str]) -> str:
+        """
+        查询ip归属区域
+
+        :param ip: ip地址，可传入X-Forwarded-For请求头，以其中第一个地址为准
+        :return: ip归属区域
+        """
+        if not ip:
+            return cls.UNKNOWN_LOCATION
+        location = cls.cache.get(ip)
+        if location is None:
+            location = cls.__query(ip.split(',')[0].strip())
+            cls.cache.set(ip, location)
+        return location
+
+    @classmethod
+    def __query(cls, ip: str) -> str:
+        """
+        在归属区域库中查询ip归属区域
+
+        :param ip: ip地址
+        :return: ip归属区域
+        """
+        if ip == 'localhost':
+            return cls.INNER_LOCATION
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return cls.UNKNOWN_LOCATION
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if address.is_private or address.is_loopback or address.is_link_local:
+            return cls.INNER_LOCATION
+        if address.version != 4 or cls.database is None:
+            return cls.UNKNOWN_LOCATION
+        return cls.database.lookup(int(address)) or cls.UNKNOWN_LOCATION
+
+
+class IpLocationImportUtil:
+    """
+    ip归属区域库导入工具类，将常见格式的ip区间数据转换为离线归属区域库
+
+    支持的格式：
+    1.ip2region：每行为 起始ip|结束ip|国家|区域|省份|城市|运营商，值为0表示空
+    2.range：csv文件，每行为 起始ip,结束ip,归属区域字段...，ip可以是点分格式或整数
+    3.cidr：csv文件，每行为 网段,归属区域字段...
+    """
+
+    @staticmethod
+    def parse_ipv4(value: str) -> int:
+        """
+        解析ipv4地址，支持点分格式及整数格式
+
+        :param value: ip地址
+        :return: ip地址对应的整数
+        """
+        value = value.strip()
+        if value.isdigit():
+            return int(value)
+        return int.from_bytes(socket.inet_aton(value), 'big')
+
+    @staticmethod
+    def join_location(fields: List[str]) -> str:
+        """
+        拼接归属区域字段，忽略空值及重复值
+
+        :param fields: 归属区域字段
+        :return: 归属区域
+        """
+        parts = []
+        for field in fields:
+            field = field.strip()
+            if field and field not in ('0', '-') and field not in parts:
+                parts.append(field)
+        return '-'.join(parts)
+
+    @classmethod
+    def read_ip2region(cls, path: str) -> Iterable[Tuple[int, int, str]]:
+        """
+        读取ip2region格式数据，跳过无法解析的行，归属区域与原在线接口一致，取省份-城市，均为空时取国家
+
+        :param path: 文件路径
+        :return: ip区间记录
+        """
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('|')
+                if len(fields) < 7:
+                    continue
+                try:
+                    start, end = cls.parse_ipv4(fields[0]), cls.parse_ipv4(fields[1])
+                except OSError:
+                    continue
+                location = cls.join_location(fields[4:6]) or cls.join_location(fields[2:3])
+                yield start, end, location
+
+    @classmethod
+    def read_range(cls, path: str) -> Iterable[Tuple[int, int, str]]:
+        """
+        读取起止ip格式的csv数据，跳过无法解析的行（如表头）
+
+        :param path: 文件路径
+        :return: ip区间记录
+        """
+        with open(path, encoding='utf-8', newline='') as f:
+            for fields in csv.reader(f):
+                if len(fields) < 3:
+                    continue
+                try:
+                    start, end = cls.parse_ipv4(fields[0]), cls.parse_ipv4(fields[1])
+                except OSError:
+                    continue
+                yield start, end, cls.join_location(fields[2:])
+
+    @classmethod
+    def read_cidr(cls, path: str) -> Iterable[Tuple[int, int, str]]:
+        """
+        读取网段格式的csv数据，跳过ipv6网段及无法解析的行（如表头）
+
+        :param path: 文件路径
+        :return: ip区间记录
+        """
+        with open(path, encoding='utf-8', newline='') as f:
+            for fields in csv.reader(f):
+                if len(fields) < 2:
+                    continue
+                try:
+                    network = ipaddress.IPv4Network(fields[0].strip(), strict=False)
+                except ValueError:
+                    continue
+                yield int(network.network_address), int(network.broadcast_address), cls.join_location(fields[1:])
+
+    @classmethod
+    def import_file(cls, path: str, file_format: str, output: str) -> IpLocationDatabase:
+        """
+        导入ip区间数据并保存为离线归属区域库
+
+        :param path: 源文件路径
+        :param file_format: 源文件格式（ip2region、range、cidr）
+        :param output: 归属区域库保存路径
+        :return: 归属区域库
+        """
+        readers = {'ip2region': cls.read_ip2region, 'range': cls.read_range, 'cidr': cls.read_cidr}
+        database = IpLocationDatabase.build(readers[file_format](path))
+        database.save(output)
+        return database
+
+
+if __name__ == '__main__':
+    # 使用方式：python -m utils.ip_location_util ip2region.txt --format ip2region
+    parser = argparse.ArgumentParser(description='导入ip归属区域库')
+    parser.add_argument('source', help='源文件路径')
+    parser.add_argument('--format', default='ip2region', choices=['ip2region', 'range', 'cidr'], help='源文件格式')
+    parser.add_argument('--output', default=AppConfig.app_ip_location_database, help='归属区域库保存路径')
+    cli_args, _ = parser.parse_known_args()
+    ip_location_database = IpLocationImportUtil.import_file(cli_args.source, cli_args.format, cli_args.output)
+    print(f'导入完成，共{len(ip_location_database)}个区间，已保存至{cli_args.output}')
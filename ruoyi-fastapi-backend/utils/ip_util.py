@@ -0,0 +1,143 @@
+import hashlib
+import ipaddress
+import re
+import socket
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+from utils.log_util import logger
+
+
+class IpBlacklist:
+    """
+    编译后的ip黑名单，按ip版本保存排序合并后的区间数组，每次匹配为一次二分查找
+
+    支持的匹配项（多个匹配项以;或,分隔）：
+    1.单个ip，如192.168.1.1
+    2.网段，如192.168.1.0/24
+    3.*通配，如192.168.1.*、10.*
+    4.ip区间，如192.168.1.1-192.168.1.100
+    """
+
+    def __init__(self, value: Optional[str] = None):
+        """
+        编译ip黑名单
+
+        :param value: 参数配置中的黑名单字符串
+        """
+        self.value = value or ''
+        self.digest = self.get_digest(self.value)
+        intervals: Dict[int, List[Tuple[int, int]]] = {4: [], 6: []}
+        for item in re.split(r'[;,]', self.value):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                version, start, end = self.parse_item(item)
+            except ValueError:
+                logger.warning(f'登录ip黑名单中的匹配项{item}格式不正确，已忽略')
+                continue
+            intervals[version].append((start, end))
+        self._starts: Dict[int, List[int]] = {}
+        self._ends: Dict[int, List[int]] = {}
+        for version, items in intervals.items():
+            merged: List[List[int]] = []
+            for start, end in sorted(items):
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            self._starts[version] = [item[0] for item in merged]
+            self._ends[version] = [item[1] for item in merged]
+
+    def __bool__(self):
+        return any(self._starts.values())
+
+    @staticmethod
+    def get_digest(value: str) -> str:
+        """
+        计算黑名单字符串的摘要，用于判断参数配置是否变化
+
+        :param value: 黑名单字符串
+        :return: sha1摘要
+        """
+        return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def parse_item(item: str) -> Tuple[int, int, int]:
+        """
+        将单个匹配项解析为ip区间
+
+        :param item: 匹配项
+        :return: (ip版本, 区间起始, 区间结束)
+        """
+        if '*' in item:
+            segments = item.split('.')
+            fixed = [segment for segment in segments if segment != '*']
+            if len(segments) > 4 or any(segment == '*' for segment in segments[: len(fixed)]):
+                raise ValueError(item)
+            prefix = '.'.join(fixed + ['0'] * (4 - len(fixed)))
+            network = ipaddress.ip_network(f'{prefix}/{8 * len(fixed)}')
+            return 4, int(network.network_address), int(network.broadcast_address)
+        if '/' in item:
+            network = ipaddress.ip_network(item, strict=False)
+            return network.version, int(network.network_address), int(network.broadcast_address)
+        if '-' in item:
+            start, end = (ipaddress.ip_address(part.strip()) for part in item.split('-', 1))
+            if start.version != end.version or start > end:
+                raise ValueError(item)
+            return start.version, int(start), int(end)
+        address = ipaddress.ip_address(item)
+        return address.version, int(address), int(address)
+
+    def __contains__(self, ip: Optional[str]) -> bool:
+        """
+        判断ip是否在黑名单内
+
+        :param ip: ip地址，可传入X-Forwarded-For请求头，以其中第一个地址为准
+        :return: 判断结果
+        """
+        if not ip or not self:
+            return False
+        ip = ip.split(',')[0].strip()
+        try:
+            version, value = 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big')
+        except OSError:
+            try:
+                address = ipaddress.ip_address(ip)
+            except ValueError:
+                return False
+            if address.version == 6 and address.ipv4_mapped:
+                address = address.ipv4_mapped
+            version, value = address.version, int(address)
+        index = bisect_right(self._starts[version], value) - 1
+        return index >= 0 and value <= self._ends[version][index]
+
+
+class IpBlacklistUtil:
+    """
+    登录ip黑名单工具类，每个工作进程持有一份编译后的黑名单，参数配置变化时重新编译
+    """
+
+    CONFIG_KEY = 'sys.login.blackIPList'
+    blacklist = IpBlacklist()
+
+    @classmethod
+    def rebuild(cls, value: Optional[str]):
+        """
+        黑名单参数配置变化时重新编译，未变化时不做处理
+
+        :param value: 参数配置中的黑名单字符串
+        :return:
+        """
+        if (value or '') != cls.blacklist.value:
+            cls.blacklist = IpBlacklist(value)
+
+    @classmethod
+    def is_blocked(cls, ip: Optional[str]) -> bool:
+        """
+        判断ip是否禁止登录
+
+        :param ip: ip地址
+        :return: 判断结果
+        """
+        return ip in cls.blacklist
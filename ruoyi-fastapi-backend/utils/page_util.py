@@ -1,10 +1,25 @@
+import base64
+import hashlib
+import json
 import math
+from datetime import date, datetime
 from pydantic import BaseModel, ConfigDict
 from pydantic.alias_generators import to_camel
-from sqlalchemy import func, select, Select
+from sqlalchemy import and_, func, or_, select, Select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement, UnaryExpression
+from typing import Any, List, Literal, Optional, Tuple
+from config.env import AppConfig
+from exceptions.exception import ServiceException
+from utils.cache_util import LRUCache
 from utils.common_util import CamelCaseUtil
+from utils.log_util import logger
+
+# 分页总数统计方式：exact精确统计 cached按查询条件缓存精确统计结果 estimated使用执行计划估算 has_more不统计总数
+CountStrategy = Literal['exact', 'cached', 'estimated', 'has_more']
 
 
 class PageResponseModel(BaseModel):
@@ -19,6 +34,28 @@ class PageResponseModel(BaseModel):
     page_size: Optional[int] = None
     total: int
     has_next: Optional[bool] = None
+    next_cursor: Optional[str] = None
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN语句，用于获取查询语句的估算行数
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain)
+def compile_explain(element: Explain, compiler, **kwargs):
+    return f'EXPLAIN {compiler.process(element.statement, **kwargs)}'
+
+
+@compiles(Explain, 'postgresql')
+def compile_explain_postgresql(element: Explain, compiler, **kwargs):
+    return f'EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kwargs)}'
 
 
 class PageUtil:
@@ -26,6 +63,8 @@ class PageUtil:
     分页工具类
     """
 
+    count_cache = LRUCache(AppConfig.app_page_count_cache_size, AppConfig.app_page_count_cache_seconds)
+
     @classmethod
     def get_page_obj(cls, data_list: List, page_num: int, page_size: int):
         """
@@ -51,7 +90,15 @@ class PageUtil:
         return result
 
     @classmethod
-    async def paginate(cls, db: AsyncSession, query: Select, page_num: int, page_size: int, is_page: bool = False):
+    async def paginate(
+        cls,
+        db: AsyncSession,
+        query: Select,
+        page_num: int,
+        page_size: int,
+        is_page: bool = False,
+        count_strategy: CountStrategy = 'exact',
+    ):
         """
         输入查询语句和分页信息，返回分页数据列表结果
 
@@ -60,18 +107,27 @@ class PageUtil:
         :param page_num: 当前页码
         :param page_size: 当前页面数据量
         :param is_page: 是否开启分页
+        :param count_strategy: 总数统计方式，大数据量的列表可选择cached、estimated或has_more以避免每次全量统计
         :return: 分页数据对象
         """
         if is_page:
-            total = (await db.execute(select(func.count('*')).select_from(query.subquery()))).scalar()
-            query_result = await db.execute(query.offset((page_num - 1) * page_size).limit(page_size))
+            offset = (page_num - 1) * page_size
+            total = await cls.count(db, query, count_strategy)
+            # 非精确统计时多查询一条用于判断是否存在下一页
+            limit = page_size if count_strategy == 'exact' else page_size + 1
+            query_result = await db.execute(query.offset(offset).limit(limit))
             paginated_data = []
             for row in query_result:
                 if row and len(row) == 1:
                     paginated_data.append(row[0])
                 else:
                     paginated_data.append(row)
-            has_next = math.ceil(total / page_size) > page_num
+            if count_strategy == 'exact':
+                has_next = math.ceil(total / page_size) > page_num
+            else:
+                has_next = len(paginated_data) > page_size
+                paginated_data = paginated_data[:page_size]
+                total = cls.__adjust_total(total, offset, len(paginated_data), has_next)
             result = PageResponseModel(
                 rows=CamelCaseUtil.transform_result(paginated_data),
                 pageNum=page_num,
@@ -91,6 +147,210 @@ class PageUtil:
 
         return result
 
+    @classmethod
+    async def count(cls, db: AsyncSession, query: Select, count_strategy: CountStrategy = 'exact') -> Optional[int]:
+        """
+        按指定方式统计查询语句的总数
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句
+        :param count_strategy: 总数统计方式
+        :return: 总数，has_more方式不统计，返回None
+        """
+        # 排序不影响总数，统计时去除排序子句
+        query = query.order_by(None)
+        if count_strategy == 'has_more':
+            return None
+        if count_strategy == 'cached':
+            cache_key = cls.__get_count_cache_key(db, query)
+            total = cls.count_cache.get(cache_key)
+            if total is None:
+                total = await cls.__exact_count(db, query)
+                cls.count_cache.set(cache_key, total)
+            return total
+        if count_strategy == 'estimated':
+            estimated_total = await cls.__estimated_count(db, query)
+            # 估算结果较小时精确统计的代价也较小，直接精确统计以免小结果集出现明显误差
+            if estimated_total is not None and estimated_total >= AppConfig.app_page_count_estimate_threshold:
+                return estimated_total
+        return await cls.__exact_count(db, query)
+
+    @staticmethod
+    async def __exact_count(db: AsyncSession, query: Select) -> int:
+        """
+        工具方法：精确统计查询语句的总数
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句
+        :return: 总数
+        """
+        return (await db.execute(select(func.count('*')).select_from(query.subquery()))).scalar()
+
+    @staticmethod
+    async def __estimated_count(db: AsyncSession, query: Select) -> Optional[int]:
+        """
+        工具方法：根据数据库执行计划估算查询语句的总数，支持MySQL及PostgreSQL
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句
+        :return: 估算总数，无法估算时返回None
+        """
+        dialect_name = db.bind.dialect.name
+        try:
+            # 在保存点中执行，EXPLAIN失败时只回滚到保存点，PostgreSQL的事务不会处于中止状态，后续仍可精确统计
+            async with db.begin_nested():
+                explain_result = await db.execute(Explain(query))
+            if dialect_name == 'postgresql':
+                plan = explain_result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return int(plan[0]['Plan']['Plan Rows'])
+            if dialect_name == 'mysql':
+                # 单表查询的执行计划只有一行，估算行数为扫描行数乘以条件过滤比例
+                row = explain_result.mappings().first()
+                return int(row['rows'] * float(row.get('filtered') or 100) / 100)
+        except Exception as e:
+            logger.warning(f'估算分页总数失败，改为精确统计：{e}')
+        return None
+
+    @staticmethod
+    def __get_count_cache_key(db: AsyncSession, query: Select) -> str:
+        """
+        工具方法：根据编译后的查询语句及查询条件参数生成总数缓存键
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句
+        :return: 缓存键
+        """
+        compiled = query.compile(dialect=db.bind.dialect)
+        params = sorted((key, repr(value)) for key, value in compiled.params.items())
+        return hashlib.sha1(f'{compiled}{params}'.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def __adjust_total(total: Optional[int], offset: int, page_length: int, has_next: bool) -> int:
+        """
+        工具方法：修正非精确统计的总数，使其与当前页数据及是否存在下一页保持一致
+
+        :param total: 非精确统计的总数
+        :param offset: 当前页偏移量
+        :param page_length: 当前页数据条数
+        :param has_next: 是否存在下一页
+        :return: 修正后的总数，不统计总数时为已知数据条数的下限（存在下一页时加一，以便前端显示下一页）
+        """
+        if has_next:
+            return max(total or 0, offset + page_length + 1)
+        if page_length:
+            # 当前页为最后一页，总数可以精确得出
+            return offset + page_length
+        return min(total, offset) if total is not None else offset
+
+    @classmethod
+    async def seek_paginate(
+        cls,
+        db: AsyncSession,
+        query: Select,
+        order_by: UnaryExpression,
+        primary_key,
+        page_size: int,
+        cursor: str,
+        count_strategy: CountStrategy = 'exact',
+    ):
+        """
+        输入查询语句和游标，按键集（seek）方式返回下一页数据，查询耗时与翻页深度无关
+
+        排序字段与主键组合为唯一排序键，下一页的条件为排序键严格位于游标之后，因此排序字段不应为空值，
+        调用方应只对始终有值的字段（如日志时间）使用游标翻页；游标记录排序字段及方向，与本次排序不一致时视为无效
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句，原有排序会被替换为order_by及主键
+        :param order_by: 排序表达式，如desc(SysOperLog.oper_time)
+        :param primary_key: 主键字段，排序字段相同时按主键排序
+        :param page_size: 当前页面数据量
+        :param cursor: 上一页返回的游标，为空字符串时查询第一页
+        :param count_strategy: 总数统计方式
+        :return: 分页数据对象，next_cursor为下一页游标，没有下一页时为None
+        """
+        sort_column = order_by.element
+        is_desc = order_by.modifier is operators.desc_op
+        total = await cls.count(db, query, count_strategy)
+        if is_desc:
+            query = query.order_by(None).order_by(sort_column.desc(), primary_key.desc())
+        else:
+            query = query.order_by(None).order_by(sort_column.asc(), primary_key.asc())
+        if cursor:
+            sort_value, key_value = cls.__decode_cursor(cursor, sort_column, is_desc)
+            if is_desc:
+                query = query.where(
+                    or_(sort_column < sort_value, and_(sort_column == sort_value, primary_key < key_value))
+                )
+            else:
+                query = query.where(
+                    or_(sort_column > sort_value, and_(sort_column == sort_value, primary_key > key_value))
+                )
+        # 多查询一条用于判断是否存在下一页
+        query_result = (await db.execute(query.limit(page_size + 1))).scalars().all()
+        has_next = len(query_result) > page_size
+        paginated_data = list(query_result[:page_size])
+        next_cursor = None
+        if has_next:
+            last_row = paginated_data[-1]
+            next_cursor = cls.__encode_cursor(
+                sort_column, is_desc, getattr(last_row, sort_column.key), getattr(last_row, primary_key.key)
+            )
+
+        if total is None:
+            # 游标翻页无法得知当前偏移量，不统计总数时只返回当前页及是否存在下一页对应的条数
+            total = len(paginated_data) + (1 if has_next else 0)
+
+        return PageResponseModel(
+            rows=CamelCaseUtil.transform_result(paginated_data),
+            pageSize=page_size,
+            total=total,
+            hasNext=has_next,
+            nextCursor=next_cursor,
+        )
+
+    @staticmethod
+    def __encode_cursor(sort_column, is_desc: bool, sort_value: Any, key_value: Any) -> str:
+        """
+        工具方法：将排序字段、排序方向及最后一条数据的排序字段值、主键值编码为游标
+
+        :param sort_column: 排序字段
+        :param is_desc: 是否降序
+        :param sort_value: 排序字段值
+        :param key_value: 主键值
+        :return: 游标
+        """
+        if isinstance(sort_value, (date, datetime)):
+            sort_value = sort_value.isoformat()
+        return base64.urlsafe_b64encode(
+            json.dumps([sort_column.key, is_desc, sort_value, key_value]).encode('utf-8')
+        ).decode('ascii')
+
+    @staticmethod
+    def __decode_cursor(cursor: str, sort_column, is_desc: bool) -> Tuple[Any, Any]:
+        """
+        工具方法：将游标解码为排序字段值及主键值，游标的排序字段或方向与本次排序不一致时视为无效
+
+        :param cursor: 游标
+        :param sort_column: 排序字段
+        :param is_desc: 是否降序
+        :return: (排序字段值, 主键值)
+        """
+        try:
+            sort_key, cursor_desc, sort_value, key_value = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except Exception:
+            raise ServiceException(message='分页游标无效')
+        if sort_key != sort_column.key or cursor_desc != is_desc:
+            raise ServiceException(message='分页游标与当前排序方式不一致，请从第一页重新查询')
+        try:
+            python_type = sort_column.type.python_type
+            if sort_value is not None and python_type in (date, datetime):
+                sort_value = python_type.fromisoformat(sort_value)
+        except Exception:
+            raise ServiceException(message='分页游标无效')
+        return sort_value, key_value
+
 
 def get_page_obj(data_list: List, page_num: int, page_size: int):
     """
@@ -0,0 +1,125 @@
+import re
+from datetime import datetime
+from sqlalchemy import DDL, Table, event
+from typing import Any, Dict, Optional, Tuple
+from config.env import AppConfig
+
+
+class PartitionUtil:
+    """
+    日志表时间分区工具类，分区按时间范围划分，分区名包含分区起始日期，如按月分区的p202601、按日分区的p20260101
+    """
+
+    enabled = AppConfig.app_log_partition_interval != 'none'
+    # 未启用分区时不再以分区方式建表，但数据库中已分区的表（如PostgreSQL初始化脚本创建的日志表）仍按月维护分区
+    interval = AppConfig.app_log_partition_interval if enabled else 'month'
+    # 容纳超出已创建分区范围数据的分区，MySQL中为MAXVALUE分区，PostgreSQL中为默认分区
+    DEFAULT_PARTITION = 'pmax'
+    NAME_PATTERN = re.compile(r'^p(\d{6}|\d{8})$')
+
+    @classmethod
+    def get_table_kwargs(cls, column_name: str) -> Dict[str, Any]:
+        """
+        获取分区表的建表参数，PostgreSQL使用声明式分区，MySQL的分区在建表后通过register_partition_ddl添加
+
+        :param column_name: 分区字段名
+        :return: 建表参数
+        """
+        if not cls.enabled:
+            return {}
+        return {'postgresql_partition_by': f'RANGE ({column_name})'}
+
+    @classmethod
+    def register_partition_ddl(cls, table: Table, column_name: str):
+        """
+        注册建表后执行的分区语句，初始只创建默认分区，按时间划分的分区由日志分区服务按需创建
+
+        :param table: 表对象
+        :param column_name: 分区字段名
+        :return:
+        """
+        if not cls.enabled:
+            return
+        event.listen(
+            table,
+            'after_create',
+            DDL(
+                f'ALTER TABLE {table.name} PARTITION BY RANGE COLUMNS({column_name}) '
+                f'(PARTITION {cls.DEFAULT_PARTITION} VALUES LESS THAN (MAXVALUE))'
+            ).execute_if(dialect='mysql'),
+        )
+        event.listen(
+            table,
+            'after_create',
+            DDL(
+                f'CREATE TABLE {cls.get_child_table_name(table.name, cls.DEFAULT_PARTITION)} '
+                f'PARTITION OF {table.name} DEFAULT'
+            ).execute_if(dialect='postgresql'),
+        )
+
+    @classmethod
+    def get_period_start(cls, value: datetime, interval: Optional[str] = None) -> datetime:
+        """
+        获取时间所在分区周期的起始时间
+
+        :param value: 时间
+        :param interval: 分区粒度，默认为app_log_partition_interval
+        :return: 分区周期起始时间
+        """
+        if (interval or cls.interval) == 'day':
+            return datetime(value.year, value.month, value.day)
+        return datetime(value.year, value.month, 1)
+
+    @classmethod
+    def get_next_period_start(cls, start: datetime, interval: Optional[str] = None) -> datetime:
+        """
+        获取下一分区周期的起始时间
+
+        :param start: 当前分区周期起始时间
+        :param interval: 分区粒度，默认为app_log_partition_interval
+        :return: 下一分区周期起始时间
+        """
+        if (interval or cls.interval) == 'day':
+            return datetime.fromordinal(start.toordinal() + 1)
+        if start.month == 12:
+            return datetime(start.year + 1, 1, 1)
+        return datetime(start.year, start.month + 1, 1)
+
+    @classmethod
+    def get_partition_name(cls, start: datetime) -> str:
+        """
+        根据分区周期起始时间生成分区名
+
+        :param start: 分区周期起始时间
+        :return: 分区名
+        """
+        return 'p' + start.strftime('%Y%m%d' if cls.interval == 'day' else '%Y%m')
+
+    @classmethod
+    def parse_partition_name(cls, name: str) -> Optional[Tuple[datetime, datetime]]:
+        """
+        根据分区名解析分区的时间范围，分区粒度由分区名的长度确定，修改分区粒度后已有分区仍可正确解析
+
+        :param name: 分区名
+        :return: (分区起始时间, 分区结束时间)，不是按时间划分的分区时返回None
+        """
+        match = cls.NAME_PATTERN.match(name)
+        if match is None:
+            return None
+        value = match.group(1)
+        if len(value) == 8:
+            start = datetime.strptime(value, '%Y%m%d')
+            return start, cls.get_next_period_start(start, 'day')
+        start = datetime.strptime(value, '%Y%m')
+        return start, cls.get_next_period_start(start, 'month')
+
+    @staticmethod
+    def get_child_table_name(table_name: str, partition_name: str) -> str:
+        """
+        获取PostgreSQL分区子表的表名
+
+        :param table_name: 分区表表名
+        :param partition_name: 分区名
+        :return: 分区子表表名
+        """
+        return f'{table_name}_{partition_name}'
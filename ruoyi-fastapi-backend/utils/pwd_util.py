@@ -1,15 +1,22 @@
 from passlib.context import CryptContext
+from config.env import AppConfig
+from utils.executor_util import ExecutorUtil
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+pwd_context = CryptContext(
+    schemes=['bcrypt'],
+    deprecated='auto',
+    bcrypt__default_rounds=AppConfig.app_password_bcrypt_rounds,
+    bcrypt__min_rounds=AppConfig.app_password_bcrypt_rounds,
+)
 
 
 class PwdUtil:
     """
-    密码工具类
+    密码工具类，哈希计算在密码哈希线程池中执行，不阻塞事件循环
     """
 
     @classmethod
-    def verify_password(cls, plain_password, hashed_password):
+    async def verify_password(cls, plain_password, hashed_password):
         """
         工具方法：校验当前输入的密码与数据库存储的密码是否一致
 
@@ -17,14 +24,24 @@ class PwdUtil:
         :param hashed_password: 数据库存储的密码
         :return: 校验结果
         """
-        return pwd_context.verify(plain_password, hashed_password)
+        return await ExecutorUtil.run_password(pwd_context.verify, plain_password, hashed_password)
 
     @classmethod
-    def get_password_hash(cls, input_password):
+    async def get_password_hash(cls, input_password):
         """
         工具方法：对当前输入的密码进行加密
 
         :param input_password: 输入的密码
         :return: 加密成功的密码
         """
-        return pwd_context.hash(input_password)
+        return await ExecutorUtil.run_password(pwd_context.hash, input_password)
+
+    @classmethod
+    def needs_update(cls, hashed_password):
+        """
+        工具方法：判断数据库存储的密码是否使用了过时的算法或加密参数，需要重新加密
+
+        :param hashed_password: 数据库存储的密码
+        :return: 判断结果
+        """
+        return pwd_context.needs_update(hashed_password)
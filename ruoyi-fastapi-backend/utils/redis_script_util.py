@@ -0,0 +1,182 @@
+from datetime import timedelta
+from redis.commands.core import AsyncScript
+from redis.exceptions import ResponseError
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from utils.ip_util import IpBlacklist
+
+
+class RedisScriptUtil:
+    """
+    Redis Lua脚本工具类，将需要多次往返的读-判断-写操作合并为一次原子执行
+    """
+
+    # 校验token并在剩余有效期不足时续期
+    # KEYS[1]: token键 ARGV[1]: 待校验的token ARGV[2]: 续期时长（毫秒） ARGV[3]: 续期阈值（毫秒）
+    TOUCH_TOKEN = """
+    local value = redis.call('GET', KEYS[1])
+    if value ~= ARGV[1] then
+        return 0
+    end
+    if redis.call('PTTL', KEYS[1]) < tonumber(ARGV[3]) then
+        redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    end
+    return 1
+    """
+
+    # 登录前校验：账号是否已锁定，并在登录ip黑名单配置与调用方已编译的版本不一致时返回最新配置
+    # KEYS[1]: 登录ip黑名单配置键 KEYS[2]: 账号锁定键 ARGV[1]: 已编译黑名单的sha1摘要 ARGV[2]: 用户名
+    CHECK_LOGIN = """
+    local locked = 0
+    if redis.call('GET', KEYS[2]) == ARGV[2] then
+        locked = 1
+    end
+    local black_ip_value = redis.call('GET', KEYS[1]) or ''
+    if redis.sha1hex(black_ip_value) ~= ARGV[1] then
+        return {locked, black_ip_value}
+    end
+    return {locked}
+    """
+
+    # 记录一次密码错误：累加错误次数并重置计数有效期，超过最大次数时清除计数并锁定账号，返回累加后的错误次数
+    # KEYS[1]: 密码错误次数键 KEYS[2]: 账号锁定键 ARGV[1]: 用户名 ARGV[2]: 最大错误次数 ARGV[3]: 计数及锁定时长（秒）
+    RECORD_LOGIN_FAILURE = """
+    local count = redis.call('INCR', KEYS[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    if count > tonumber(ARGV[2]) then
+        redis.call('DEL', KEYS[1])
+        redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[3])
+    end
+    return count
+    """
+
+    _scripts: Dict[str, AsyncScript] = {}
+    _scripting_supported: bool = True
+
+    @classmethod
+    def get_script(cls, redis, source: str) -> AsyncScript:
+        """
+        获取已注册的脚本对象，脚本通过EVALSHA执行，服务端缺失时自动重新加载
+
+        :param redis: redis对象
+        :param source: 脚本内容
+        :return: 脚本对象
+        """
+        script = cls._scripts.get(source)
+        if script is None or script.registered_client is not redis:
+            script = redis.register_script(source)
+            cls._scripts[source] = script
+        return script
+
+    @classmethod
+    async def execute(
+        cls, redis, source: str, keys: List[str], args: List[Any], fallback: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        执行脚本，Redis不支持脚本时（如本地开发使用的Redis替代服务）使用等效的事务及普通命令执行
+
+        :param redis: redis对象
+        :param source: 脚本内容
+        :param keys: 脚本KEYS参数
+        :param args: 脚本ARGV参数
+        :param fallback: 不支持脚本时的等效实现
+        :return: 执行结果
+        """
+        if cls._scripting_supported:
+            try:
+                return await cls.get_script(redis, source)(keys=keys, args=args)
+            except ResponseError as e:
+                if 'unknown command' not in str(e).lower():
+                    raise e
+                cls._scripting_supported = False
+        return await fallback()
+
+    @classmethod
+    async def touch_token(cls, redis, key: str, token: str, expire: timedelta, refresh_ratio: float) -> bool:
+        """
+        校验Redis中的token，剩余有效期低于续期阈值时重置有效期
+
+        :param redis: redis对象
+        :param key: token键
+        :param token: 待校验的token
+        :param expire: 有效期
+        :param refresh_ratio: 续期阈值占有效期的比例，剩余有效期低于该比例时续期
+        :return: token是否有效
+        """
+        expire_ms = int(expire.total_seconds() * 1000)
+
+        async def fallback():
+            async with redis.pipeline(transaction=True) as pipe:
+                value, ttl = await pipe.get(key).pttl(key).execute()
+            if value != token:
+                return 0
+            if ttl < expire_ms * refresh_ratio:
+                await redis.pexpire(key, expire_ms)
+            return 1
+
+        result = await cls.execute(
+            redis, cls.TOUCH_TOKEN, [key], [token, expire_ms, int(expire_ms * refresh_ratio)], fallback
+        )
+        return bool(result)
+
+    @classmethod
+    async def check_login(
+        cls, redis, black_ip_key: str, lock_key: str, black_ip_digest: str, user_name: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        一次往返校验账号是否已锁定，并获取变化后的登录ip黑名单配置
+
+        :param redis: redis对象
+        :param black_ip_key: 登录ip黑名单配置键
+        :param lock_key: 账号锁定键
+        :param black_ip_digest: 调用方已编译黑名单的sha1摘要
+        :param user_name: 用户名
+        :return: (账号是否已锁定, 黑名单配置未变化时为None，否则为最新配置)
+        """
+
+        async def fallback():
+            black_ip_value, account_lock = await redis.mget(black_ip_key, lock_key)
+            locked = 1 if account_lock == user_name else 0
+            black_ip_value = black_ip_value or ''
+            if IpBlacklist.get_digest(black_ip_value) != black_ip_digest:
+                return [locked, black_ip_value]
+            return [locked]
+
+        result = await cls.execute(
+            redis, cls.CHECK_LOGIN, [black_ip_key, lock_key], [black_ip_digest, user_name], fallback
+        )
+        return bool(result[0]), result[1] if len(result) > 1 else None
+
+    @classmethod
+    async def record_login_failure(
+        cls, redis, count_key: str, lock_key: str, user_name: str, max_count: int, expire: timedelta
+    ) -> int:
+        """
+        原子地记录一次密码错误，错误次数超过最大次数时锁定账号，并发的错误尝试不会丢失计数
+
+        :param redis: redis对象
+        :param count_key: 密码错误次数键
+        :param lock_key: 账号锁定键
+        :param user_name: 用户名
+        :param max_count: 最大错误次数
+        :param expire: 计数及锁定时长
+        :return: 累加后的错误次数，大于max_count表示账号已被锁定
+        """
+        expire_seconds = int(expire.total_seconds())
+
+        async def fallback():
+            async with redis.pipeline(transaction=True) as pipe:
+                count, _ = await pipe.incr(count_key).expire(count_key, expire_seconds).execute()
+            if count > max_count:
+                async with redis.pipeline(transaction=True) as pipe:
+                    await pipe.delete(count_key).set(lock_key, user_name, ex=expire_seconds).execute()
+            return count
+
+        return int(
+            await cls.execute(
+                redis,
+                cls.RECORD_LOGIN_FAILURE,
+                [count_key, lock_key],
+                [user_name, max_count, expire_seconds],
+                fallback,
+            )
+        )
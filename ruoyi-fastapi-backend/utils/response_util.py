@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from fastapi import status
 from fastapi.encoders import jsonable_encoder
@@ -44,7 +45,27 @@ class ResponseUtil:
 
         result.update({'success': True, 'time': datetime.now()})
 
-        return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(result))
+        return cls.__json_response(result)
+
+    @classmethod
+    def success_raw_data(cls, data: str, msg: str = '操作成功') -> Response:
+        """
+        成功响应方法，data为已序列化的JSON字符串，直接拼接进响应体，不再重复序列化
+
+        :param data: 成功响应结果中属性为data的值（JSON字符串）
+        :param msg: 可选，自定义成功响应信息
+        :return: 成功响应结果
+        """
+        content = (
+            f'{{"code":{HttpStatusConstant.SUCCESS},"msg":{json.dumps(msg, ensure_ascii=False)},"data":{data},'
+            f'"success":true,"time":{json.dumps(jsonable_encoder(datetime.now()))}}}'
+        )
+
+        response = Response(status_code=status.HTTP_200_OK, content=content, media_type='application/json')
+        response.result_code = HttpStatusConstant.SUCCESS
+        response.result_msg = msg
+
+        return response
 
     @classmethod
     def failure(
@@ -78,7 +99,7 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(result))
+        return cls.__json_response(result)
 
     @classmethod
     def unauthorized(
@@ -112,7 +133,7 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(result))
+        return cls.__json_response(result)
 
     @classmethod
     def forbidden(
@@ -146,7 +167,7 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(result))
+        return cls.__json_response(result)
 
     @classmethod
     def error(
@@ -180,7 +201,21 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(result))
+        return cls.__json_response(result)
+
+    @classmethod
+    def __json_response(cls, result: Dict) -> Response:
+        """
+        构建JSON响应，响应码及响应信息同时保存在响应对象上，日志装饰器可直接读取而无需重新解析响应体
+
+        :param result: 响应结果
+        :return: JSON响应
+        """
+        response = JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(result))
+        response.result_code = result.get('code')
+        response.result_msg = result.get('msg')
+
+        return response
 
     @classmethod
     def streaming(cls, *, data: Any = None):
@@ -0,0 +1,34 @@
+from sqlalchemy import and_, ColumnElement
+from sqlalchemy.dialects.mysql import match
+from config.env import DataBaseConfig
+from utils.partition_util import PartitionUtil
+
+
+class SearchUtil:
+    """
+    文本搜索工具类，为建有全文索引或三元组索引的字段生成可走索引的模糊查询条件
+    """
+
+    # MySQL ngram分词默认以2个字符为一个分词，短于该长度的关键字无法通过全文索引查询
+    NGRAM_TOKEN_SIZE = 2
+    # MySQL的分区表不支持全文索引，启用日志表分区时只使用LIKE查询，由分区字段的时间条件裁剪扫描范围
+    mysql_fulltext_enabled = DataBaseConfig.db_type == 'mysql' and not PartitionUtil.enabled
+
+    @classmethod
+    def contains(cls, column, keyword: str) -> ColumnElement[bool]:
+        """
+        生成字段包含关键字的查询条件
+
+        MySQL下先使用全文索引的短语匹配筛选出候选行，再用LIKE精确过滤，结果与单独使用LIKE一致；
+        PostgreSQL的三元组GIN索引可直接用于LIKE查询，无需改写
+
+        :param column: 已建立搜索索引的字段
+        :param keyword: 关键字
+        :return: 查询条件
+        """
+        like_condition = column.like(f'%{keyword}%')
+        phrase = keyword.strip()
+        # 含双引号的关键字无法作为短语查询，与过短的关键字一样只使用LIKE查询
+        if not cls.mysql_fulltext_enabled or len(phrase) < cls.NGRAM_TOKEN_SIZE or '"' in phrase:
+            return like_condition
+        return and_(match(column, against=f'"{phrase}"').in_boolean_mode(), like_condition)
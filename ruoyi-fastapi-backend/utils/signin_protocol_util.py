@@ -0,0 +1,119 @@
+import msgpack
+from datetime import datetime
+from fastapi import WebSocket
+from typing import Any, Dict, List, Optional, Tuple
+from config.enums import SigninStatus
+
+
+class SigninResponder:
+    """
+    实时签到WebSocket响应器
+
+    默认使用JSON协议，每帧回复一条消息；客户端通过子协议msgpack协商紧凑模式后：
+    1.客户端每条消息为MessagePack编码的图片帧数组（一批可包含多帧）
+    2.服务端每批只回复一条MessagePack编码的结果数组，状态使用数字编码
+    3.只回复状态变化，例如连续未检测到人脸时只回复一次
+    """
+
+    PROTOCOL_MSGPACK = 'msgpack'
+
+    def __init__(self, websocket: WebSocket):
+        """
+        实时签到WebSocket响应器
+
+        :param websocket: WebSocket连接
+        """
+        self.websocket = websocket
+        self.compact = self.PROTOCOL_MSGPACK in websocket.scope.get('subprotocols', [])
+        self._last_state: Optional[Tuple[int, Optional[int]]] = None
+        self._pending: List[Dict[str, Any]] = []
+
+    async def accept(self):
+        """
+        接受连接并确认协商的协议
+
+        :return:
+        """
+        await self.websocket.accept(subprotocol=self.PROTOCOL_MSGPACK if self.compact else None)
+
+    async def receive_frames(self) -> List[bytes]:
+        """
+        接收一批图片帧
+
+        :return: 图片帧列表
+        """
+        message = await self.websocket.receive_bytes()
+        if not self.compact:
+            return [message]
+        frames = msgpack.unpackb(message)
+        return frames if isinstance(frames, list) else [frames]
+
+    async def emit(
+        self,
+        status: SigninStatus,
+        msg: str = '',
+        user_id: Optional[int] = None,
+        user_name: Optional[str] = None,
+        dept_name: Optional[str] = None,
+        similarity: Optional[float] = None,
+        sign_time: Optional[datetime] = None,
+    ):
+        """
+        回复单帧识别结果，JSON协议下立即发送，紧凑协议下仅在状态变化时加入本批回复
+
+        :param status: 识别结果状态
+        :param msg: 提示信息（紧凑协议下仅错误状态携带）
+        :param user_id: 匹配到的用户id
+        :param user_name: 匹配到的用户账号
+        :param dept_name: 匹配到的用户部门名称
+        :param similarity: 相似度（0-1）
+        :param sign_time: 签到时间
+        :return:
+        """
+        if not self.compact:
+            message = {'status': status.text}
+            if status == SigninStatus.SUCCESS:
+                message.update(
+                    user_id=user_id,
+                    user_name=user_name,
+                    dept_name=dept_name,
+                    similarity=f'{similarity * 100:.2f}%',
+                    sign_time=sign_time.strftime('%H:%M:%S'),
+                )
+            else:
+                message['msg'] = msg
+            await self.websocket.send_json(message)
+            return
+        state = (status.code, user_id)
+        if state == self._last_state and status != SigninStatus.ERROR:
+            return
+        self._last_state = state
+        message = {'c': status.code}
+        if user_id is not None:
+            message.update(u=user_id, n=user_name, d=dept_name, t=int(sign_time.timestamp()))
+        if similarity is not None:
+            message['s'] = round(float(similarity), 4)
+        if status == SigninStatus.ERROR:
+            message['m'] = msg
+        self._pending.append(message)
+
+    async def flush(self):
+        """
+        紧凑协议下将本批状态变化合并为一条消息发送
+
+        :return:
+        """
+        if self.compact and self._pending:
+            pending, self._pending = self._pending, []
+            await self.websocket.send_bytes(msgpack.packb(pending))
+
+    async def send(self, status: SigninStatus, msg: str = '', **kwargs):
+        """
+        立即回复一条结果，用于连接级错误等无需合并的消息
+
+        :param status: 识别结果状态
+        :param msg: 提示信息
+        :return:
+        """
+        await self.emit(status, msg=msg, **kwargs)
+        await self.flush()
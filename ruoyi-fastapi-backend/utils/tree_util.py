@@ -0,0 +1,110 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class TreeNode:
+    """
+    轻量树节点，只保存原始数据和子节点列表，避免为每个节点构造字典或Pydantic模型
+    """
+
+    __slots__ = ('data', 'children')
+
+    def __init__(self, data: Any):
+        self.data = data
+        self.children: Optional[List['TreeNode']] = None
+
+
+class TreeUtil:
+    """
+    树形数据工具类
+    """
+
+    @classmethod
+    def build_tree(
+        cls,
+        data_list: List[Any],
+        get_id: Callable[[Any], Hashable],
+        get_parent_id: Callable[[Any], Hashable],
+        node_factory: Callable[[Any], Any] = TreeNode,
+        root_id: Optional[Hashable] = None,
+        sort_key: Optional[Callable[[Any], Any]] = None,
+        max_depth: Optional[int] = None,
+        children_key: str = 'children',
+    ) -> List[Any]:
+        """
+        工具方法：根据列表数据生成树形嵌套数据，一次遍历建立id到节点的索引并按父级id分组，整体为线性时间
+
+        :param data_list: 列表数据
+        :param get_id: 获取数据id的函数
+        :param get_parent_id: 获取数据父级id的函数
+        :param node_factory: 根据数据生成树节点的函数，节点为字典时子节点写入children_key键，否则写入children_key属性
+        :param root_id: 根节点的父级id，传入时只返回该id下的子树；不传时父级不在列表中的数据均作为根节点
+        :param sort_key: 同级节点的排序函数，入参为树节点，不传时保持列表原有顺序
+        :param max_depth: 最大层级数，根节点为第1层，超出的节点不挂载；不传时不限制
+        :param children_key: 子节点字段名
+        :return: 树形嵌套数据
+        """
+        index: Dict[Hashable, Any] = {}
+        children_map: Dict[Hashable, List[Any]] = {}
+        node_list: List[Any] = []
+        parent_id_list: List[Hashable] = []
+        for data in data_list:
+            parent_id = get_parent_id(data)
+            node = node_factory(data)
+            index[get_id(data)] = node
+            children_map.setdefault(parent_id, []).append(node)
+            node_list.append(node)
+            parent_id_list.append(parent_id)
+
+        if root_id is None:
+            roots = [node for node, parent_id in zip(node_list, parent_id_list) if parent_id not in index]
+        else:
+            roots = children_map.get(root_id, [])
+        if sort_key is not None:
+            roots.sort(key=sort_key)
+
+        if max_depth is None:
+            # 不限制层级时直接按分组挂载，无需从根节点逐层遍历
+            for parent_id, children in children_map.items():
+                parent = index.get(parent_id)
+                if parent is not None:
+                    cls.__set_children(parent, children, children_key, sort_key)
+        else:
+            # 限制层级时按层遍历，层数有上限，数据中存在环时也不会死循环
+            child_ids_map: Dict[Hashable, List[Hashable]] = {}
+            for data in data_list:
+                child_ids_map.setdefault(get_parent_id(data), []).append(get_id(data))
+            level_ids = (
+                child_ids_map.get(root_id, [])
+                if root_id is not None
+                else [get_id(data) for data, parent_id in zip(data_list, parent_id_list) if parent_id not in index]
+            )
+            for _ in range(max_depth - 1):
+                next_level_ids = []
+                for node_id in level_ids:
+                    child_ids = child_ids_map.get(node_id)
+                    if child_ids:
+                        cls.__set_children(index[node_id], children_map[node_id], children_key, sort_key)
+                        next_level_ids.extend(child_ids)
+                if not next_level_ids:
+                    break
+                level_ids = next_level_ids
+
+        return roots
+
+    @staticmethod
+    def __set_children(node: Any, children: List[Any], children_key: str, sort_key: Optional[Callable[[Any], Any]]):
+        """
+        工具方法：将子节点列表排序后写入节点
+
+        :param node: 节点
+        :param children: 子节点列表
+        :param children_key: 子节点字段名
+        :param sort_key: 排序函数
+        :return:
+        """
+        if sort_key is not None:
+            children.sort(key=sort_key)
+        if isinstance(node, dict):
+            node[children_key] = children
+        else:
+            setattr(node, children_key, children)
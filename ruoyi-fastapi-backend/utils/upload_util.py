@@ -1,8 +1,11 @@
 import os
 import random
+import zipfile
 from datetime import datetime
 from fastapi import UploadFile
+from typing import BinaryIO, List
 from config.env import UploadConfig
+from utils.executor_util import ExecutorUtil
 
 
 class UploadUtil:
@@ -103,3 +106,158 @@ class UploadUtil:
         :param filepath: 文件路径
         """
         os.remove(filepath)
+
+    @classmethod
+    def get_upload_dir(cls):
+        """
+        获取上传文件根目录
+
+        :return: 上传文件根目录
+        """
+        return UploadConfig.UPLOAD_PATH
+
+    @classmethod
+    def gen_file_path(cls, category: str, filename: str):
+        """
+        根据文件类别及原始文件名生成上传文件的相对路径
+
+        :param category: 文件类别，作为一级目录
+        :param filename: 原始文件名
+        :return: 相对于上传文件根目录的路径
+        """
+        now = datetime.now()
+        name, extension = filename.rsplit('.', 1) if '.' in filename else (filename, 'bin')
+        return (
+            f'{category}/{now.strftime("%Y")}/{now.strftime("%m")}/{now.strftime("%d")}/'
+            f'{name}_{now.strftime("%Y%m%d%H%M%S")}{UploadConfig.UPLOAD_MACHINE}{cls.generate_random_number()}.{extension}'
+        )
+
+    @classmethod
+    def write_file(cls, filepath: str, content: bytes):
+        """
+        分块写出二进制数据到文件（阻塞方法，应在阻塞IO线程池中调用）
+
+        :param filepath: 文件路径
+        :param content: 二进制数据
+        """
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        view = memoryview(content)
+        with open(filepath, 'wb') as f:
+            for offset in range(0, len(view), UploadConfig.CHUNK_SIZE):
+                f.write(view[offset : offset + UploadConfig.CHUNK_SIZE])
+
+    @classmethod
+    def copy_file(cls, filepath: str, source: BinaryIO):
+        """
+        分块复制文件对象到目标路径（阻塞方法，应在阻塞IO线程池中调用）
+
+        :param filepath: 文件路径
+        :param source: 源文件对象
+        """
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, 'wb') as f:
+            for chunk in iter(lambda: source.read(UploadConfig.CHUNK_SIZE), b''):
+                f.write(chunk)
+
+    @classmethod
+    def read_binary(cls, filepath: str):
+        """
+        读取文件二进制数据（阻塞方法，应在阻塞IO线程池中调用）
+
+        :param filepath: 文件路径
+        :return: 二进制数据
+        """
+        with open(filepath, 'rb') as f:
+            return f.read()
+
+    @classmethod
+    def unzip_images(cls, zip_path: str, target_dir: str):
+        """
+        解压压缩包中的图片文件（阻塞方法，应在阻塞IO线程池中调用）
+
+        :param zip_path: 压缩包路径
+        :param target_dir: 解压目录
+        :return: 解压出的图片文件路径列表
+        """
+        image_extensions = ('bmp', 'gif', 'jpg', 'jpeg', 'png')
+        extracted_list = []
+        with zipfile.ZipFile(zip_path) as zip_file:
+            for member in zip_file.infolist():
+                if member.is_dir() or not member.filename.lower().endswith(image_extensions):
+                    continue
+                extracted_list.append(zip_file.extract(member, target_dir))
+        return extracted_list
+
+    @classmethod
+    async def read_file(cls, filepath: str):
+        """
+        异步读取文件二进制数据
+
+        :param filepath: 文件路径
+        :return: 二进制数据
+        """
+        return await ExecutorUtil.run_io(cls.read_binary, filepath)
+
+    @classmethod
+    async def save_file(cls, content: bytes, relative_path: str):
+        """
+        异步保存二进制数据到上传目录
+
+        :param content: 二进制数据
+        :param relative_path: 相对于上传文件根目录的路径
+        :return: 文件访问路径
+        """
+        await ExecutorUtil.run_io(cls.write_file, os.path.join(cls.get_upload_dir(), relative_path), content)
+
+        return f'{UploadConfig.UPLOAD_PREFIX}/{relative_path}'
+
+    @classmethod
+    async def save_upload_file(cls, file: UploadFile, relative_path: str):
+        """
+        异步保存上传文件到上传目录，大文件分块写出
+
+        :param file: 上传文件对象
+        :param relative_path: 相对于上传文件根目录的路径
+        :return: 文件访问路径
+        """
+        await ExecutorUtil.run_io(cls.copy_file, os.path.join(cls.get_upload_dir(), relative_path), file.file)
+
+        return f'{UploadConfig.UPLOAD_PREFIX}/{relative_path}'
+
+    @classmethod
+    async def save_sign_image(cls, content: bytes, filename: str):
+        """
+        异步保存签到照片
+
+        :param content: 图片二进制数据
+        :param filename: 图片文件名
+        :return: 文件访问路径
+        """
+        return await cls.save_file(content, cls.gen_file_path('sign', filename))
+
+    @classmethod
+    async def save_zip(cls, content: bytes, category: str):
+        """
+        异步保存压缩包到上传目录
+
+        :param content: 压缩包二进制数据
+        :param category: 文件类别
+        :return: 压缩包文件路径
+        """
+        zip_path = os.path.join(cls.get_upload_dir(), cls.gen_file_path(category, f'{category}.zip'))
+        await ExecutorUtil.run_io(cls.write_file, zip_path, content)
+
+        return zip_path
+
+    @classmethod
+    async def extract_zip(cls, zip_path: str) -> List[str]:
+        """
+        异步解压压缩包中的图片文件到压缩包同名目录
+
+        :param zip_path: 压缩包路径
+        :return: 解压出的图片文件相对于上传文件根目录的路径列表
+        """
+        target_dir = zip_path.rsplit('.', 1)[0]
+        extracted_list = await ExecutorUtil.run_io(cls.unzip_images, zip_path, target_dir)
+
+        return [os.path.relpath(filepath, cls.get_upload_dir()) for filepath in extracted_list]